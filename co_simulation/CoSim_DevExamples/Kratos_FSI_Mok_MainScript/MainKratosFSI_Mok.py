@@ -24,6 +24,10 @@ from fluid_dynamics_analysis import FluidDynamicsAnalysis
 
 import fsi_utilities # here auxiliary functions e.g. for relaxation are declared
 
+import sys, os
+sys.path.append(os.path.join('..'))
+from python_scripts.time_series_writer import TimeSeriesWriter, ExportToAscii
+
 fluid_model = KratosMultiphysics.Model()
 structural_model = KratosMultiphysics.Model()
 
@@ -114,7 +118,8 @@ print("======================================================================")
 print("|||||||||||||||||||||||| SETTING UP FSI DONE |||||||||||||||||||||||||")
 print("======================================================================")
 
-file_writer = fsi_utilities.FileWriter("Mok_Results.dat", ["Time", "Disp_X", "Disp_Y", "Disp_Z", "Coupling_Iterations"])
+# the results are buffered and written in blocks, "Mok_Results.dat" is exported at the end
+file_writer = TimeSeriesWriter("Mok_Results.bin", ["Time", "Disp_X", "Disp_Y", "Disp_Z", "Coupling_Iterations"], BufferSize=100)
 tip_node = structural_model_part.GetNode(1)
 
 # ----- Solving the problem (time integration) -----
@@ -206,4 +211,5 @@ while(time <= end_time):
 fluid_solver.Finalize()
 structural_solver.Finalize()
 
-file_writer.CloseFile()
\ No newline at end of file
+file_writer.CloseFile()
+ExportToAscii("Mok_Results.bin", "Mok_Results.dat")
\ No newline at end of file
@@ -7,6 +7,8 @@ from KratosMultiphysics.LinearSolversApplication import *
 from KratosMultiphysics.MeshingApplication import *
 
 # import own files
+import sys, os
+sys.path.append(os.path.join('..'))
 from python_solver.structure.structure_beam import *
 from python_solver.mapper.mapping import *
 from python_solver.convergence.Residual import *
@@ -216,6 +218,9 @@ for process in list_of_processes:
 
 gid_output.ExecuteFinalize()
 
+# flush the buffered structural results
+structure.close_outpu()
+
 
 
 
@@ -28,6 +28,8 @@ Last update: 15.03.2016
 import numpy as np
 import os
 
+from python_scripts.time_series_writer import TimeSeriesWriter
+
 
 class StructureMDoF:
     # constructor of the class
@@ -105,8 +107,8 @@ class StructureMDoF:
             os.makedirs(directory_base)
 
         self.filename = filename
-        self.filename_force = filename_force + "_force" + ".dat"
-        self.filename_moment = filename_force + "_moment" + ".dat"
+        self.filename_force = filename_force + "_force" + ".bin"
+        self.filename_moment = filename_force + "_moment" + ".bin"
 
         # output
         self.support_output = open(self.filename, 'w')
@@ -114,15 +116,10 @@ class StructureMDoF:
         out += "#time    Displacement    Acceleration \n"
         self.support_output.write(out)
 
-        self.support_output_force = open(self.filename_force, 'w')
-        out = "#Results for group " + "\n"
-        out += "#time    'Force' \n"
-        self.support_output.write(out)
-
-        self.support_output_moment = open(self.filename_moment, 'w')
-        out = "#Results for group " + "\n"
-        out += "#time    'Moment' \n"
-        self.support_output.write(out)
+        # the reactions are buffered and written in blocks to binary files
+        # use python_scripts/time_series_writer.py to export them to ASCII
+        self.support_output_force = TimeSeriesWriter(self.filename_force, ["time", "Force"])
+        self.support_output_moment = TimeSeriesWriter(self.filename_moment, ["time", "Moment"])
 
         # force from a previous time step (initial force)
         self.f0 = np.dot(self.M, self.a0) + np.dot(
@@ -234,13 +231,13 @@ class StructureMDoF:
         #     str(time) + " " + " ".join(str(m) for m in moments) + "\n")
         # self.support_output_moment.flush()
 
-        self.support_output_force.write(
-            str(time) + " " + str(force[0]) + "\n")
-        self.support_output_force.flush()
+        self.support_output_force.WriteToFile([time, force[0]])
+        self.support_output_moment.WriteToFile([time, moment[0]])
 
-        self.support_output_moment.write(
-            str(time) + " " + str(moment[0]) + "\n")
-        self.support_output_moment.flush()
+    def closeOutput(self):
+        self.support_output.close()
+        self.support_output_force.CloseFile()
+        self.support_output_moment.CloseFile()
 
     def predictDisplacement(self):
         return 2.0 * self.u1 - self.u0
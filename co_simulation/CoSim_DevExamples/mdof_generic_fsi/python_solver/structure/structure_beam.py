@@ -187,9 +187,9 @@ class Structure():
 
     def close_outpu(self):
 
-        closeX = self.solver_X.support_output.close()
-        closeY = self.solver_Y.support_output.close()
-        closeR = self.solver_R.support_output.close()
+        closeX = self.solver_X.closeOutput()
+        closeY = self.solver_Y.closeOutput()
+        closeR = self.solver_R.closeOutput()
 
         return closeX, closeY, closeR
 
@@ -8,6 +8,10 @@ Chair of Structural Analysis, Technical University of Munich
 import matplotlib.pyplot as plt
 from numpy import loadtxt
 
+import sys, os
+sys.path.append(os.path.join('..'))
+from python_scripts.live_monitor import LiveMonitor
+
 class ResultInfoContainer:
     def __init__(self,
                  ColumnIndex=-1,
@@ -29,6 +33,8 @@ ref_file_name = "Mok_Results_ref.dat"
 num_rows_to_skip   = 1 # in case there is a header in the file
 num_points_to_plot = 500000 # number of data points to plot => e.g. seconds to display / delta_t
 plot_update_time   = 10 # [sec]
+plot_history       = False # plot the decimated history of the whole run instead of the last points
+num_history_points = 5000 # number of data points kept for the history of the whole run
 
 index_x_axis = 0
 label_x_axis  = "Time [sec]"
@@ -69,23 +75,43 @@ col_tuple = (index_x_axis, ) + result_indices
 label_tuple = (label_x_axis, ) + result_labels
 
 plt.ion() # this is responsible for the continuous plot updates
-num_points_to_plot = int((-1)*num_points_to_plot) # conversion to make the list slicing work
 
 fig,ax = plt.subplots(num_results,1)
 
+# only the rows appended since the last update are read
+monitor = LiveMonitor()
+monitor.AddFile("results", file_name,
+                Columns=col_tuple,
+                NumRowsToSkip=num_rows_to_skip,
+                NumRecentRows=num_points_to_plot,
+                NumHistoryRows=num_history_points)
+
 if ref_file_name == "":
     using_ref_file = False
 else:
     using_ref_file = True
+    # the reference does not change, hence it is read only once
+    try:
+        data_res_ref = loadtxt(ref_file_name, skiprows=num_rows_to_skip, usecols=col_tuple, unpack=True)
+    except IndexError:
+        raise Exception("Loading the reference results failed, check the requested ColumnIndices!")
+    for res_index in range(1,num_results+1):
+        data_res_ref[res_index] *= result_factors[res_index-1] # premultiply with factor
 
 while(True): # You have to kill this manually!
     try:
-        data_results = loadtxt(file_name, skiprows=num_rows_to_skip, usecols=col_tuple, unpack=True)
-        if using_ref_file:
-            data_res_ref = loadtxt(ref_file_name, skiprows=num_rows_to_skip, usecols=col_tuple, unpack=True)
-    except IndexError:
+        monitor.Update()
+    except ValueError:
         raise Exception("Loading the results failed, check the requested ColumnIndices!")
 
+    if plot_history:
+        data_results = monitor["results"].GetHistoryData().T
+    else:
+        data_results = monitor["results"].GetRecentData().T
+    if len(data_results) == 0: # nothing written yet
+        plt.pause(plot_update_time)
+        continue
+
     plt.gca().cla() # clear axis to update them
     for res_index in range(1,num_results+1):
         if num_results == 1:
@@ -98,15 +124,12 @@ while(True): # You have to kill this manually!
         if result_limits[res_index-1][1] is not None: # set upper axis limit
             cur_plot.set_ylim(top=result_limits[res_index-1][1])
 
-        current_num_results = len(data_results[res_index])
-        plot_start_index = max(0, current_num_results+num_points_to_plot)
-        plot_end_index = current_num_results
-
-        data_results[res_index][plot_start_index:plot_end_index] *= result_factors[res_index-1] # premultiply with factor
-        cur_plot.plot(data_results[0][plot_start_index:plot_end_index],data_results[res_index][plot_start_index:plot_end_index], line_style, label='New Result')
+        cur_plot.plot(data_results[0],data_results[res_index]*result_factors[res_index-1], line_style, label='New Result')
         if using_ref_file:
-            data_res_ref[res_index][plot_start_index:plot_end_index] *= result_factors[res_index-1] # premultiply with factor
-            cur_plot.plot(data_res_ref[0][plot_start_index:plot_end_index],data_res_ref[res_index][plot_start_index:plot_end_index], 'r-', label='Reference Result')
+            # plot the reference over the same time range
+            ref_start_index, ref_end_index = data_res_ref[0].searchsorted([data_results[0][0], data_results[0][-1]], side='right')
+            ref_start_index = max(0, ref_start_index-1)
+            cur_plot.plot(data_res_ref[0][ref_start_index:ref_end_index],data_res_ref[res_index][ref_start_index:ref_end_index], 'r-', label='Reference Result')
 
         # Adding labels and Title
         cur_plot.set_ylabel(label_tuple[res_index])
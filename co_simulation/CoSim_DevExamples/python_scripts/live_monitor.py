@@ -0,0 +1,259 @@
+'''
+Incremental monitor for result files that are written while a simulation is running
+
+Each file is followed like "tail -f": the file offset is stored and only the rows
+appended since the last update are parsed. The most recent rows are kept in a
+bounded ring buffer and the complete run in a decimated history, so the memory
+and the cost of an update do not grow with the length of the run.
+
+Text files (whitespace separated, "#" comments, e.g. the output of the
+point_output_process) and the binary files of the TimeSeriesWriter are supported.
+'''
+
+import os
+
+import numpy as np
+
+from python_scripts.time_series_writer import MAGIC, TimeSeriesReader
+
+
+class RingBuffer:
+    '''Fixed-size buffer keeping the last rows that were appended.'''
+
+    def __init__(self, Capacity, NumColumns):
+        if Capacity < 1:
+            raise Exception("The capacity of the ring buffer has to be at least 1!")
+        self.data = np.empty((Capacity, NumColumns))
+        self.capacity = Capacity
+        self.start = 0
+        self.size = 0
+
+    def Append(self, rows):
+        rows = rows[-self.capacity:]
+        num_rows = len(rows)
+        if num_rows == 0:
+            return
+        end = (self.start + self.size) % self.capacity
+        first_chunk = min(num_rows, self.capacity - end)
+        self.data[end:end+first_chunk] = rows[:first_chunk]
+        self.data[:num_rows-first_chunk] = rows[first_chunk:]
+        overflow = max(0, self.size + num_rows - self.capacity)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.capacity, self.size + num_rows)
+
+    def GetData(self):
+        '''Return the stored rows in chronological order.'''
+        indices = (self.start + np.arange(self.size)) % self.capacity
+        return self.data[indices]
+
+
+class DecimatedHistory:
+    '''Bounded history of the complete run.
+
+    Every "stride"-th row is stored. Once the history is full, every second stored
+    row is dropped and the stride is doubled.
+    '''
+
+    def __init__(self, Capacity, NumColumns):
+        if Capacity < 2:
+            raise Exception("The capacity of the decimated history has to be at least 2!")
+        self.data = np.empty((Capacity, NumColumns))
+        self.capacity = Capacity
+        self.size = 0
+        self.stride = 1
+        self.num_seen = 0
+
+    def Append(self, rows):
+        while len(rows) > 0:
+            # global row numbers of the incoming rows which fall on the current stride
+            first = (-self.num_seen) % self.stride
+            selected = rows[first::self.stride]
+            num_free = self.capacity - self.size
+            if len(selected) <= num_free:
+                self.data[self.size:self.size+len(selected)] = selected
+                self.size += len(selected)
+                self.num_seen += len(rows)
+                return
+            # fill the history, then decimate and continue with the remaining rows
+            self.data[self.size:] = selected[:num_free]
+            self.size = self.capacity
+            num_consumed = first + num_free * self.stride
+            self.num_seen += num_consumed
+            rows = rows[num_consumed:]
+            self._Decimate()
+
+    def GetData(self):
+        return self.data[:self.size]
+
+    def _Decimate(self):
+        kept = self.data[:self.size:2].copy()
+        self.size = len(kept)
+        self.data[:self.size] = kept
+        self.stride *= 2
+
+
+class TextFileTail:
+    '''Reads the rows appended to a whitespace separated text file since the last call.'''
+
+    def __init__(self, FileName, Columns=None, NumRowsToSkip=0):
+        self.file_name = FileName
+        self.columns = Columns
+        self.num_rows_to_skip = NumRowsToSkip
+        self.offset = 0
+        self.num_lines_read = 0
+        self.truncated = False
+
+    def ReadNewRows(self):
+        if not os.path.isfile(self.file_name):
+            return None
+        if os.path.getsize(self.file_name) < self.offset:
+            # the file was truncated, e.g. the simulation was restarted
+            self.offset = 0
+            self.num_lines_read = 0
+            self.truncated = True
+
+        with open(self.file_name, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+
+        # only complete lines are parsed, a partially written line is read in the next call
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return None
+        self.offset += end
+        lines = chunk[:end].decode("utf-8").splitlines()
+
+        if self.num_lines_read < self.num_rows_to_skip:
+            num_skipped = min(len(lines), self.num_rows_to_skip - self.num_lines_read)
+            self.num_lines_read += num_skipped
+            lines = lines[num_skipped:]
+        self.num_lines_read += len(lines)
+
+        lines = [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+        if not lines:
+            return None
+        rows = np.loadtxt(lines, ndmin=2, usecols=self.columns)
+        return rows
+
+
+class BinaryFileTail:
+    '''Reads the rows of a TimeSeriesWriter file which were flushed since the last call.'''
+
+    def __init__(self, FileName, Columns=None):
+        self.file_name = FileName
+        self.columns = Columns
+        self.reader = None
+        self.num_blocks_read = 0
+        self.truncated = False
+
+    def ReadNewRows(self):
+        if self.reader is not None and (not os.path.isfile(self.file_name) or os.path.getsize(self.file_name) < self.reader.offset):
+            # the file was truncated or replaced, e.g. the simulation was restarted
+            self.reader = None
+            self.num_blocks_read = 0
+            self.truncated = True
+        if self.reader is None:
+            if not os.path.isfile(self.file_name):
+                return None
+            self.reader = TimeSeriesReader(self.file_name)
+        else:
+            self.reader.Refresh()
+
+        new_blocks = self.reader.blocks[self.num_blocks_read:]
+        if not new_blocks:
+            return None
+        self.num_blocks_read = len(self.reader.blocks)
+        rows = np.concatenate([block.T for block in new_blocks])
+        if self.columns is not None:
+            rows = rows[:, self.columns]
+        return rows
+
+
+class MonitoredFile:
+    '''A followed file together with its recent rows and its decimated history.
+
+    Parameters
+    ----------
+    FileName : str
+        The file to follow
+    Columns : tuple
+        Indices of the columns to keep. Optional, by default all columns are kept
+    NumRowsToSkip : int
+        Number of header lines of a text file which are not commented with "#"
+    NumRecentRows : int
+        Capacity of the ring buffer with the most recent rows
+    NumHistoryRows : int
+        Capacity of the decimated history of the complete run
+    '''
+
+    def __init__(self, FileName, Columns=None, NumRowsToSkip=0, NumRecentRows=10000, NumHistoryRows=2000):
+        self.file_name = FileName
+        self.columns = Columns
+        self.num_recent_rows = NumRecentRows
+        self.num_history_rows = NumHistoryRows
+        if _IsBinaryFile(FileName):
+            self.tail = BinaryFileTail(FileName, Columns)
+        else:
+            self.tail = TextFileTail(FileName, Columns, NumRowsToSkip)
+        self.recent = None
+        self.history = None
+        self.num_rows = 0
+
+    def Update(self):
+        '''Read and store the new rows. Returns the number of new rows.'''
+        rows = self.tail.ReadNewRows()
+        if self.tail.truncated:
+            # the run was restarted, the rows of the previous run are discarded
+            self.tail.truncated = False
+            self.recent = None
+            self.history = None
+            self.num_rows = 0
+        if rows is None or len(rows) == 0:
+            return 0
+        if self.recent is None:
+            self.recent = RingBuffer(self.num_recent_rows, rows.shape[1])
+            self.history = DecimatedHistory(self.num_history_rows, rows.shape[1])
+        self.recent.Append(rows)
+        self.history.Append(rows)
+        self.num_rows += len(rows)
+        return len(rows)
+
+    def GetRecentData(self):
+        '''Return the most recent rows, as a (number of rows x number of columns) array.'''
+        if self.recent is None:
+            return np.empty((0, 0))
+        return self.recent.GetData()
+
+    def GetHistoryData(self):
+        '''Return the decimated rows of the complete run.'''
+        if self.history is None:
+            return np.empty((0, 0))
+        return self.history.GetData()
+
+
+class LiveMonitor:
+    '''Follows several result files at once.'''
+
+    def __init__(self):
+        self.files = {}
+
+    def AddFile(self, Label, FileName, **kwargs):
+        '''Start following a file. The keyword arguments are passed to MonitoredFile.'''
+        self.files[Label] = MonitoredFile(FileName, **kwargs)
+        return self.files[Label]
+
+    def Update(self):
+        '''Read the new rows of all files. Returns a dict with the number of new rows per file.'''
+        return {label : monitored_file.Update() for label, monitored_file in self.files.items()}
+
+    def __getitem__(self, Label):
+        return self.files[Label]
+
+
+def _IsBinaryFile(file_name):
+    if file_name.endswith(".bin"):
+        return True
+    if os.path.isfile(file_name):
+        with open(file_name, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    return False
@@ -0,0 +1,210 @@
+'''
+Buffered writer for time series results (e.g. monitored displacements, forces, coupling iterations)
+
+The rows are kept in memory and flushed in blocks to a binary columnar file.
+Each block stores its columns contiguously, so that a completed block can be
+memory-mapped by a reader while the simulation is still writing.
+
+File layout:
+    magic (8 bytes) | header size (uint64) | json header (padded to 8 bytes)
+    block: number of rows (uint64) | column 0 | column 1 | ... (float64)
+
+Usage for exporting a binary file to ASCII:
+    python time_series_writer.py results.bin [results.dat]
+'''
+
+import json
+import os
+import struct
+
+import numpy as np
+
+
+MAGIC = b"KTSWBIN1"
+_UINT64 = struct.Struct("<Q")
+_DTYPE = np.dtype("<f8")
+
+
+class TimeSeriesWriter:
+    '''Buffered time series writer with periodic flushes to a binary columnar file.'''
+
+    def __init__(self, FileName, DataNames, BufferSize=1000, OpenMode="w"):
+        '''Construct the writer and write the file header.
+
+        Parameters
+        ----------
+        FileName : str
+            The name of the binary file
+        DataNames : list
+            The column names
+        BufferSize : int
+            Number of rows kept in memory before they are flushed to disk
+        OpenMode : str
+            "w" to overwrite an existing file, "a" to append rows to it
+        '''
+        if type(DataNames) is not list:
+            raise Exception("The result column names have to be passed as list!")
+        if BufferSize < 1:
+            raise Exception("The buffer size has to be at least 1!")
+
+        directory = os.path.dirname(FileName)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.file_name = FileName
+        self.data_names = list(DataNames)
+        self.num_results = len(DataNames)
+        self.buffer = np.empty((BufferSize, self.num_results), dtype=_DTYPE)
+        self.num_buffered = 0
+
+        if OpenMode == "a" and os.path.isfile(FileName) and os.path.getsize(FileName) > 0:
+            existing_names = _ReadHeader(FileName)[0]
+            if existing_names != self.data_names:
+                raise Exception("The column names do not match the ones in the existing file " + FileName)
+            self.file = open(FileName, "ab")
+        elif OpenMode in ("w", "a"):
+            self.file = open(FileName, "wb")
+            self.file.write(_PackHeader(self.data_names))
+            self.file.flush()
+        else:
+            raise Exception('Unknown open mode "{}", use "w" or "a"'.format(OpenMode))
+
+    def WriteToFile(self, Results):
+        '''Add one row. It is written to disk once the buffer is full.'''
+        if len(Results) != self.num_results:
+            raise Exception("Wrong number of results passed")
+
+        self.buffer[self.num_buffered] = Results
+        self.num_buffered += 1
+        if self.num_buffered == self.buffer.shape[0]:
+            self.Flush()
+
+    def Flush(self):
+        '''Write the buffered rows as a new block and flush the file.'''
+        if self.num_buffered == 0:
+            return
+        block = np.ascontiguousarray(self.buffer[:self.num_buffered].T)
+        self.file.write(_UINT64.pack(self.num_buffered))
+        self.file.write(block.tobytes())
+        self.file.flush()
+        self.num_buffered = 0
+
+    def CloseFile(self):
+        self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._close_file()
+
+    def __del__(self): # in case the user forgets to close the file
+        self._close_file()
+
+    def _close_file(self):
+        try:
+            if not self.file.closed:
+                self.Flush()
+                self.file.close()
+        except AttributeError:
+            pass
+
+
+class TimeSeriesReader:
+    '''Reader for the files written by the TimeSeriesWriter.
+
+    The completed blocks are memory-mapped, so it can be used on a file that is still being written.
+    '''
+
+    def __init__(self, FileName):
+        self.file_name = FileName
+        self.data_names, self.header_size = _ReadHeader(FileName)
+        self.num_results = len(self.data_names)
+        self.blocks = []
+        self.offset = self.header_size
+        self.Refresh()
+
+    def Refresh(self):
+        '''Map the blocks that have been completed since the last call. Returns the number of new rows.'''
+        file_size = os.path.getsize(self.file_name)
+        num_new_rows = 0
+        while self.offset + _UINT64.size <= file_size:
+            with open(self.file_name, "rb") as f:
+                f.seek(self.offset)
+                num_rows = _UINT64.unpack(f.read(_UINT64.size))[0]
+            block_size = _UINT64.size + num_rows * self.num_results * _DTYPE.itemsize
+            if self.offset + block_size > file_size:
+                break # the block is still being written
+            self.blocks.append(np.memmap(self.file_name,
+                                         dtype=_DTYPE,
+                                         mode="r",
+                                         offset=self.offset + _UINT64.size,
+                                         shape=(self.num_results, num_rows)))
+            self.offset += block_size
+            num_new_rows += num_rows
+        return num_new_rows
+
+    def NumberOfRows(self):
+        return sum(block.shape[1] for block in self.blocks)
+
+    def GetColumn(self, DataName):
+        index = self.data_names.index(DataName)
+        if not self.blocks:
+            return np.empty(0, dtype=_DTYPE)
+        return np.concatenate([block[index] for block in self.blocks])
+
+    def GetData(self):
+        '''Return all rows as a (number of rows x number of columns) array.'''
+        if not self.blocks:
+            return np.empty((0, self.num_results), dtype=_DTYPE)
+        return np.concatenate([block.T for block in self.blocks])
+
+
+def ExportToAscii(FileName, AsciiFileName=None):
+    '''Write the contents of a binary time series file as a tab-separated text file.
+
+    Parameters
+    ----------
+    FileName : str
+        The binary file written by the TimeSeriesWriter
+    AsciiFileName : str
+        The output file. Optional, by default the extension of FileName is replaced by ".dat"
+
+    Returns
+    -------
+    str
+        The name of the written text file
+    '''
+    if AsciiFileName is None:
+        AsciiFileName = os.path.splitext(FileName)[0] + ".dat"
+    reader = TimeSeriesReader(FileName)
+    with open(AsciiFileName, "w") as ascii_file:
+        ascii_file.write("\t".join(reader.data_names) + "\n")
+        for row in reader.GetData().tolist(): # repr gives the shortest round-trip representation
+            ascii_file.write("\t".join(map(repr, row)) + "\n")
+    return AsciiFileName
+
+
+def _PackHeader(data_names):
+    header = json.dumps({"columns" : data_names, "dtype" : _DTYPE.str}).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+    return MAGIC + _UINT64.pack(len(header)) + header
+
+
+def _ReadHeader(file_name):
+    with open(file_name, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise Exception(file_name + " is not a binary time series file")
+        header_size = _UINT64.unpack(f.read(_UINT64.size))[0]
+        header = json.loads(f.read(header_size).decode("utf-8"))
+    if header["dtype"] != _DTYPE.str:
+        raise Exception("Unsupported data type " + header["dtype"])
+    return header["columns"], len(MAGIC) + _UINT64.size + header_size
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python time_series_writer.py <binary_file> [<ascii_file>]")
+        sys.exit(1)
+    print("Written", ExportToAscii(*sys.argv[1:]))
@@ -10,6 +10,8 @@ import os
 #library for passing arguments to the script from bash
 from sys import argv
 
+from non_intrusive_surrogate import set_nodal_field
+
 class SerialRun(CoSimulationAnalysis):
 
     def __init__(self,cosim_parameters,sample,path,case, print_control_output):
@@ -35,11 +37,7 @@ class SerialRun(CoSimulationAnalysis):
             if solver == 'fluid':
                 this_analysis_stage = self._solver._GetSolver(solver)._analysis_stage
                 computing_model_part = this_analysis_stage._GetSolver().GetComputingModelPart()
-                for node in computing_model_part.Nodes:
-                    global_id = (node.Id-1)*3
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_X, velocity_field[global_id])
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_Y, velocity_field[global_id+1])
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_Z, velocity_field[global_id+2])
+                set_nodal_field(computing_model_part, KratosMultiphysics.VELOCITY, velocity_field)
 
     def FinalizeSolutionStep(self):
         super().FinalizeSolutionStep()
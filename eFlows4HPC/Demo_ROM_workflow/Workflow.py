@@ -30,6 +30,13 @@ import dislib as ds
 from sys import argv
 
 from demo_case_non_intrusive import interpolate_parameters
+from non_intrusive_surrogate import set_nodal_field
+
+# The incremental ECM is shared with the rom_application examples
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'rom_application'))
+from python_scripts.incremental_empirical_cubature import IncrementalEmpiricalCubature
 
 
 #Importing the ECM here TODO paralelize it as well
@@ -69,11 +76,7 @@ class TrainROM(CoSimulationAnalysis):
             if solver == 'fluid':
                 this_analysis_stage = self._solver._GetSolver(solver)._analysis_stage
                 computing_model_part = this_analysis_stage._GetSolver().GetComputingModelPart()
-                for node in computing_model_part.Nodes:
-                    global_id = (node.Id-1)*3
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_X, velocity_field[global_id])
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_Y, velocity_field[global_id+1])
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_Z, velocity_field[global_id+2])
+                set_nodal_field(computing_model_part, KratosMultiphysics.VELOCITY, velocity_field)
 
 
     def FinalizeSolutionStep(self):
@@ -174,11 +177,7 @@ class TrainHROM(CoSimulationAnalysis):
             if solver == 'fluid':
                 this_analysis_stage = self._solver._GetSolver(solver)._analysis_stage
                 computing_model_part = this_analysis_stage._GetSolver().GetComputingModelPart()
-                for node in computing_model_part.Nodes:
-                    global_id = (node.Id-1)*3
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_X, velocity_field[global_id])
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_Y, velocity_field[global_id+1])
-                    node.SetSolutionStepValue(KratosMultiphysics.VELOCITY_Z, velocity_field[global_id+2])
+                set_nodal_field(computing_model_part, KratosMultiphysics.VELOCITY, velocity_field)
 
     def GetSnapshotsMatrices(self):
         residuals_projected = []
@@ -444,7 +443,7 @@ def get_number_of_singular_values_for_given_tolerance(M, N, s, epsilon):
 
 
 
-def tsqr_svd(ds_array,partitions, tol = 1e-6):
+def tsqr_svd(ds_array,partitions, tol = 1e-6, return_singular_values = False):
 
     M,N = ds_array.shape
     print('the shape of the ds array is: ',ds_array)
@@ -460,6 +459,8 @@ def tsqr_svd(ds_array,partitions, tol = 1e-6):
     U = U.collect()
     U = U[:,:number_of_singular_values]
 
+    if return_singular_values:
+        return U, s[:number_of_singular_values]
     return U
 
 
@@ -830,7 +831,7 @@ def Stage4_TrainHROM(parameters, simulations_data,workflow_rom_parameters):
         if type_of_ecm == "partitioned":
             ###Partitioned ECM:
             # Run ECM in recursion, with given tolerance in the final iteration.
-            ecm_iterations = 2 # This should be obtained form the simulation parameters
+            ecm_iterations = workflow_rom_parameters[simulations_data[i]["solver_name"]]["HROM"]["ecm_iterations"].GetInt()
             z,w = Initialize_ECM_Lists(arr)
             for j in range(ecm_iterations):
                 if j < ecm_iterations-1:
@@ -856,6 +857,24 @@ def Stage4_TrainHROM(parameters, simulations_data,workflow_rom_parameters):
             z = np.squeeze(ElementSelector.z)
             w = np.squeeze(ElementSelector.w)
 
+        elif type_of_ecm == "incremental":
+            ###Incremental ECM:
+            # The elements and weights of the previous training are the initial set, and only the columns of the
+            # new cases (appended after the ones of the previous training) are added to the residuals basis
+            tolerance = workflow_rom_parameters[simulations_data[i]["solver_name"]]["HROM"]["element_selection_svd_truncation_tolerance"].GetDouble()
+            ecm_state_file = working_path+'/'+ simulations_data[i]["solver_name"]+'/ECM_state.npz'
+            # Unconstrained sum of weights, as the monolithic ECM above
+            ElementSelector = IncrementalEmpiricalCubature.Load(ecm_state_file, truncation_tolerance = tolerance, constrain_sum_of_weights = False)
+            if ElementSelector.number_of_columns > arr.shape[1] or (ElementSelector.u is not None and ElementSelector.u.shape[0] != arr.shape[0]):
+                print('The ECM state does not match the current cases, the residuals basis is computed again')
+                ElementSelector.u = None
+                ElementSelector.number_of_columns = 0
+            if arr.shape[1] > ElementSelector.number_of_columns:
+                u, s = tsqr_svd(arr[:,ElementSelector.number_of_columns:],NumberOfPartitions, tolerance, return_singular_values = True)
+                ElementSelector.AddColumns(u*s, arr.shape[1]-ElementSelector.number_of_columns)
+            z, w = ElementSelector.Calculate()
+            ElementSelector.Save(ecm_state_file)
+
 
         ###################################################################
 
@@ -1107,6 +1126,7 @@ def GetWorkflowROMParameters():
                 "HROM":{
                     "number_of_partitions":  4,
                     "empirical_cubature_type": "partitioned",
+                    "ecm_iterations": 2,
                     "element_selection_svd_truncation_tolerance": 1e-8,
                     "include_conditions_model_parts_list": ["ThermalModelPart.GENERIC_Interface_fluid"],
                     "include_nodal_neighbouring_elements_model_parts_list": ["ThermalModelPart.GENERIC_Interface_fluid"],
@@ -1123,6 +1143,7 @@ def GetWorkflowROMParameters():
                 "HROM":{
                     "number_of_partitions":  4,
                     "empirical_cubature_type": "partitioned",
+                    "ecm_iterations": 2,
                     "element_selection_svd_truncation_tolerance": 1e-8,
                     "include_conditions_model_parts_list": ["ThermalModelPart.GENERIC_Interface_solid"],
                     "include_nodal_neighbouring_elements_model_parts_list": ["ThermalModelPart.GENERIC_Interface_solid"],
@@ -1,8 +1,6 @@
 import os
 import numpy as np
-from ezyrb import Database
-from ezyrb import ReducedOrderModel as ROM
-from ezyrb import RBF, POD
+from non_intrusive_surrogate import NonIntrusiveSurrogate, build_snapshot_store
 from sys import argv
 
 def interpolate_parameters(analysis_directory_path, new_parameters_list):
@@ -13,27 +11,16 @@ def interpolate_parameters(analysis_directory_path, new_parameters_list):
         "velocity_field_400.npy": 400,
         "velocity_field_500.npy": 500
     }
-    
-    snapshots_list = []
-    parameters_list = list(hardcoded_files_and_parameters.values())
-    
-    for filename, parameter in hardcoded_files_and_parameters.items():
-        full_path = os.path.join(analysis_directory_path, filename)
-        if os.path.exists(full_path):
-            snapshots_list.append(np.load(full_path))
-        else:
-            print(f"Warning: Expected file {filename} not found in directory!")
 
-    parameters = np.array(parameters_list).reshape(-1, 1)
-    snapshots = np.array(snapshots_list)
+    # The snapshots are read from a single binary store, rebuilt only if they change
+    store_file_name = os.path.join(analysis_directory_path, "velocity_field_snapshots.npz")
+    parameters, snapshots = build_snapshot_store(store_file_name, hardcoded_files_and_parameters, analysis_directory_path)
 
-    db = Database(parameters, snapshots)
-    pod = POD()
-    rbf = RBF()
-    rom = ROM(db, pod, rbf)
-    rom.fit()
-
-    solutions_list = [rom.predict([element]) for element in new_parameters_list]
-    for i, solution in enumerate(solutions_list):
-        np.save(f"velocity_field_{new_parameters_list[i]}.npy", solution)
+    rom = NonIntrusiveSurrogate(interpolator="rbf").Fit(parameters, snapshots)
 
+    # All the parameters are evaluated in a single call
+    if len(new_parameters_list) == 0:
+        return
+    solutions = rom.Predict(np.array(new_parameters_list, dtype=float).reshape(-1, 1))
+    for parameter, solution in zip(new_parameters_list, solutions):
+        np.save(f"velocity_field_{parameter}.npy", solution)
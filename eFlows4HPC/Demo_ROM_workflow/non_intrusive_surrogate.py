@@ -0,0 +1,113 @@
+import os
+import numpy as np
+from scipy.interpolate import RBFInterpolator
+
+
+def build_snapshot_store(store_file_name, files_and_parameters, directory="."):
+    '''Gather the snapshot files into a single binary store (.npz) with their parameters.
+
+    The store is rebuilt only if it is older than any of the snapshot files. The missing
+    files are skipped with a warning, as the original interpolation script did.
+
+    Returns
+    -------
+    tuple
+        The parameters (number of snapshots x number of parameters) and the snapshots
+        (number of snapshots x number of degrees of freedom)
+    '''
+    full_paths = {os.path.join(directory, file_name): parameter for file_name, parameter in files_and_parameters.items()}
+    existing_paths = [path for path in full_paths if os.path.exists(path)]
+    for path in full_paths:
+        if path not in existing_paths:
+            print(f"Warning: Expected file {os.path.basename(path)} not found in directory!")
+
+    if os.path.isfile(store_file_name) and all(os.path.getmtime(store_file_name) >= os.path.getmtime(path) for path in existing_paths):
+        with np.load(store_file_name) as store:
+            if store["parameters"].shape[0] == len(existing_paths):
+                return store["parameters"], store["snapshots"]
+
+    parameters = np.array([full_paths[path] for path in existing_paths], dtype=float).reshape(len(existing_paths), -1)
+    snapshots = np.array([np.load(path) for path in existing_paths])
+    np.savez(store_file_name, parameters=parameters, snapshots=snapshots)
+    return parameters, snapshots
+
+
+class NonIntrusiveSurrogate:
+    '''POD + RBF (or GPR) surrogate of a parametric field.
+
+    The snapshots are compressed with a POD, and the POD coefficients are interpolated in
+    the parameter space. The interpolation weights are computed once, in Fit, so many
+    parameter points are evaluated in a single call with array operations. The full fields
+    are only reconstructed (modes @ coefficients) for the points which are requested.
+
+    The GPR interpolator needs scikit-learn, and also gives the standard deviation of the
+    coefficients. The parameters are scaled to [0, 1] before the interpolation.
+    '''
+
+    def __init__(self, pod_tolerance=0.0, interpolator="rbf", kernel="thin_plate_spline"):
+        if interpolator not in ("rbf", "gpr"):
+            raise Exception("Unknown interpolator '{}'. Available ones are: rbf, gpr".format(interpolator))
+        self.pod_tolerance = pod_tolerance
+        self.interpolator = interpolator
+        self.kernel = kernel
+
+    def Fit(self, parameters, snapshots):
+        '''Compute the POD of the snapshots (one per row) and the interpolation weights of their coefficients.'''
+        parameters = np.asarray(parameters, dtype=float).reshape(len(snapshots), -1)
+        snapshots = np.asarray(snapshots, dtype=float)
+
+        # POD of the snapshots, truncated with a relative tolerance on the singular values
+        u, s, vt = np.linalg.svd(snapshots.T, full_matrices=False)
+        if self.pod_tolerance > 0.0:
+            tail = np.sqrt(np.cumsum(s[::-1]**2))[::-1]
+            rank = max(1, int(np.sum(tail > self.pod_tolerance * tail[0])))
+        else:
+            rank = max(1, int(np.sum(s > max(snapshots.shape) * np.finfo(float).eps * s[0])))
+        self.modes = u[:, :rank]
+        self.singular_values = s[:rank]
+        coefficients = (s[:rank, np.newaxis] * vt[:rank]).T
+
+        self.parameters_min = parameters.min(axis=0)
+        self.parameters_range = np.where(np.ptp(parameters, axis=0) > 0.0, np.ptp(parameters, axis=0), 1.0)
+        scaled_parameters = self._Scale(parameters)
+        if self.interpolator == "rbf":
+            self.model = RBFInterpolator(scaled_parameters, coefficients, kernel=self.kernel)
+        else:
+            try:
+                from sklearn.gaussian_process import GaussianProcessRegressor
+                from sklearn.gaussian_process.kernels import RBF, ConstantKernel
+            except ImportError:
+                raise Exception("The gpr interpolator requires scikit-learn")
+            kernel = ConstantKernel() * RBF(length_scale=np.ones(parameters.shape[1]))
+            self.model = GaussianProcessRegressor(kernel, normalize_y=True).fit(scaled_parameters, coefficients)
+        return self
+
+    def PredictCoefficients(self, points, return_std=False):
+        '''Evaluate the POD coefficients at all the points (number of points x number of parameters) at once.'''
+        points = np.asarray(points, dtype=float).reshape(-1, len(self.parameters_min))
+        if self.interpolator == "rbf":
+            if return_std:
+                raise Exception("The standard deviation is only available with the gpr interpolator")
+            return self.model(self._Scale(points))
+        return self.model.predict(self._Scale(points), return_std=return_std)
+
+    def Reconstruct(self, coefficients, dofs=None):
+        '''Reconstruct the fields (one per row) of the given coefficients, or only the given degrees of freedom.'''
+        modes = self.modes if dofs is None else self.modes[dofs]
+        return np.atleast_2d(coefficients) @ modes.T
+
+    def Predict(self, points, dofs=None):
+        '''Evaluate the fields (one per row) at the points.'''
+        return self.Reconstruct(self.PredictCoefficients(points), dofs)
+
+    def _Scale(self, parameters):
+        return (parameters - self.parameters_min) / self.parameters_range
+
+
+def set_nodal_field(model_part, variable, field):
+    '''Set a vector field, ordered as [x, y, z] by node id starting at 1, to the nodes of a model part in bulk.'''
+    import KratosMultiphysics
+
+    node_ids = np.array([node.Id for node in model_part.Nodes])
+    values = np.asarray(field).reshape(-1, 3)[node_ids - 1]
+    KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes, variable, KratosMultiphysics.Vector(values.ravel()), 0)
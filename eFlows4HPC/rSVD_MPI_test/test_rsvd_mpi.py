@@ -1,56 +1,98 @@
+import glob
+import re
 from mpi4py import MPI
 import numpy as np
 import KratosMultiphysics.RomApplication.tsqr
 from KratosMultiphysics.RomApplication.randomized_singular_value_decomposition import RandomizedSingularValueDecomposition
 
+
+def read_row_block(pattern, rank, size):
+    '''Read the rows of this rank from a snapshots matrix stored in one or several .npy files.
+
+    The files matching the pattern (e.g. "SnapshotsMatrix_*.npy", sorted by their number) are
+    the consecutive row blocks of the matrix. They are memory-mapped, so each rank only reads
+    its own rows, split as numpy.array_split would do.
+
+    Returns the row block, memory-mapped if it is in a single file.
+    '''
+    file_names = sorted(glob.glob(pattern), key=lambda name: [int(c) if c.isdigit() else c for c in re.split(r'(\d+)', name)])
+    if not file_names:
+        raise Exception("No snapshots file matches '{}'".format(pattern))
+    shards = [np.load(file_name, mmap_mode='r') for file_name in file_names]
+    if len({shard.shape[1] for shard in shards}) != 1:
+        raise Exception("The snapshots files '{}' do not have the same number of columns".format(pattern))
+
+    shard_offsets = np.cumsum([0] + [shard.shape[0] for shard in shards])
+    rows_per_rank = np.full(size, shard_offsets[-1] // size)
+    rows_per_rank[:shard_offsets[-1] % size] += 1
+    start, end = np.cumsum(np.r_[0, rows_per_rank])[rank:rank+2]
+
+    blocks = []
+    for shard, offset in zip(shards, shard_offsets):
+        first, last = max(start - offset, 0), min(end - offset, shard.shape[0])
+        if first < last:
+            blocks.append(shard[first:last])
+    if len(blocks) == 1:
+        return blocks[0]
+    return np.concatenate(blocks) if blocks else np.empty((0, shards[0].shape[1]))
+
+
+def power_iterations(Ai, Qi, comm, max_iterations, tolerance):
+    '''Refine the range Qi of A with power iterations, re-orthogonalizing after each product.
+
+    It stops when the relative change of the singular values of Q^T A is below the tolerance.
+    '''
+    tsqr = KratosMultiphysics.RomApplication.tsqr
+    s_old = None
+    for iteration in range(max_iterations):
+        Z = np.empty((Ai.shape[1], Qi.shape[1]))
+        comm.Allreduce(np.ascontiguousarray(Ai.T @ Qi), Z, op=MPI.SUM)
+        Z, _ = np.linalg.qr(Z)
+        Qi = tsqr.tsqr(Ai @ Z)
+
+        Bi = np.empty((Qi.shape[1], Ai.shape[1]))
+        comm.Allreduce(np.ascontiguousarray(Qi.T @ Ai), Bi, op=MPI.SUM)
+        s = np.linalg.svd(Bi, compute_uv=False)
+        change = np.inf if s_old is None else np.max(np.abs(s - s_old)) / s[0]
+        if comm.Get_rank() == 0:
+            print("power iteration = ", iteration + 1, " singular values change = ", change)
+        if change < tolerance:
+            break
+        s_old = s
+    return Qi
+
+
 if __name__ == "__main__":
     comm = MPI.COMM_WORLD      # Communications macro
     svd_truncation_tolerance = 1e-6
+    snapshots_pattern = "SnapshotsMatrix.npy"   # or the row blocks, e.g. "SnapshotsMatrix_*.npy"
+    max_power_iterations = 0
+    power_iteration_tolerance = 1e-3
     rank = comm.Get_rank()
     size = comm.Get_size()
-    send_data=None
-    rows = None
-    if rank==0:
-        TestMatrix = np.load("SnapshotsMatrix.npy")
-        rows = TestMatrix.shape[0]
-        cols = TestMatrix.shape[1]
-        # Split into sub-arrays along required axis
-        arrs = np.array_split(TestMatrix, size, axis=0)
-        # Flatten the sub-arrays
-        raveled = [np.ravel(arr) for arr in arrs]
-        rank_rows_list = [arr.shape[0] for arr in arrs]
-        # Join them back up into a 1D array
-        send_data = np.concatenate(raveled)
-    else:
-        cols = None
-        rank_rows_list = None
-    cols = comm.bcast(cols, root=0)
-    rank_rows_list = comm.bcast(rank_rows_list, root=0)
-
-    recvbuf = np.empty((rank_rows_list[rank], int(cols)))
-    comm.Scatterv(send_data, recvbuf, root=0)
 
+    # Each rank reads its own rows, nothing is gathered in the rank 0
+    A_mapped = read_row_block(snapshots_pattern, rank, size)
+
+    # The orthogonalization deflates its input, so it works on a copy of the block
     Qi,Bi = KratosMultiphysics.RomApplication.tsqr.randomized_orthogonalization(
-        recvbuf,comm,svd_truncation_tolerance,1)
+        np.array(A_mapped, dtype=np.double),comm,svd_truncation_tolerance,1)
+    if max_power_iterations > 0:
+        Qi = power_iterations(A_mapped, Qi, comm, max_power_iterations, power_iteration_tolerance)
+        Bi = KratosMultiphysics.RomApplication.tsqr.distributed_transpose_mult(Qi, A_mapped, comm, 0)
     U_final,s,v = KratosMultiphysics.RomApplication.tsqr.svd_parallel(Qi, Bi, comm,
         epsilon=svd_truncation_tolerance)
+    v = comm.bcast(v, 0)
 
-    U_global = None
-    U_global = np.array(comm.gather(U_final, root=0))
-
-    U_local = None
+    # Check that the difference of the reconstruction is below a tolerance, without assembling it
+    local_error = np.array([np.linalg.norm(A_mapped - U_final@np.diag(s)@v.T)**2])
+    error = np.array([0.0])
+    comm.Allreduce(local_error, error, op=MPI.SUM)
+    norm = KratosMultiphysics.RomApplication.tsqr.TotalNorm(np.asarray(A_mapped), comm)
     if rank==0:
-        rank_rows_list = np.cumsum(rank_rows_list)
-        rank_rows_list = np.insert(rank_rows_list, 0, 0)
-        U_local = np.zeros((rows,U_global.shape[2]))
-        for i in range(0,size):
-            idxg, idyg = rank_rows_list[i], rank_rows_list[i+1]
-            U_local[idxg:idyg,:] = U_global[i,:,:]
-
-        Randomized_Reconstruction = U_local@np.diag(s)@v.T #reconstruct matrix
+        print( "The error or reconstruction is: ", np.sqrt(error[0])/norm)
 
-        #Check that the difference of the reconstruction is below a tolerance
-        print( "The error or reconstruction is: ", np.linalg.norm(Randomized_Reconstruction - TestMatrix)/np.linalg.norm(TestMatrix))
-
-        # Wirte the left singular values
-        np.save("LeftSingularVectors.npy", U_local)
\ No newline at end of file
+    # Write the left singular vectors in row blocks, one per rank (they can be read with read_row_block)
+    np.save("LeftSingularVectors_{}.npy".format(rank), U_final)
+    if rank==0:
+        np.save("SingularValues.npy", s)
@@ -2,9 +2,9 @@ from __future__ import print_function, absolute_import, division #makes KratosMu
 
 import KratosMultiphysics
 import KratosMultiphysics.FluidDynamicsApplication as KratosFluid
-import KratosMultiphysics.CompressiblePotentialFlowApplication as KratosPotential
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
-from KratosMultiphysics.CompressiblePotentialFlowApplication.potential_flow_analysis import PotentialFlowAnalysis
+
+from potential_flow_initializer import PotentialFlowInitializer
 
 import sys
 import time
@@ -83,47 +83,20 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
                 "auxiliar_process_list"            : []
             }
         }''')
-        aux_model = KratosMultiphysics.Model()
-        pot_flow_simulation = PotentialFlowAnalysis(aux_model,parameters)
-        pot_flow_simulation.Run()
-
-        # Calculate the velocity and pressure nodal projections
-        nodal_variables = ["VELOCITY","PRESSURE"]
-        pot_model_part = pot_flow_simulation._GetSolver().GetComputingModelPart()
-        nodal_value_process = KratosPotential.ComputeNodalValueProcess(pot_model_part, nodal_variables)
-        nodal_value_process.Execute()
+        # The potential solution is stored to be reused by the following runs (it is solved again if the potential parameters or the mesh change)
+        initializer = PotentialFlowInitializer(
+            parameters,
+            solution_file_name = "naca_0012_potential_solution.npz",
+            mapping_file_name = "naca_0012_potential_mapping.npz")
 
         # Transfer the potential flow values as initial condition for the compressible problem
-        tem_0 = 273
-        gamma = 1.4
-        c_v = 722.14
-        c = (gamma*(gamma-1.0)*c_v*tem_0)**0.5
-        free_stream_rho = 1.0
-        free_stream_mach = 0.8
-
-        pot_nodes = pot_model_part.Nodes
-        comp_nodes = self._GetSolver().GetComputingModelPart().Nodes
-        for pot_node, comp_node in zip(pot_nodes, comp_nodes):
-            pot_v = pot_node.GetValue(KratosMultiphysics.VELOCITY)
-            pot_v_norm_2 = pot_v[0] * pot_v[0] + pot_v[1] * pot_v[1]
-            pot_v_norm = pot_v_norm_2**0.5
-            mach = pot_v_norm / c
-            num = 1.0 + 0.5 * (gamma - 1.0) * free_stream_mach**2
-            det = 1.0 + 0.5 * (gamma - 1.0) * mach**2
-            pot_rho = free_stream_rho * (num / det)**(1.0 / (gamma - 1.0))
-            aux_tot_ener = pot_rho * (c_v * tem_0 + 0.5 * pot_v_norm_2)
-
-            # Density initial condition
-            comp_node.SetSolutionStepValue(KratosMultiphysics.DENSITY, 0, pot_rho)
-            comp_node.SetSolutionStepValue(KratosMultiphysics.DENSITY, 1, pot_rho)
-            # Momentum initial condition
-            comp_node.SetSolutionStepValue(KratosMultiphysics.VELOCITY, 0, pot_v)
-            comp_node.SetSolutionStepValue(KratosMultiphysics.VELOCITY, 1, pot_v)
-            comp_node.SetSolutionStepValue(KratosMultiphysics.MOMENTUM, 0, pot_rho * pot_v)
-            comp_node.SetSolutionStepValue(KratosMultiphysics.MOMENTUM, 1, pot_rho * pot_v)
-            # Total energy initial condition
-            comp_node.SetSolutionStepValue(KratosMultiphysics.TOTAL_ENERGY, 0, aux_tot_ener)
-            comp_node.SetSolutionStepValue(KratosMultiphysics.TOTAL_ENERGY, 1, aux_tot_ener)
+        initializer.Initialize(
+            self._GetSolver().GetComputingModelPart(),
+            free_stream_density = 1.0,
+            free_stream_mach = 0.8,
+            temperature = 273,
+            heat_capacity_ratio = 1.4,
+            specific_heat = 722.14)
 
     def ApplyBoundaryConditions(self):
         super(FluidDynamicsAnalysisWithFlush,self).ApplyBoundaryConditions()
@@ -141,24 +114,6 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
     def FinalizeSolutionStep(self):
         super(FluidDynamicsAnalysisWithFlush,self).FinalizeSolutionStep()
 
-        # Calculate and set PRESSURE and TEMPERATURE
-        for node in self._GetSolver().GetComputingModelPart().Nodes:
-            rho = node.GetSolutionStepValue(KratosMultiphysics.DENSITY)
-            mom = node.GetSolutionStepValue(KratosMultiphysics.MOMENTUM)
-            tot_ener = node.GetSolutionStepValue(KratosMultiphysics.TOTAL_ENERGY)
-            vel = mom / rho
-            vel_norm = (vel[0]**2 + vel[1]**2)**0.5
-            temp = (tot_ener / rho - 0.5 * vel_norm**2) / 722.14
-            node.SetSolutionStepValue(KratosMultiphysics.TEMPERATURE, 0, temp)
-            p = (1.4 - 1.0) * rho * 722.14 * temp
-            if (rho < 0.0 or p < 0.0 or temp < 0.0):
-                print("Node: ", node.Id, " p: ", p, " rho: ", rho, " vel_norm: ", vel_norm, " tot_ener: ", tot_ener, " temp: ", temp)
-            c = (1.4 * p / rho)**0.5
-            node.SetValue(KratosFluid.MACH, vel_norm / c)
-            node.SetValue(KratosMultiphysics.SOUND_VELOCITY, c)
-            node.SetSolutionStepValue(KratosMultiphysics.PRESSURE, 0, p)
-            node.SetSolutionStepValue(KratosMultiphysics.VELOCITY, 0, vel)
-
         if self.parallel_type == "OpenMP":
             now = time.time()
             if now - self.last_flush > self.flush_frequency:
@@ -0,0 +1,112 @@
+import numpy as np
+
+import KratosMultiphysics as KM
+import KratosMultiphysics.FluidDynamicsApplication as KratosFluid
+
+def Factory(settings, model):
+    if not isinstance(settings, KM.Parameters):
+        raise Exception("expected input shall be a Parameters object, encapsulating a json string")
+    return ComputeDerivedThermodynamicVariablesProcess(model, settings["Parameters"])
+
+class ComputeDerivedThermodynamicVariablesProcess(KM.Process):
+    '''Compute the primitive variables from the conservative ones of the compressible solver.
+
+    VELOCITY, TEMPERATURE and PRESSURE (historical) as well as SOUND_VELOCITY and MACH
+    (non-historical) are obtained from DENSITY, MOMENTUM and TOTAL_ENERGY for all the
+    nodes of the model part at once, with ideal gas relations.
+    By default the variables are only computed before the output steps. If a process
+    needs them at every step, set compute_every_step to true or call RequireEveryStep.
+    The nodes with negative density, pressure or temperature are reported as a summary.
+    '''
+
+    @staticmethod
+    def GetDefaultParameters():
+        return KM.Parameters("""{
+            "model_part_name"          : "FluidModelPart",
+            "heat_capacity_ratio"      : 1.4,
+            "specific_heat"            : 722.14,
+            "compute_every_step"       : false,
+            "max_reported_nodes"       : 10
+        }""")
+
+    def __init__(self, model, settings):
+        '''Constructor of ComputeDerivedThermodynamicVariablesProcess.'''
+        KM.Process.__init__(self)
+        settings.ValidateAndAssignDefaults(self.GetDefaultParameters())
+
+        self.model_part = model.GetModelPart(settings["model_part_name"].GetString())
+        self.gamma = settings["heat_capacity_ratio"].GetDouble()
+        self.c_v = settings["specific_heat"].GetDouble()
+        self.compute_every_step = settings["compute_every_step"].GetBool()
+        self.max_reported_nodes = settings["max_reported_nodes"].GetInt()
+
+        self.variable_utils = KM.VariableUtils()
+        self.node_ids = None
+        self.last_computed_step = None
+
+    def RequireEveryStep(self):
+        '''To be called by the processes which use the derived variables at every step.'''
+        self.compute_every_step = True
+
+    def ExecuteFinalizeSolutionStep(self):
+        if self.compute_every_step:
+            self.Compute()
+
+    def ExecuteBeforeOutputStep(self):
+        self.Compute()
+
+    def Compute(self):
+        '''Compute and set the derived variables, once per step.'''
+        step = self.model_part.ProcessInfo[KM.STEP]
+        if step == self.last_computed_step:
+            return
+        self.last_computed_step = step
+
+        nodes = self.model_part.Nodes
+        dim = self.model_part.ProcessInfo[KM.DOMAIN_SIZE]
+        rho = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, KM.DENSITY, 0))
+        mom = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, KM.MOMENTUM, 0, 3)).reshape(-1, 3)
+        tot_ener = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, KM.TOTAL_ENERGY, 0))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vel = mom / rho[:, np.newaxis]
+            vel_norm_2 = np.sum(vel[:, :dim]**2, axis=1)
+            temp = (tot_ener / rho - 0.5 * vel_norm_2) / self.c_v
+            p = (self.gamma - 1.0) * rho * self.c_v * temp
+            c = np.sqrt(self.gamma * p / rho)
+            mach = np.sqrt(vel_norm_2) / c
+
+        self.variable_utils.SetSolutionStepValuesVector(nodes, KM.VELOCITY, KM.Vector(vel.ravel()), 0)
+        self.variable_utils.SetSolutionStepValuesVector(nodes, KM.TEMPERATURE, KM.Vector(temp), 0)
+        self.variable_utils.SetSolutionStepValuesVector(nodes, KM.PRESSURE, KM.Vector(p), 0)
+        self.variable_utils.SetValuesVector(nodes, KM.SOUND_VELOCITY, KM.Vector(c))
+        self.variable_utils.SetValuesVector(nodes, KratosFluid.MACH, KM.Vector(mach))
+
+        self._ReportNonPhysicalNodes(rho, p, temp)
+
+    def _ReportNonPhysicalNodes(self, rho, p, temp):
+        non_physical = (rho < 0.0) | (p < 0.0) | (temp < 0.0)
+        data_comm = self.model_part.GetCommunicator().GetDataCommunicator()
+        num_non_physical = data_comm.SumAll(int(np.count_nonzero(non_physical)))
+        if num_non_physical == 0:
+            return
+
+        if self.node_ids is None or len(self.node_ids) != len(rho):
+            self.node_ids = np.array([node.Id for node in self.model_part.Nodes])
+        summary = "{} nodes with negative density, pressure or temperature at time {}\n".format(
+            num_non_physical, self.model_part.ProcessInfo[KM.TIME])
+        summary += "\tnegative density: {}, negative pressure: {}, negative temperature: {}\n".format(
+            data_comm.SumAll(int(np.count_nonzero(rho < 0.0))),
+            data_comm.SumAll(int(np.count_nonzero(p < 0.0))),
+            data_comm.SumAll(int(np.count_nonzero(temp < 0.0))))
+        summary += "\tmin density: {}, min pressure: {}, min temperature: {}\n".format(
+            data_comm.MinAll(float(np.nanmin(rho, initial=np.inf))),
+            data_comm.MinAll(float(np.nanmin(p, initial=np.inf))),
+            data_comm.MinAll(float(np.nanmin(temp, initial=np.inf))))
+
+        # the worst nodes (lowest pressure) of each rank
+        indices = np.flatnonzero(non_physical)
+        indices = indices[np.argsort(p[indices])][:self.max_reported_nodes]
+        for i in indices:
+            summary += "\tNode: {} p: {} rho: {} temp: {}\n".format(self.node_ids[i], p[i], rho[i], temp[i])
+        KM.Logger.PrintWarning("ComputeDerivedThermodynamicVariablesProcess", summary)
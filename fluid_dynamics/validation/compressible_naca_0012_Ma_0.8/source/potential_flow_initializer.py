@@ -0,0 +1,156 @@
+import os
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+import KratosMultiphysics
+import KratosMultiphysics.CompressiblePotentialFlowApplication as KratosPotential
+from KratosMultiphysics.CompressiblePotentialFlowApplication.potential_flow_analysis import PotentialFlowAnalysis
+
+
+class PotentialFlowInitializer:
+    '''Initial condition of a compressible problem from a potential flow solution.
+
+    The potential solution (nodal coordinates and velocities) is obtained by running a
+    PotentialFlowAnalysis or read from a file written by a previous run. It is mapped to the
+    nodes of the compressible model part through a kd-tree of the potential nodes, so the
+    two meshes do not need to have the same nodes nor the same ordering. Coincident nodes
+    take the value of the potential node, the other ones an inverse distance weighting
+    of the closest potential nodes. The mapping is kept in memory and in a file, so it is
+    only computed again if the compressible nodes change.
+    '''
+
+    def __init__(self, potential_parameters, solution_file_name="", mapping_file_name="", number_of_neighbours=3, coincidence_tolerance=1e-10):
+        '''Constructor of PotentialFlowInitializer.
+
+        Parameters
+        ----------
+        potential_parameters : KratosMultiphysics.Parameters
+            The project parameters of the PotentialFlowAnalysis
+        solution_file_name : str
+            File (.npz) with the potential solution. It is read if it exists and it was written
+            with the same potential parameters (free stream conditions, mesh, ...) and mesh file,
+            otherwise it is written after solving the potential problem. Optional, not used if empty
+        mapping_file_name : str
+            File (.npz) with the mapping between the meshes. Optional, not used if empty
+        number_of_neighbours : int
+            Number of potential nodes used to interpolate at a non-coincident node
+        coincidence_tolerance : float
+            Distance below which two nodes are considered coincident
+        '''
+        self.potential_parameters = potential_parameters
+        self.solution_file_name = solution_file_name
+        self.mapping_file_name = mapping_file_name
+        self.number_of_neighbours = number_of_neighbours
+        self.coincidence_tolerance = coincidence_tolerance
+
+        self.potential_coordinates = None
+        self.potential_velocity = None
+        self.mapping_coordinates = None
+        self.mapping_indices = None
+        self.mapping_weights = None
+
+    def GetPotentialSolution(self):
+        '''Return the coordinates and the velocity of the potential nodes, solving the problem only if required.'''
+        if self.potential_coordinates is None:
+            solution_key = self._GetSolutionKey()
+            if self.solution_file_name and os.path.isfile(self.solution_file_name):
+                solution = np.load(self.solution_file_name)
+                if "key" in solution and str(solution["key"]) == solution_key:
+                    self.potential_coordinates = solution["coordinates"]
+                    self.potential_velocity = solution["velocity"]
+                else:
+                    KratosMultiphysics.Logger.PrintInfo("PotentialFlowInitializer", "The potential solution in {} was computed with other parameters, it is computed again".format(self.solution_file_name))
+            if self.potential_coordinates is None:
+                self._SolvePotentialProblem()
+                if self.solution_file_name:
+                    np.savez(self.solution_file_name, coordinates=self.potential_coordinates, velocity=self.potential_velocity, key=solution_key)
+        return self.potential_coordinates, self.potential_velocity
+
+    def MapVelocity(self, coordinates):
+        '''Return the potential velocity at the given (number of nodes x 3) coordinates.'''
+        potential_coordinates, potential_velocity = self.GetPotentialSolution()
+        self._UpdateMapping(coordinates, potential_coordinates)
+        return np.einsum('nk,nkd->nd', self.mapping_weights, potential_velocity[self.mapping_indices])
+
+    def Initialize(self, model_part, free_stream_density, free_stream_mach, temperature, heat_capacity_ratio=1.4, specific_heat=722.14):
+        '''Set DENSITY, VELOCITY, MOMENTUM and TOTAL_ENERGY of the current and the previous steps of the compressible model part.'''
+        gamma = heat_capacity_ratio
+        c_v = specific_heat
+        c = (gamma * (gamma - 1.0) * c_v * temperature)**0.5
+
+        coordinates = np.array(KratosMultiphysics.VariableUtils().GetInitialPositionsVector(model_part.Nodes, 3)).reshape(-1, 3)
+        vel = self.MapVelocity(coordinates)
+
+        # Isentropic relations
+        vel_norm_2 = vel[:, 0]**2 + vel[:, 1]**2
+        mach = np.sqrt(vel_norm_2) / c
+        num = 1.0 + 0.5 * (gamma - 1.0) * free_stream_mach**2
+        det = 1.0 + 0.5 * (gamma - 1.0) * mach**2
+        rho = free_stream_density * (num / det)**(1.0 / (gamma - 1.0))
+        tot_ener = rho * (c_v * temperature + 0.5 * vel_norm_2)
+
+        variable_utils = KratosMultiphysics.VariableUtils()
+        values = [
+            (KratosMultiphysics.DENSITY, KratosMultiphysics.Vector(rho)),
+            (KratosMultiphysics.VELOCITY, KratosMultiphysics.Vector(vel.ravel())),
+            (KratosMultiphysics.MOMENTUM, KratosMultiphysics.Vector((rho[:, np.newaxis] * vel).ravel())),
+            (KratosMultiphysics.TOTAL_ENERGY, KratosMultiphysics.Vector(tot_ener))]
+        for step in [0, 1]:
+            for variable, value in values:
+                variable_utils.SetSolutionStepValuesVector(model_part.Nodes, variable, value, step)
+
+    def _GetSolutionKey(self):
+        # The potential parameters include the free stream conditions and the mesh file name,
+        # the size and the modification time of the mesh file account for changes of the mesh itself
+        key = self.potential_parameters.WriteJsonString()
+        model_import_settings = self.potential_parameters["solver_settings"]["model_import_settings"]
+        if model_import_settings.Has("input_filename"):
+            mesh_file_name = model_import_settings["input_filename"].GetString() + ".mdpa"
+            if os.path.isfile(mesh_file_name):
+                mesh_file_stat = os.stat(mesh_file_name)
+                key += "|{}|{}".format(mesh_file_stat.st_size, mesh_file_stat.st_mtime)
+        return key
+
+    def _SolvePotentialProblem(self):
+        aux_model = KratosMultiphysics.Model()
+        pot_flow_simulation = PotentialFlowAnalysis(aux_model, self.potential_parameters)
+        pot_flow_simulation.Run()
+
+        # Calculate the velocity nodal projection
+        pot_model_part = pot_flow_simulation._GetSolver().GetComputingModelPart()
+        nodal_value_process = KratosPotential.ComputeNodalValueProcess(pot_model_part, ["VELOCITY"])
+        nodal_value_process.Execute()
+
+        variable_utils = KratosMultiphysics.VariableUtils()
+        self.potential_coordinates = np.array(variable_utils.GetInitialPositionsVector(pot_model_part.Nodes, 3)).reshape(-1, 3)
+        self.potential_velocity = np.array(variable_utils.GetValuesVector(pot_model_part.Nodes, KratosMultiphysics.VELOCITY, 3)).reshape(-1, 3)
+
+    def _UpdateMapping(self, coordinates, potential_coordinates):
+        if self.mapping_coordinates is not None and np.array_equal(self.mapping_coordinates, coordinates):
+            return
+        if self.mapping_file_name and os.path.isfile(self.mapping_file_name):
+            mapping = np.load(self.mapping_file_name)
+            if np.array_equal(mapping["coordinates"], coordinates) and np.array_equal(mapping["potential_coordinates"], potential_coordinates):
+                self.mapping_coordinates = coordinates
+                self.mapping_indices = mapping["indices"]
+                self.mapping_weights = mapping["weights"]
+                return
+
+        k = min(self.number_of_neighbours, potential_coordinates.shape[0])
+        distances, indices = cKDTree(potential_coordinates).query(coordinates, k=k)
+        distances = distances.reshape(-1, k)
+        indices = indices.reshape(-1, k)
+
+        # Inverse distance weights, coincident nodes take the value of the closest node
+        coincident = distances[:, 0] <= self.coincidence_tolerance
+        weights = np.zeros_like(distances)
+        weights[coincident, 0] = 1.0
+        inverse_distances = 1.0 / distances[~coincident]
+        weights[~coincident] = inverse_distances / np.sum(inverse_distances, axis=1)[:, np.newaxis]
+
+        self.mapping_coordinates = coordinates
+        self.mapping_indices = indices
+        self.mapping_weights = weights
+        if self.mapping_file_name:
+            np.savez(self.mapping_file_name, coordinates=coordinates, potential_coordinates=potential_coordinates, indices=indices, weights=weights)
@@ -1,10 +1,11 @@
 import sys
 import time
 import importlib
-import math
 
 import KratosMultiphysics
 
+from node_locator import NodeLocator
+
 def CreateAnalysisStageWithFlushInstance(cls, global_model, parameters):
     class AnalysisStageWithFlush(cls):
 
@@ -14,18 +15,10 @@ def CreateAnalysisStageWithFlushInstance(cls, global_model, parameters):
             self.last_flush = time.time()
             sys.stdout.flush()
         
-        @classmethod
-        def distance_to_corner(cls, u: KratosMultiphysics.Node):
-            return (u.X - 0.6)**2 + (u.Y - 0.0)**2 + (u.Y - 0.0)**2
-
         def _find_lower_corner_node(self):
-            eps_2 = 1e-16
-            for node in self._GetSolver().GetComputingModelPart().Nodes:
-                if self.distance_to_corner(node) < eps_2:
-                    self._lower_corner_node = node.Id
-                    return
-            raise RuntimeError("Lower corner node not found")
-            
+            locator = NodeLocator(self._GetSolver().GetComputingModelPart())
+            self._lower_corner_node = locator.FindNodeId([0.6, 0.0, 0.0])
+
         def Initialize(self):
             super().Initialize()
             sys.stdout.flush()
@@ -39,25 +32,13 @@ def CreateAnalysisStageWithFlushInstance(cls, global_model, parameters):
             node.Fix(KratosMultiphysics.MOMENTUM_Y)
             super().InitializeSolutionStep()
             
-        def FinalizeSolutionStep(self):
-            super().FinalizeSolutionStep()
-            self.Flagg()
-    
-        def Flagg(self):
-            step = self._GetSolver().GetComputingModelPart().ProcessInfo.GetValue(KratosMultiphysics.STEP)
-            if  step > 1 :
-                e_totalEnergy = 0
-                n_totalEnergy = 0
-                for node in self._GetSolver().GetComputingModelPart().Nodes:
-                    e_totalEnergy = e_totalEnergy + (node.GetSolutionStepValue(KratosMultiphysics.TOTAL_ENERGY,1)-node.GetSolutionStepValue(KratosMultiphysics.TOTAL_ENERGY))**2
-                    n_totalEnergy = n_totalEnergy + (node.GetSolutionStepValue(KratosMultiphysics.TOTAL_ENERGY,1))**2 
+        def KeepAdvancingSolutionLoop(self):
+            # the monitor processes stop the simulation cleanly (e.g. NaN values or steady state)
+            for process in self._GetListOfProcesses():
+                if hasattr(process, "IsStopRequested") and process.IsStopRequested():
+                    return False
+            return super().KeepAdvancingSolutionLoop()
 
-                e_totalEnergy = (e_totalEnergy/n_totalEnergy)**0.5
-                
-                if math.isnan(e_totalEnergy):
-                    KratosMultiphysics.Logger.Print("               NaN value in TOTAL ENERGY EQUATION")
-                    sys.exit('               STOP')
-         
         def Flush(self):
             if self.parallel_type == "OpenMP":
                 now = time.time()
@@ -0,0 +1,28 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+import KratosMultiphysics
+
+
+class NodeLocator:
+    '''Finds the nodes of a model part from their coordinates.
+
+    The kd-tree of the initial coordinates is built once, so each look-up
+    is logarithmic in the number of nodes instead of a scan over all of them.
+    '''
+
+    def __init__(self, model_part):
+        self.model_part = model_part
+        coordinates = KratosMultiphysics.VariableUtils().GetInitialPositionsVector(model_part.Nodes, 3)
+        self.ids = np.array([node.Id for node in model_part.Nodes])
+        self.tree = cKDTree(np.array(coordinates).reshape(-1, 3))
+
+    def FindNodeId(self, point, tolerance=1e-8):
+        '''Return the id of the node closest to point, raising an error if it is farther than tolerance.'''
+        distance, index = self.tree.query(np.asarray(point, dtype=float))
+        if distance > tolerance:
+            raise RuntimeError("No node found at {} (closest node {} at distance {})".format(list(point), self.ids[index], distance))
+        return int(self.ids[index])
+
+    def FindNode(self, point, tolerance=1e-8):
+        return self.model_part.GetNode(self.FindNodeId(point, tolerance))
@@ -0,0 +1,105 @@
+import numpy as np
+
+import KratosMultiphysics as KM
+from KratosMultiphysics.restart_utility import RestartUtility
+
+def Factory(settings, model):
+    if not isinstance(settings, KM.Parameters):
+        raise Exception("expected input shall be a Parameters object, encapsulating a json string")
+    return SolutionMonitorProcess(model, settings["Parameters"])
+
+class SolutionMonitorProcess(KM.Process):
+    '''Watchdog of an explicit run based on the step-to-step change of the solution.
+
+    Every "stride" steps, the relative change ||x_n - x_n-1|| / ||x_n-1|| of each monitored
+    variable is computed with bulk operations over the nodes of the model part.
+    The run is stopped if a NaN or Inf value is found or, if a steady_state_tolerance
+    is set, once the change of all the variables is below it. The stop is requested to the
+    analysis stage (see IsStopRequested), which finishes the solution loop as usual, and
+    a restart file with the last state is written if write_checkpoint is true.
+    '''
+
+    @staticmethod
+    def GetDefaultParameters():
+        return KM.Parameters("""{
+            "model_part_name"        : "FluidModelPart",
+            "variables"              : ["DENSITY","MOMENTUM","TOTAL_ENERGY"],
+            "stride"                 : 1,
+            "steady_state_tolerance" : 0.0,
+            "write_checkpoint"       : true,
+            "checkpoint_folder"      : "checkpoint",
+            "echo_level"             : 0
+        }""")
+
+    def __init__(self, model, settings):
+        '''Constructor of SolutionMonitorProcess.'''
+        KM.Process.__init__(self)
+        settings.ValidateAndAssignDefaults(self.GetDefaultParameters())
+
+        self.model_part = model.GetModelPart(settings["model_part_name"].GetString())
+        self.variables = []
+        for variable_name in settings["variables"].GetStringArray():
+            variable_type = KM.KratosGlobals.GetVariableType(variable_name)
+            if variable_type not in ("Double", "Array"):
+                raise Exception("Variable " + variable_name + " is of type " + variable_type + ". Only Double and Array variables can be monitored.")
+            self.variables.append((variable_name, KM.KratosGlobals.GetVariable(variable_name), variable_type == "Array"))
+        self.stride = settings["stride"].GetInt()
+        if self.stride < 1:
+            raise Exception("The stride has to be at least 1!")
+        self.steady_state_tolerance = settings["steady_state_tolerance"].GetDouble()
+        self.write_checkpoint = settings["write_checkpoint"].GetBool()
+        self.checkpoint_folder = settings["checkpoint_folder"].GetString()
+        self.echo_level = settings["echo_level"].GetInt()
+
+        self.variable_utils = KM.VariableUtils()
+        self.stop_requested = False
+        self.stop_reason = ""
+        self.relative_changes = {}
+
+    def ExecuteFinalizeSolutionStep(self):
+        step = self.model_part.ProcessInfo[KM.STEP]
+        if step < 2 or step % self.stride != 0:
+            return
+
+        self.relative_changes = {name : self._ComputeRelativeChange(variable, is_array) for name, variable, is_array in self.variables}
+        if self.echo_level > 0:
+            changes = ", ".join("{}: {:.3e}".format(name, change) for name, change in self.relative_changes.items())
+            KM.Logger.PrintInfo("SolutionMonitorProcess", "Step {} relative change {}".format(step, changes))
+
+        non_finite = [name for name, change in self.relative_changes.items() if not np.isfinite(change)]
+        if non_finite:
+            self._RequestStop("NaN or Inf value in " + ", ".join(non_finite))
+        elif self.steady_state_tolerance > 0.0 and all(change < self.steady_state_tolerance for change in self.relative_changes.values()):
+            self._RequestStop("Steady state reached (relative change below {})".format(self.steady_state_tolerance))
+
+    def IsStopRequested(self):
+        return self.stop_requested
+
+    def _ComputeRelativeChange(self, variable, is_array):
+        nodes = self.model_part.Nodes
+        if is_array:
+            current = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, variable, 0, 3))
+            previous = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, variable, 1, 3))
+        else:
+            current = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, variable, 0))
+            previous = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, variable, 1))
+
+        data_comm = self.model_part.GetCommunicator().GetDataCommunicator()
+        error = data_comm.SumAll(float(np.sum((current - previous)**2)))
+        norm = data_comm.SumAll(float(np.sum(previous**2)))
+        if norm == 0.0:
+            return np.sqrt(error)
+        return np.sqrt(error / norm)
+
+    def _RequestStop(self, reason):
+        if self.stop_requested:
+            return
+        self.stop_requested = True
+        self.stop_reason = reason
+        KM.Logger.PrintWarning("SolutionMonitorProcess", "{} at time {}. Stopping the simulation.".format(reason, self.model_part.ProcessInfo[KM.TIME]))
+
+        if self.write_checkpoint:
+            restart_settings = KM.Parameters("""{}""")
+            restart_settings.AddEmptyValue("input_filename").SetString(self.model_part.Name)
+            restart_settings.AddEmptyValue("io_foldername").SetString(self.checkpoint_folder)
+            RestartUtility(self.model_part, restart_settings).SaveRestart()
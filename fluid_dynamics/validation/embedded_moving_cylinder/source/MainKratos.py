@@ -3,6 +3,8 @@ from __future__ import print_function, absolute_import, division #makes KratosMu
 import KratosMultiphysics
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
 
+from embedded_body_motion_utility import EmbeddedBodyMotionUtility
+
 import sys
 import time
 import math
@@ -32,6 +34,15 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
         cylinder_model_part.AddNodalSolutionStepVariable(KratosMultiphysics.DISPLACEMENT)
         KratosMultiphysics.ModelPartIO('cylinder', KratosMultiphysics.ModelPartIO.READ | KratosMultiphysics.ModelPartIO.SKIP_TIMER).ReadModelPart(cylinder_model_part)
 
+    def ModifyAfterSolverInitialize(self):
+        super(FluidDynamicsAnalysisWithFlush,self).ModifyAfterSolverInitialize()
+
+        # The band has to contain the nodes swept by the cylinder in one step (max. 0.084)
+        self.body_motion = EmbeddedBodyMotionUtility(
+            self._GetSolver().GetComputingModelPart(),
+            self.model.GetModelPart('CylinderModelPart'),
+            band_width = 0.1)
+
     def ApplyBoundaryConditions(self):
         # Clone the cylinder solution step data
         cylinder_model_part = self.model.GetModelPart('CylinderModelPart')
@@ -42,33 +53,17 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
         # Move the cylinder
         u_x = 0.8 * math.sin(2.0 * math.pi * (t - 0.75) / 3.0)
         v_x = (2.0 * math.pi / 3.0) * 0.8 * math.cos(2.0 * math.pi * (t - 0.75) / 3.0)
-        for node in cylinder_model_part.Nodes:
-            node.X = node.X0 + u_x
-            node.SetSolutionStepValue(KratosMultiphysics.VELOCITY, [v_x, 0.0, 0.0])
-            node.SetSolutionStepValue(KratosMultiphysics.DISPLACEMENT, [u_x, 0.0, 0.0])
+        self.body_motion.MoveSkin([u_x, 0.0, 0.0], [v_x, 0.0, 0.0])
 
-        # Update the level-set function
-        KratosMultiphysics.CalculateDistanceToSkinProcess2D(
-            self._GetSolver().GetComputingModelPart(),
-            cylinder_model_part).Execute()
+        # Update the level-set function in the band around the cylinder
+        self.body_motion.UpdateDistance()
 
         # Apply the rest of boundary conditions
         super(FluidDynamicsAnalysisWithFlush,self).ApplyBoundaryConditions()
 
         # Set the EMBEDDED_VELOCITY in the intersected elements
         # Note that this is done after the distance modification in the base ApplyBoundaryConditions
-        for elem in self._GetSolver().GetComputingModelPart().Elements:
-            n_pos = 0
-            n_neg = 0
-            for node in elem.GetNodes():
-                if (node.GetSolutionStepValue(KratosMultiphysics.DISTANCE) < 0):
-                    n_neg += 1
-                else:
-                    n_pos += 1
-            if (n_pos != 0 and n_neg != 0):
-                elem.SetValue(KratosMultiphysics.EMBEDDED_VELOCITY, [v_x, 0.0, 0.0])
-            else:
-                elem.SetValue(KratosMultiphysics.EMBEDDED_VELOCITY, [0.0, 0.0, 0.0])
+        self.body_motion.SetEmbeddedVelocity()
 
 
 if __name__ == "__main__":
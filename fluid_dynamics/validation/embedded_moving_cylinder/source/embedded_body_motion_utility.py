@@ -0,0 +1,140 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+import KratosMultiphysics
+
+
+class EmbeddedBodyMotionUtility:
+    '''Rigid motion of an embedded skin with a narrow band update of the level-set.
+
+    The skin nodes are moved in bulk with a rigid transform (translation plus a rotation
+    about the z axis) of their initial positions. After the first step, in which the
+    distance is computed in the complete fluid mesh, the CalculateDistanceToSkinProcess
+    is only executed in a sub model part with the elements around the old and the new
+    skin positions, as the sign of the distance does not change elsewhere.
+    The intersected elements are detected with array operations over the band.
+
+    Note that band_width has to be larger than the element size, than half the length
+    of the skin segments and than half the skin displacement in one step, so that the
+    band contains all the intersected elements and all the nodes that change side.
+    '''
+
+    def __init__(self, fluid_model_part, skin_model_part, band_width):
+        self.fluid_model_part = fluid_model_part
+        self.skin_model_part = skin_model_part
+        self.band_width = band_width
+        self.variable_utils = KratosMultiphysics.VariableUtils()
+
+        # Fluid mesh data, computed once (the fluid mesh does not move)
+        self.node_ids = np.array([node.Id for node in fluid_model_part.Nodes])
+        coordinates = np.array(self.variable_utils.GetCurrentPositionsVector(fluid_model_part.Nodes, 3)).reshape(-1, 3)
+        self.nodes_tree = cKDTree(coordinates[:, :2])
+        self.element_ids = np.array([elem.Id for elem in fluid_model_part.Elements])
+        element_node_ids = np.array([[node.Id for node in elem.GetNodes()] for elem in fluid_model_part.Elements])
+        self.element_nodes = np.searchsorted(self.node_ids, element_node_ids)
+
+        # Elements around each node (CSR)
+        nodes_per_element = self.element_nodes.shape[1]
+        flat_nodes = self.element_nodes.ravel()
+        order = np.argsort(flat_nodes, kind='stable')
+        self.node_elements = order // nodes_per_element
+        self.node_elements_offsets = np.zeros(len(self.node_ids) + 1, dtype=int)
+        np.cumsum(np.bincount(flat_nodes, minlength=len(self.node_ids)), out=self.node_elements_offsets[1:])
+
+        # Skin data
+        self.skin_initial_coordinates = np.array(self.variable_utils.GetInitialPositionsVector(skin_model_part.Nodes, 3)).reshape(-1, 3)
+        self.skin_coordinates = self.skin_initial_coordinates.copy()
+        self.previous_skin_coordinates = None
+
+        self.velocity = np.zeros(3)
+        self.angular_velocity = 0.0
+        self.rotation_center = np.zeros(3)
+
+        self.band_elements = np.empty(0, dtype=int)
+        self.band_model_part = None
+        self.cut_elements = np.empty(0, dtype=int)
+        self.variable_utils.SetNonHistoricalVariable(KratosMultiphysics.EMBEDDED_VELOCITY, KratosMultiphysics.Array3([0.0, 0.0, 0.0]), fluid_model_part.Elements)
+
+    def MoveSkin(self, displacement, velocity, rotation_angle=0.0, angular_velocity=0.0, rotation_center=[0.0, 0.0, 0.0]):
+        '''Move the skin nodes to R(rotation_angle) (X0 - c) + c + displacement and set their DISPLACEMENT and VELOCITY.'''
+        displacement = np.asarray(displacement, dtype=float)
+        velocity = np.asarray(velocity, dtype=float)
+        rotation_center = np.asarray(rotation_center, dtype=float)
+        self.angular_velocity = angular_velocity
+        self.velocity = velocity
+        self.rotation_center = rotation_center + displacement
+
+        cos = np.cos(rotation_angle)
+        sin = np.sin(rotation_angle)
+        relative_coordinates = self.skin_initial_coordinates - rotation_center
+        new_coordinates = relative_coordinates.copy()
+        new_coordinates[:, 0] = cos * relative_coordinates[:, 0] - sin * relative_coordinates[:, 1]
+        new_coordinates[:, 1] = sin * relative_coordinates[:, 0] + cos * relative_coordinates[:, 1]
+        new_coordinates += rotation_center + displacement
+
+        nodal_velocity = self._RigidVelocity(new_coordinates)
+
+        self.previous_skin_coordinates = self.skin_coordinates
+        self.skin_coordinates = new_coordinates
+        nodes = self.skin_model_part.Nodes
+        self.variable_utils.SetCurrentPositionsVector(nodes, KratosMultiphysics.Vector(new_coordinates.ravel()))
+        self.variable_utils.SetSolutionStepValuesVector(nodes, KratosMultiphysics.DISPLACEMENT, KratosMultiphysics.Vector((new_coordinates - self.skin_initial_coordinates).ravel()), 0)
+        self.variable_utils.SetSolutionStepValuesVector(nodes, KratosMultiphysics.VELOCITY, KratosMultiphysics.Vector(nodal_velocity.ravel()), 0)
+
+    def UpdateDistance(self):
+        '''Compute the level-set in the complete mesh (first call) or in the narrow band.'''
+        if not self.band_elements.size:
+            KratosMultiphysics.CalculateDistanceToSkinProcess2D(self.fluid_model_part, self.skin_model_part).Execute()
+            self.band_elements = self._BandElements(self.skin_coordinates)
+            self.band_model_part = self._CreateSubModelPart("NarrowBand", self.band_elements)
+        else:
+            self.band_elements = self._BandElements(np.r_[self.previous_skin_coordinates, self.skin_coordinates])
+            self.band_model_part = self._CreateSubModelPart("NarrowBand", self.band_elements)
+            KratosMultiphysics.CalculateDistanceToSkinProcess2D(self.band_model_part, self.skin_model_part).Execute()
+
+    def SetEmbeddedVelocity(self):
+        '''Set the rigid body velocity as EMBEDDED_VELOCITY of the intersected elements and zero in the rest.'''
+        # The nodes of the band sub model part are ordered by Id, as self.node_ids
+        band_nodes = np.unique(self.element_nodes[self.band_elements])
+        distance = np.array(self.variable_utils.GetSolutionStepValuesVector(self.band_model_part.Nodes, KratosMultiphysics.DISTANCE, 0))
+
+        # Elements with nodes on both sides of the skin
+        element_distance = distance[np.searchsorted(band_nodes, self.element_nodes[self.band_elements])]
+        n_neg = np.count_nonzero(element_distance < 0.0, axis=1)
+        is_cut = (n_neg != 0) & (n_neg != element_distance.shape[1])
+
+        zero = KratosMultiphysics.Array3([0.0, 0.0, 0.0])
+        self.variable_utils.SetNonHistoricalVariable(KratosMultiphysics.EMBEDDED_VELOCITY, zero, self._CreateSubModelPart("CutElements", self.cut_elements).Elements)
+        self.cut_elements = self.band_elements[is_cut]
+        cut_model_part = self._CreateSubModelPart("CutElements", self.cut_elements)
+        if self.angular_velocity == 0.0:
+            self.variable_utils.SetNonHistoricalVariable(KratosMultiphysics.EMBEDDED_VELOCITY, KratosMultiphysics.Array3(self.velocity.tolist()), cut_model_part.Elements)
+        else:
+            for elem in cut_model_part.Elements:
+                center = np.array(elem.GetGeometry().Center())
+                elem.SetValue(KratosMultiphysics.EMBEDDED_VELOCITY, self._RigidVelocity(center[np.newaxis, :])[0].tolist())
+
+    def _RigidVelocity(self, coordinates):
+        relative_coordinates = coordinates - self.rotation_center
+        rigid_velocity = np.tile(self.velocity, (coordinates.shape[0], 1))
+        rigid_velocity[:, 0] -= self.angular_velocity * relative_coordinates[:, 1]
+        rigid_velocity[:, 1] += self.angular_velocity * relative_coordinates[:, 0]
+        return rigid_velocity
+
+    def _BandElements(self, skin_coordinates):
+        band_nodes = np.unique(np.concatenate(
+            [np.asarray(nodes, dtype=int) for nodes in self.nodes_tree.query_ball_point(skin_coordinates[:, :2], self.band_width)]))
+        if not band_nodes.size:
+            raise Exception("The narrow band does not contain any node. Increase the band_width.")
+        starts = self.node_elements_offsets[band_nodes]
+        counts = self.node_elements_offsets[band_nodes + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return np.unique(self.node_elements[positions])
+
+    def _CreateSubModelPart(self, name, element_indices):
+        if self.fluid_model_part.HasSubModelPart(name):
+            self.fluid_model_part.RemoveSubModelPart(name)
+        model_part = self.fluid_model_part.CreateSubModelPart(name)
+        model_part.AddNodes(self.node_ids[np.unique(self.element_nodes[element_indices])].tolist())
+        model_part.AddElements(self.element_ids[element_indices].tolist())
+        return model_part
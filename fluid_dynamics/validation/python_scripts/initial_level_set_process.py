@@ -0,0 +1,163 @@
+import numpy as np
+
+import KratosMultiphysics as KM
+
+def Factory(settings, model):
+    if not isinstance(settings, KM.Parameters):
+        raise Exception("expected input shall be a Parameters object, encapsulating a json string")
+    return InitialLevelSetProcess(model, settings["Parameters"])
+
+class InitialLevelSetProcess(KM.Process):
+    '''Set an initial level-set from a CSG description of the negative (e.g. water) region.
+
+    The shape is a tree of primitives combined with unions, intersections and differences.
+    It is evaluated for all the nodes at once with array operations, and the fixities
+    of the regions listed in "fixities" are applied in the same pass.
+
+    Primitives (the coordinates are 2D or 3D, only the given components are used):
+        {"type" : "box", "min_point" : [...], "max_point" : [...]}
+            max over the axes of the distance to the faces, null for an unbounded side
+        {"type" : "sphere", "center" : [...], "radius" : r}
+        {"type" : "half_space", "point" : [...], "normal" : [...]}
+            negative in the side opposite to the normal
+        {"type" : "polyline", "points" : [[h0, v0], [h1, v1], ...], "horizontal_axis" : 0, "vertical_axis" : 1}
+            vertical distance to a free surface given as a polyline, negative below it
+        {"type" : "cosine", "mean_level" : m, "amplitude" : a, "wave_number" : k, "origin" : h0,
+         "horizontal_range" : [null, h1], "horizontal_axis" : 0, "vertical_axis" : 1}
+            vertical distance to the free surface m + a cos(k (h - h0)), negative below it.
+            Outside the horizontal_range (null for an unbounded side) the level of its end is kept
+    Operations:
+        {"type" : "union", "shapes" : [...]}, {"type" : "intersection", "shapes" : [...]}
+        {"type" : "difference", "shapes" : [a, b]}, {"type" : "complement", "shapes" : [a]}
+    '''
+
+    @staticmethod
+    def GetDefaultParameters():
+        return KM.Parameters("""{
+            "model_part_name" : "",
+            "variable_name"   : "DISTANCE",
+            "shape"           : {},
+            "sign_only"       : false,
+            "fixities"        : []
+        }""")
+
+    def __init__(self, model, settings):
+        '''Constructor of InitialLevelSetProcess.
+
+        A fixity is given as {"shape" : {...}, "variables" : ["VELOCITY_X", ...]}
+        and applied to the nodes with a negative value of its shape.
+        If sign_only is true, the variable is set to -1 in the shape and 1 elsewhere.
+        '''
+        KM.Process.__init__(self)
+        settings.ValidateAndAssignDefaults(self.GetDefaultParameters())
+
+        self.model_part = model.GetModelPart(settings["model_part_name"].GetString())
+        self.variable = KM.KratosGlobals.GetVariable(settings["variable_name"].GetString())
+        self.shape = settings["shape"]
+        self.sign_only = settings["sign_only"].GetBool()
+        self.fixities = settings["fixities"]
+
+    def ExecuteInitialize(self):
+        ApplyInitialLevelSet(self.model_part, self.variable, self.shape, self.sign_only, self.fixities)
+
+
+def ApplyInitialLevelSet(model_part, variable, shape, sign_only=False, fixities=None):
+    '''Evaluate the shape at the nodes, set the variable and apply the fixities.'''
+    variable_utils = KM.VariableUtils()
+    coordinates = np.array(variable_utils.GetCurrentPositionsVector(model_part.Nodes, 3)).reshape(-1, 3)
+
+    distance = EvaluateShape(shape, coordinates)
+    if sign_only:
+        distance = np.where(distance < 0.0, -1.0, 1.0)
+    variable_utils.SetSolutionStepValuesVector(model_part.Nodes, variable, KM.Vector(distance), 0)
+
+    if fixities is None or fixities.size() == 0:
+        return
+    node_ids = np.array([node.Id for node in model_part.Nodes])
+    for i in range(fixities.size()):
+        fixity = fixities[i]
+        fixed_ids = node_ids[EvaluateShape(fixity["shape"], coordinates) < 0.0]
+        if model_part.HasSubModelPart("InitialLevelSetFixity"):
+            model_part.RemoveSubModelPart("InitialLevelSetFixity")
+        fixity_model_part = model_part.CreateSubModelPart("InitialLevelSetFixity")
+        fixity_model_part.AddNodes(fixed_ids.tolist())
+        for variable_name in fixity["variables"].GetStringArray():
+            _FixNodes(fixity_model_part, KM.KratosGlobals.GetVariable(variable_name))
+        model_part.RemoveSubModelPart("InitialLevelSetFixity")
+
+
+def _FixNodes(model_part, variable):
+    if model_part.NumberOfNodes() == 0:
+        return
+    if next(iter(model_part.Nodes)).HasDofFor(variable):
+        KM.VariableUtils().ApplyFixity(variable, True, model_part.Nodes)
+    else:
+        # Fix adds the dof if the variable is not a dof yet (e.g. called before adding the dofs)
+        for node in model_part.Nodes:
+            node.Fix(variable)
+
+
+def EvaluateShape(shape, coordinates):
+    '''Return the level-set of the shape (Parameters) at the (number of points x 3) coordinates.'''
+    shape_type = shape["type"].GetString()
+    if shape_type in _OPERATIONS:
+        if shape["shapes"].size() == 0:
+            raise Exception("The operation '{}' needs at least one shape".format(shape_type))
+        values = [EvaluateShape(shape["shapes"][i], coordinates) for i in range(shape["shapes"].size())]
+        return _OPERATIONS[shape_type](values)
+    if shape_type in _PRIMITIVES:
+        return _PRIMITIVES[shape_type](shape, coordinates)
+    raise Exception("Unknown shape type '{}'. Available ones are: {}".format(shape_type, list(_PRIMITIVES) + list(_OPERATIONS)))
+
+
+def _Box(shape, coordinates):
+    distance = np.full(coordinates.shape[0], -np.inf)
+    for axis in range(shape["min_point"].size()):
+        if not shape["min_point"][axis].IsNull():
+            distance = np.maximum(distance, shape["min_point"][axis].GetDouble() - coordinates[:, axis])
+        if not shape["max_point"][axis].IsNull():
+            distance = np.maximum(distance, coordinates[:, axis] - shape["max_point"][axis].GetDouble())
+    return distance
+
+def _Sphere(shape, coordinates):
+    center = shape["center"].GetVector()
+    return np.linalg.norm(coordinates[:, :len(center)] - np.array(center), axis=1) - shape["radius"].GetDouble()
+
+def _HalfSpace(shape, coordinates):
+    point = np.array(shape["point"].GetVector())
+    normal = np.array(shape["normal"].GetVector())
+    return (coordinates[:, :len(point)] - point) @ (normal / np.linalg.norm(normal))
+
+def _Polyline(shape, coordinates):
+    points = np.array([shape["points"][i].GetVector() for i in range(shape["points"].size())])
+    horizontal_axis = shape["horizontal_axis"].GetInt() if shape.Has("horizontal_axis") else 0
+    vertical_axis = shape["vertical_axis"].GetInt() if shape.Has("vertical_axis") else 1
+    order = np.argsort(points[:, 0])
+    level = np.interp(coordinates[:, horizontal_axis], points[order, 0], points[order, 1])
+    return coordinates[:, vertical_axis] - level
+
+def _Cosine(shape, coordinates):
+    horizontal_axis = shape["horizontal_axis"].GetInt() if shape.Has("horizontal_axis") else 0
+    vertical_axis = shape["vertical_axis"].GetInt() if shape.Has("vertical_axis") else 1
+    horizontal = coordinates[:, horizontal_axis]
+    if shape.Has("horizontal_range"):
+        bounds = [None if shape["horizontal_range"][i].IsNull() else shape["horizontal_range"][i].GetDouble() for i in range(2)]
+        horizontal = np.clip(horizontal, bounds[0], bounds[1])
+    origin = shape["origin"].GetDouble() if shape.Has("origin") else 0.0
+    level = shape["mean_level"].GetDouble() + shape["amplitude"].GetDouble() * np.cos(shape["wave_number"].GetDouble() * (horizontal - origin))
+    return coordinates[:, vertical_axis] - level
+
+_PRIMITIVES = {
+    "box"        : _Box,
+    "sphere"     : _Sphere,
+    "half_space" : _HalfSpace,
+    "polyline"   : _Polyline,
+    "cosine"     : _Cosine
+}
+
+_OPERATIONS = {
+    "union"        : lambda values: np.minimum.reduce(values),
+    "intersection" : lambda values: np.maximum.reduce(values),
+    "difference"   : lambda values: np.maximum.reduce([values[0]] + [-value for value in values[1:]]),
+    "complement"   : lambda values: -values[0]
+}
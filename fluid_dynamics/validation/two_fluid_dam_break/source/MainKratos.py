@@ -5,9 +5,13 @@ import KratosMultiphysics.FluidDynamicsApplication
 
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
 
+import os
 import sys
 import time
 
+sys.path.append(os.path.join('..','..'))
+from python_scripts.initial_level_set_process import ApplyInitialLevelSet
+
 # Hierarchy of classes: (>> = inherits to)
 # PythonSolver >> FluidSolver >> NavierStokesTwoFluidsSolver
 # AnalysisStage >> FluidDynamicsAnalysis >> FluidDynamicsAnalysisWithFlush( to redefine individual functions )
@@ -30,11 +34,17 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
 
         # Description of the case can be found e.g. in:
         # Larese, Rossi, Onate, Idelsohn: Validation of the particle finite element method (PFEM) for simulation of free surface flow, 2008
-        for node in self._GetSolver().GetComputingModelPart().Nodes:
-            d_z = abs(node.Z) - H
-            d_x = abs(node.X - OffsetX) - L
-            distance = max(d_x,d_z)
-            node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, distance)
+        # The water body is the box |X - OffsetX| < L, |Z| < H (unbounded in Y)
+        water_body = KratosMultiphysics.Parameters("""{
+            "type"      : "box",
+            "min_point" : [0.0, null, 0.0],
+            "max_point" : [0.0, null, 0.0]
+        }""")
+        water_body["min_point"][0].SetDouble(OffsetX - L)
+        water_body["max_point"][0].SetDouble(OffsetX + L)
+        water_body["min_point"][2].SetDouble(-H)
+        water_body["max_point"][2].SetDouble(H)
+        ApplyInitialLevelSet(self._GetSolver().GetComputingModelPart(), KratosMultiphysics.DISTANCE, water_body)
 
     # Extension of the function FinalizeSolutionStep() to force writing of buffered output
     def FinalizeSolutionStep(self):
@@ -6,9 +6,14 @@ import KratosMultiphysics.FluidDynamicsApplication
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
 from math import pi, cos
 
+import os
+import json
 import sys
 import time
 
+sys.path.append(os.path.join('..','..'))
+from python_scripts.initial_level_set_process import ApplyInitialLevelSet
+
 # Hierarchy of classes: (>> = inherits to)
 # PythonSolver >> FluidSolver >> NavierStokesTwoFluidsSolver
 # AnalysisStage >> FluidDynamicsAnalysis >> FluidDynamicsAnalysisWithFlush( to redefine individual functions )
@@ -26,16 +31,15 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
         init_h = 1.7    # height of water at rest
         wave_h = 0.8    # height of the wave
 
-        for node in self._GetSolver().GetComputingModelPart().Nodes:
-            if ( node.X < pi/2 ):
-                # "inside" the region of the initial wave
-                waterlevel = init_h + 0.5 * wave_h * ( cos(2.0*node.X) + 1.0 )
-            else:
-                # "outside" the region of the initial wave
-                waterlevel = init_h
-
-            distance = node.Y - waterlevel
-            node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, distance)
+        # The free surface is the initial wave init_h + 0.5 * wave_h * ( cos(2.0*X) + 1.0 ) for X < pi/2,
+        # followed by the water at rest (the level at X = pi/2 is kept beyond it)
+        free_surface = KratosMultiphysics.Parameters(json.dumps({
+            "type" : "cosine",
+            "mean_level" : init_h + 0.5 * wave_h,
+            "amplitude" : 0.5 * wave_h,
+            "wave_number" : 2.0,
+            "horizontal_range" : [None, pi/2]}))
+        ApplyInitialLevelSet(self._GetSolver().GetComputingModelPart(), KratosMultiphysics.DISTANCE, free_surface)
 
     # Extension of the function FinalizeSolutionStep() to force writing of buffered output
     def FinalizeSolutionStep(self):
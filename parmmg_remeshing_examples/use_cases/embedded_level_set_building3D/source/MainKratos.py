@@ -1,4 +1,5 @@
 import os
+import numpy as np
 #Kratos Imports
 import KratosMultiphysics
 import KratosMultiphysics.mpi as KratosMPI
@@ -77,68 +78,45 @@ class Remesher():
             raise(Exception("skin_building.mdpa not found. Please check that you have unzipped the file skin_building.zip"))
 
     def InitializeGeometry(self):
+        # The linear solver, the Epetra communicator and the processes are created once and reused in all the cycles.
+        # The processes executed after ParMmg read the current entities of the model part, and the variational distance
+        # process is cleared after each remeshing so it regenerates its auxiliary model part from the new mesh.
+        self._CreateRemeshingTools()
+        max_number_of_cycles = self.remeshing_parameters["number_of_iterations"].GetInt()
+        metric_change_tolerance = self.remeshing_parameters["metric_change_tolerance"].GetDouble()
+        output_stride = self.remeshing_parameters["output_stride"].GetInt()
+
         # Computing continuous distance required to compute the metric (only on intersected elements)
-        tolerance = 1e-12
-        calculate_distance_process = KratosMultiphysics.CalculateDistanceToSkinProcess3D(
-                self.main_model_part,
-                self.skin_model_part, tolerance)
-        calculate_distance_process.Execute()
+        self._CalculateDistanceToSkin()
 
-        for step in range(1, self.remeshing_parameters["number_of_iterations"].GetInt() + 1):
+        previous_complexity = None
+        for step in range(1, max_number_of_cycles + 1):
             # Computing distance far away from the body (extending previous computed distance)
-            linear_solver_settings=KratosMultiphysics.Parameters("""
-            {
-                "solver_type": "amgcl",
-                "max_iteration": 400,
-                "gmres_krylov_space_dimension": 100,
-                "smoother_type":"ilu0",
-                "coarsening_type":"smoothed_aggregation",
-                "coarse_enough" : 5000,
-                "krylov_type": "lgmres",
-                "tolerance": 1e-9,
-                "verbosity": 0,
-                "scaling": false
-            }""")
-
-            linear_solver = trilinos_linear_solver_factory.ConstructSolver(linear_solver_settings)
-            maximum_iterations = 1
-            EpetraCommunicator = TrilinosApplication.CreateCommunicator()
-
-            variational_distance_process = TrilinosApplication.TrilinosVariationalDistanceCalculationProcess3D(
-                EpetraCommunicator,
-                self.main_model_part,
-                linear_solver,
-                maximum_iterations,
-                KratosMultiphysics.VariationalDistanceCalculationProcess3D.CALCULATE_EXACT_DISTANCES_TO_PLANE.AsFalse(),
-                "aux_model_part"+str(step)
-            )
-            variational_distance_process.Execute()
+            self.variational_distance_process.Execute()
 
             # Computing gradient and nodal_h required to compute the metric
-            local_gradient = KratosMultiphysics.ComputeNodalGradientProcess3D(self.main_model_part,
-                KratosMultiphysics.DISTANCE,
-                KratosMultiphysics.DISTANCE_GRADIENT,
-                KratosMultiphysics.NODAL_AREA)
-            local_gradient.Execute()
-
-            find_nodal_h = KratosMultiphysics.FindNodalHNonHistoricalProcess(self.main_model_part)
-            find_nodal_h.Execute()
+            self.local_gradient.Execute()
+            self.find_nodal_h.Execute()
 
             # GiD output for visualization purposes
-            self._OutputToGid('embedded_distance_field_'+str(step))
+            if output_stride > 0 and step % output_stride == 0:
+                self._OutputToGid('embedded_distance_field_'+str(step))
 
             # Compute the metric accorind to the distance computed (level-set)
-            metric_parameters = self.remeshing_parameters["metric_parameters"]
-            metric_process = KratosMultiphysics.MeshingApplication.ComputeLevelSetSolMetricProcess3D(
-                self.main_model_part,
-                KratosMultiphysics.DISTANCE_GRADIENT,
-                metric_parameters)
-            metric_process.Execute()
+            self.metric_process.Execute()
+
+            # Stop once the metric does not change, as the next mesh would be the same. The check is done before ParMmg,
+            # so the last metric is not used: the current mesh was built from the previous one, which is within the tolerance
+            complexity = self._ComputeMetricComplexity()
+            if previous_complexity is not None:
+                metric_change = abs(complexity - previous_complexity) / previous_complexity
+                KratosMultiphysics.Logger.PrintInfo("Remesher", "Cycle {}: relative change of the metric complexity {:.3e}".format(step, metric_change))
+                if metric_change < metric_change_tolerance:
+                    break
+            previous_complexity = complexity
 
             # Call ParMmg
-            parmmg_parameters = self.remeshing_parameters["parmmg_parameters"]
-            parmmg_process = KratosMultiphysics.MeshingApplication.ParMmgProcess3D(self.main_model_part, parmmg_parameters)
-            parmmg_process.Execute()
+            self.parmmg_process.Execute()
 
             # Verify the orientation of the new mesh and compute normals
             tmoc = KratosMultiphysics.TetrahedralMeshOrientationCheck
@@ -147,13 +125,11 @@ class Remesher():
             flags |= tmoc.ASSIGN_NEIGHBOUR_ELEMENTS_TO_CONDITIONS
             KratosMultiphysics.TetrahedralMeshOrientationCheck(self.main_model_part,throw_errors, flags).Execute()
 
-            # Computing continuous distance required to compute the metric (only on intersected elements)
-            tolerance = 1e-12
-            calculate_distance_process = KratosMultiphysics.CalculateDistanceToSkinProcess3D(
-                    self.main_model_part,
-                    self.skin_model_part, tolerance)
-            calculate_distance_process.Execute()
+            # The auxiliary model part of the variational distance refers to the previous mesh
+            self.variational_distance_process.Clear()
 
+            # Computing continuous distance required to compute the metric (only on intersected elements)
+            self._CalculateDistanceToSkin()
 
         self._OutputToGid('final_remeshed_embedded_distance_field')
 
@@ -163,6 +139,67 @@ class Remesher():
             self.skin_model_part)
         calculate_distance_process.Execute()
 
+    def _CreateRemeshingTools(self):
+        linear_solver_settings=KratosMultiphysics.Parameters("""
+        {
+            "solver_type": "amgcl",
+            "max_iteration": 400,
+            "gmres_krylov_space_dimension": 100,
+            "smoother_type":"ilu0",
+            "coarsening_type":"smoothed_aggregation",
+            "coarse_enough" : 5000,
+            "krylov_type": "lgmres",
+            "tolerance": 1e-9,
+            "verbosity": 0,
+            "scaling": false
+        }""")
+
+        self.linear_solver = trilinos_linear_solver_factory.ConstructSolver(linear_solver_settings)
+        maximum_iterations = 1
+        self.epetra_communicator = TrilinosApplication.CreateCommunicator()
+
+        self.variational_distance_process = TrilinosApplication.TrilinosVariationalDistanceCalculationProcess3D(
+            self.epetra_communicator,
+            self.main_model_part,
+            self.linear_solver,
+            maximum_iterations,
+            KratosMultiphysics.VariationalDistanceCalculationProcess3D.CALCULATE_EXACT_DISTANCES_TO_PLANE.AsFalse(),
+            "aux_model_part"
+        )
+
+        self.local_gradient = KratosMultiphysics.ComputeNodalGradientProcess3D(self.main_model_part,
+            KratosMultiphysics.DISTANCE,
+            KratosMultiphysics.DISTANCE_GRADIENT,
+            KratosMultiphysics.NODAL_AREA)
+
+        self.find_nodal_h = KratosMultiphysics.FindNodalHNonHistoricalProcess(self.main_model_part)
+
+        self.metric_process = KratosMultiphysics.MeshingApplication.ComputeLevelSetSolMetricProcess3D(
+            self.main_model_part,
+            KratosMultiphysics.DISTANCE_GRADIENT,
+            self.remeshing_parameters["metric_parameters"])
+
+        self.parmmg_process = KratosMultiphysics.MeshingApplication.ParMmgProcess3D(self.main_model_part, self.remeshing_parameters["parmmg_parameters"])
+
+    def _CalculateDistanceToSkin(self):
+        tolerance = 1e-12
+        calculate_distance_process = KratosMultiphysics.CalculateDistanceToSkinProcess3D(
+                self.main_model_part,
+                self.skin_model_part, tolerance)
+        calculate_distance_process.Execute()
+
+    def _ComputeMetricComplexity(self):
+        # Integral of sqrt(det(M)), which is proportional to the number of elements of the mesh requested by the metric
+        # The VariableUtils do not read array_1d<double,6> variables, so the metric is read with a tensor adaptor
+        local_nodes = self.main_model_part.GetCommunicator().LocalMesh().Nodes
+        metric_adaptor = KratosMultiphysics.TensorAdaptors.VariableTensorAdaptor(local_nodes, KratosMultiphysics.MeshingApplication.METRIC_TENSOR_3D)
+        metric_adaptor.CollectData()
+        m = np.array(metric_adaptor.data).reshape(-1, 6).T
+        nodal_area = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(local_nodes, KratosMultiphysics.NODAL_AREA, 0))
+        det = m[0]*(m[1]*m[2] - m[4]*m[4]) - m[3]*(m[3]*m[2] - m[4]*m[5]) + m[5]*(m[3]*m[4] - m[1]*m[5])
+        complexity = float(np.sum(np.sqrt(np.maximum(det, 0.0)) * nodal_area))
+        return self.main_model_part.GetCommunicator().GetDataCommunicator().SumAll(complexity)
+
     def _OutputToGid(self, file_name):
         gid_output = GiDOutputProcess(
             self.main_model_part,
@@ -17,15 +17,16 @@ import KratosMultiphysics.PFEM2Application.pfem_2_solver_monolithic_fluid as pfe
 
 pfem_2_solver.AddVariables(model_part)
 
+import os
+import sys
+sys.path.append(os.path.join('..'))
+sys.path.append(os.path.join('..','..','..','fluid_dynamics','validation'))
+from python_scripts.initial_level_set_process import ApplyInitialLevelSet
+from python_scripts.asynchronous_output import AsynchronousVtkOutput
+
 from math import sqrt
 from math import sin
 from math import cos
- #now we proceed to use the GID interface (both to import the infomation inside the .mdpa file and later print the results in a file
-gid_mode = GiDPostMode.GiD_PostBinary  #we import the python file that includes the commands that we need
-multifile = MultiFileFlag.SingleFile #MultipleFiles
-deformed_mesh_flag = WriteDeformedMeshFlag.WriteUndeformed
-write_conditions = WriteConditionsFlag.WriteElementsOnly
-gid_io = GidIO("results_monolithic",gid_mode,multifile,deformed_mesh_flag,write_conditions)
 
 model_part_io = ModelPartIO("obstacle_monolithic")             # we set the name of the .mdpa file
 model_part_io.ReadModelPart(model_part)         # we load the info from the .mdpa
@@ -41,35 +42,42 @@ model_part.ProcessInfo.SetValue(GRAVITY_Y, -9.8);
 
 pi=3.14159
 
-for node in model_part.Nodes:
-    node.Free(VELOCITY_X)
-    node.Free(VELOCITY_Y)
-    node.SetSolutionStepValue(DISTANCE,0,1.0)
-    if ((node.Y)<0.292 and node.X<0.146):
-        node.SetSolutionStepValue(DISTANCE,0,-1.0) #piscina
-    if node.X>0.583999 or node.X<0.0001:
-        node.Fix(VELOCITY_X)
-        # node.Fix(DISTANCE)
-        # node.SetSolutionStepValue(DISTANCE,-0.1)
-    if node.Y<0.001 or node.Y>0.583999:
-        node.Fix(VELOCITY_Y)
-
-    if node.Y>0.499:
-        node.Fix(VELOCITY_Y)
-        node.Fix(DISTANCE)
-        node.SetSolutionStepValue(DISTANCE,0,1.0)
-
-    if node.Y>0.57:
-        node.Fix(DISTANCE)
-
-    if node.X>0.2919 and node.X<0.2921 and node.Y<0.0481:
-        node.Fix(VELOCITY_X)
-    if node.X>0.3159 and node.X<0.3161 and node.Y<0.0481:
-        node.Fix(VELOCITY_X)
-    if node.X>0.2919 and node.X<0.3161 and node.Y<0.0481 and node.Y>0.0479:
-        node.Fix(VELOCITY_Y)
-    node.SetSolutionStepValue(BODY_FORCE_Y,0,-9.8)
-    node.SetSolutionStepValue(PRESS_PROJ_Y,0,-9.8)
+# Water column (DISTANCE=-1) and fixities, declared as regions and evaluated for all the nodes at once
+level_set_settings = Parameters("""{
+    "shape" : {
+        "type"      : "box",
+        "min_point" : [null, null],
+        "max_point" : [0.146, 0.292]
+    },
+    "fixities" : [{
+        "variables" : ["VELOCITY_X"],
+        "shape"     : {"type" : "union", "shapes" : [
+            {"type" : "half_space", "point" : [0.583999, 0.0], "normal" : [-1.0, 0.0]},
+            {"type" : "half_space", "point" : [0.0001, 0.0],   "normal" : [1.0, 0.0]}
+        ]}
+    },{
+        "variables" : ["VELOCITY_Y"],
+        "shape"     : {"type" : "union", "shapes" : [
+            {"type" : "half_space", "point" : [0.0, 0.583999], "normal" : [0.0, -1.0]},
+            {"type" : "half_space", "point" : [0.0, 0.001],    "normal" : [0.0, 1.0]}
+        ]}
+    },{
+        "variables" : ["VELOCITY_Y", "DISTANCE"],
+        "shape"     : {"type" : "half_space", "point" : [0.0, 0.499], "normal" : [0.0, -1.0]}
+    },{
+        "variables" : ["VELOCITY_X"],
+        "shape"     : {"type" : "union", "shapes" : [
+            {"type" : "box", "min_point" : [0.2919, null], "max_point" : [0.2921, 0.0481]},
+            {"type" : "box", "min_point" : [0.3159, null], "max_point" : [0.3161, 0.0481]}
+        ]}
+    },{
+        "variables" : ["VELOCITY_Y"],
+        "shape"     : {"type" : "box", "min_point" : [0.2919, 0.0479], "max_point" : [0.3161, 0.0481]}
+    }]
+}""")
+ApplyInitialLevelSet(model_part, DISTANCE, level_set_settings["shape"], sign_only=True, fixities=level_set_settings["fixities"])
+VariableUtils().SetVariable(BODY_FORCE_Y, -9.8, model_part.Nodes)
+VariableUtils().SetVariable(PRESS_PROJ_Y, -9.8, model_part.Nodes)
 
 
 
@@ -90,14 +98,8 @@ solver.time_order = 1
 solver.echo_level = 3
 solver.Initialize()
 
-mesh_name = 0.0
-gid_io.InitializeMesh( mesh_name );
-gid_io.WriteMesh((model_part).GetMesh());
-
-gid_io.FinalizeMesh()
-
-
-gid_io.InitializeResults(mesh_name,(model_part).GetMesh())
+# The results are written to VTK files by a background thread, so the solver does not wait for them
+output = AsynchronousVtkOutput(model_part, ["VELOCITY", "PRESSURE", "DISTANCE", "PRESS_PROJ", "PROJECTED_VELOCITY"], "results_monolithic", max_pending=4, policy="block", domain_size=domain_size)
 
 
 nsteps=200
@@ -106,10 +108,7 @@ out=0
 out_step=2
 
 
-gid_io.WriteNodalResults(DISTANCE,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(YP,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(VELOCITY,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(PRESSURE,model_part.Nodes,0,0)
+output.Write(0.0, variables=["DISTANCE", "YP", "VELOCITY", "PRESSURE"])
 
 import time as timer
 t1 = timer.time()
@@ -134,15 +133,7 @@ for step in range(1,nsteps):
             node.SetSolutionStepValue(VELOCITY_Y,0,0.0)
     if out==out_step:
         out=0
-        print("printing a step")
-
-        gid_io.WriteNodalResults(VELOCITY,model_part.Nodes,time,0)
-        gid_io.WriteNodalResults(PRESSURE,model_part.Nodes,time,0)
-        gid_io.WriteNodalResults(DISTANCE,model_part.Nodes,time,0)
-        gid_io.WriteNodalResults(PRESS_PROJ,model_part.Nodes,time,0)
-        gid_io.WriteNodalResults(PROJECTED_VELOCITY,model_part.Nodes,time,0)
-        gid_io.Flush()
-    print("Time in simulation: ",time," s")
+        output.Write(time)
 
 
 t2=timer.time()
@@ -150,4 +141,4 @@ total_time=t2-t1
 
 print ("total_time", total_time)
 
-gid_io.FinalizeResults()
+output.Finalize()
@@ -0,0 +1,144 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+import KratosMultiphysics as KM
+
+class AsynchronousVtkOutput:
+    '''Write nodal results to VTK files in the background, for the hand-written time loops.
+
+    The mesh is captured (and encoded) once. At each Write, the selected variables are copied in bulk to
+    arrays (the snapshot) and the file is written by a background thread or process, so the
+    solver continues immediately. The mesh does not move (Eulerian PFEM2 mesh).
+
+    At most max_pending snapshots are kept in memory. When a Write finds them all pending,
+    the backpressure policy decides:
+        "block"          waits until the oldest one is written
+        "skip"           discards the new snapshot
+        "discard_oldest" discards the oldest snapshot which is not being written yet (or blocks if all are)
+
+    The files are output_name_<label>.vtk, and output_name.vtk.series lists them with their times.
+    '''
+
+    _CELL_TYPES = {(2, 2): 3, (2, 3): 5, (2, 4): 9, (3, 2): 3, (3, 3): 5, (3, 4): 10, (3, 8): 12}
+
+    def __init__(self, model_part, variables, output_name, max_pending=4, policy="block", use_process=False, domain_size=None):
+        if policy not in ("block", "skip", "discard_oldest"):
+            raise Exception("Unknown backpressure policy '{}'. Available ones are: block, skip, discard_oldest".format(policy))
+        if max_pending < 1:
+            raise Exception("The max_pending has to be at least 1!")
+        self.model_part = model_part
+        self.variables = [self._GetVariableData(variable) for variable in variables]
+        self.output_name = output_name
+        self.max_pending = max_pending
+        self.policy = policy
+        self.variable_utils = KM.VariableUtils()
+
+        if domain_size is None:
+            domain_size = model_part.ProcessInfo[KM.DOMAIN_SIZE]
+        self.num_nodes = model_part.NumberOfNodes()
+        self.mesh = self._EncodeMesh(domain_size)
+        self.executor = ProcessPoolExecutor(max_workers=1) if use_process else ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+        self.series = []
+        self.num_writes = 0
+        self.num_skipped = 0
+
+    def Write(self, time, label=None, variables=None):
+        '''Take a snapshot of the variables (by default, the ones of the constructor) and write it in the background.'''
+        variables = self.variables if variables is None else [self._GetVariableData(variable) for variable in variables]
+        label = self.num_writes if label is None else label
+        self.num_writes += 1
+
+        # The written snapshots are released, raising the exception of a failed write
+        for future, _ in self.pending:
+            if future.done():
+                future.result()
+        self.pending = [(future, entry) for future, entry in self.pending if not future.done()]
+        if len(self.pending) >= self.max_pending and not self._MakeRoom():
+            self.num_skipped += 1
+            return False
+
+        nodes = self.model_part.Nodes
+        point_data = []
+        for name, variable, dimension in variables:
+            if dimension == 1:
+                values = self.variable_utils.GetSolutionStepValuesVector(nodes, variable, 0)
+            else:
+                values = self.variable_utils.GetSolutionStepValuesVector(nodes, variable, 0, dimension)
+            point_data.append((name, np.array(values).reshape(-1, dimension)))
+
+        file_name = "{}_{}.vtk".format(self.output_name, label)
+        entry = {"name" : os.path.basename(file_name), "time" : time}
+        self.pending.append((self.executor.submit(_WriteVtk, file_name, self.mesh, self.num_nodes, point_data), entry))
+        self.series.append(entry)
+        return True
+
+    def Finalize(self):
+        '''Wait for the pending snapshots and write the series file.'''
+        self.executor.shutdown(wait=True)
+        for future, _ in self.pending:
+            future.result()
+        self.pending = []
+        with open(self.output_name + ".vtk.series", 'w') as series_file:
+            json.dump({"file-series-version" : "1.0", "files" : self.series}, series_file, indent=2)
+        if self.num_skipped:
+            KM.Logger.PrintWarning("AsynchronousVtkOutput", "{} snapshots were skipped by the backpressure policy".format(self.num_skipped))
+
+    def _MakeRoom(self):
+        if self.policy == "skip":
+            return False
+        if self.policy == "discard_oldest":
+            for i, (future, entry) in enumerate(self.pending):
+                if future.cancel():
+                    del self.pending[i]
+                    self.series.remove(entry)
+                    self.num_skipped += 1
+                    return True
+        # Block until the oldest snapshot is written
+        self.pending.pop(0)[0].result()
+        return True
+
+    def _EncodeMesh(self, domain_size):
+        coordinates = np.array(self.variable_utils.GetCurrentPositionsVector(self.model_part.Nodes, 3)).reshape(-1, 3)
+        node_ids = np.array([node.Id for node in self.model_part.Nodes])
+        element_node_ids = np.array([[node.Id for node in element.GetNodes()] for element in self.model_part.Elements])
+        num_element_nodes = element_node_ids.shape[1]
+        if (domain_size, num_element_nodes) not in self._CELL_TYPES:
+            raise Exception("Elements with {} nodes in {}D are not supported".format(num_element_nodes, domain_size))
+        connectivity = np.searchsorted(node_ids, element_node_ids)
+        num_cells = len(connectivity)
+        cells = np.column_stack((np.full(num_cells, num_element_nodes), connectivity))
+
+        return b"".join([
+            "# vtk DataFile Version 3.0\nKratos PFEM2 results\nBINARY\nDATASET UNSTRUCTURED_GRID\n".encode(),
+            "POINTS {} float\n".format(len(coordinates)).encode(),
+            coordinates.astype('>f4').tobytes(),
+            "\nCELLS {} {}\n".format(num_cells, cells.size).encode(),
+            cells.astype('>i4').tobytes(),
+            "\nCELL_TYPES {}\n".format(num_cells).encode(),
+            np.full(num_cells, self._CELL_TYPES[(domain_size, num_element_nodes)], dtype='>i4').tobytes()])
+
+    @staticmethod
+    def _GetVariableData(variable_name):
+        variable_type = KM.KratosGlobals.GetVariableType(variable_name)
+        if variable_type not in ("Double", "Array"):
+            raise Exception("Variable " + variable_name + " is of type " + variable_type + ". Only Double and Array variables can be written.")
+        return (variable_name, KM.KratosGlobals.GetVariable(variable_name), 3 if variable_type == "Array" else 1)
+
+
+def _WriteVtk(file_name, mesh, num_nodes, point_data):
+    '''Write the encoded mesh and the point data in the legacy binary VTK format.'''
+    with open(file_name + ".tmp", 'wb') as vtk_file:
+        vtk_file.write(mesh)
+        vtk_file.write("\nPOINT_DATA {}\n".format(num_nodes).encode())
+        for name, values in point_data:
+            if values.shape[1] == 1:
+                vtk_file.write("SCALARS {} float 1\nLOOKUP_TABLE default\n".format(name).encode())
+            else:
+                vtk_file.write("VECTORS {} float\n".format(name).encode())
+            vtk_file.write(values.astype('>f4').tobytes())
+            vtk_file.write("\n".encode())
+    os.replace(file_name + ".tmp", file_name)
@@ -15,6 +15,14 @@ model_part = model.CreateModelPart("ExampleModelPart");  #we create a model part
 
 import pfem_2_solver_monolithic_fluid as pfem_2_solver           #we import the python file that includes the commands that we need
 
+import os
+import sys
+import json
+sys.path.append(os.path.join('..'))
+sys.path.append(os.path.join('..','..','..','fluid_dynamics','validation'))
+from python_scripts.initial_level_set_process import ApplyInitialLevelSet
+from python_scripts.asynchronous_output import AsynchronousVtkOutput
+
 
 
 pfem_2_solver.AddVariables(model_part)
@@ -22,12 +30,6 @@ pfem_2_solver.AddVariables(model_part)
 from math import sqrt
 from math import sin
 from math import cos
- #now we proceed to use the GID interface (both to import the infomation inside the .mdpa file and later print the results in a file
-gid_mode = GiDPostMode.GiD_PostBinary  #we import the python file that includes the commands that we need
-multifile = MultiFileFlag.SingleFile #MultipleFiles
-deformed_mesh_flag = WriteDeformedMeshFlag.WriteUndeformed
-write_conditions = WriteConditionsFlag.WriteElementsOnly
-gid_io = GidIO("results_monolithic",gid_mode,multifile,deformed_mesh_flag,write_conditions)
 
 model_part_io = ModelPartIO("rayleigh_monolithic")             # we set the name of the .mdpa file
 model_part_io.ReadModelPart(model_part)         # we load the info from the .mdpa
@@ -43,34 +45,36 @@ model_part.ProcessInfo.SetValue(GRAVITY_Y, -10.0);
 
 pi=3.14159
 
-for node in model_part.Nodes:
-    art=1+1
-    #(p(0),p(1)) -> posicion del nodo
-    g = 10.0;
-    delta0 = 0.1;
-    L = 1.0;
-
-    delta = -delta0*(cos(2*pi*(node.X-0.5)/L))+2.0;
-    distance_function=delta
-    distance_function=delta-node.Y
-    #if (node.Y>=delta):
-    #        distance_function=-1.0;
-    #else:
-    #        distance_function =1.0;
-
-    #distance_function=-1.0
-    node.SetSolutionStepValue(DISTANCE,0,distance_function)
-    if node.X>0.999 and node.Y>3.999:
-        node.Fix(PRESSURE)
-
-
-    if node.X>0.999 or node.X<0.0001:
-        node.Fix(VELOCITY_X)
-        node.Fix(FRACT_VEL_X)
-    if node.Y>3.999 or node.Y<0.0001:
-        node.Fix(FRACT_VEL_Y)
-        node.Fix(VELOCITY_Y)
-
+# Perturbed interface delta(x) = 2 - delta0 cos(2 pi (x - 0.5) / L), with DISTANCE = delta - Y (negative above it)
+# It is given as a cosine surface, and the fixities as regions, evaluated for all the nodes at once
+delta0 = 0.1;
+L = 1.0;
+
+level_set_settings = Parameters("""{
+    "fixities" : [{
+        "variables" : ["PRESSURE"],
+        "shape"     : {"type" : "intersection", "shapes" : [
+            {"type" : "half_space", "point" : [0.999, 0.0], "normal" : [-1.0, 0.0]},
+            {"type" : "half_space", "point" : [0.0, 3.999], "normal" : [0.0, -1.0]}
+        ]}
+    },{
+        "variables" : ["VELOCITY_X", "FRACT_VEL_X"],
+        "shape"     : {"type" : "union", "shapes" : [
+            {"type" : "half_space", "point" : [0.999, 0.0],  "normal" : [-1.0, 0.0]},
+            {"type" : "half_space", "point" : [0.0001, 0.0], "normal" : [1.0, 0.0]}
+        ]}
+    },{
+        "variables" : ["FRACT_VEL_Y", "VELOCITY_Y"],
+        "shape"     : {"type" : "union", "shapes" : [
+            {"type" : "half_space", "point" : [0.0, 3.999],  "normal" : [0.0, -1.0]},
+            {"type" : "half_space", "point" : [0.0, 0.0001], "normal" : [0.0, 1.0]}
+        ]}
+    }]
+}""")
+level_set_settings.AddValue("shape", Parameters(json.dumps({
+    "type" : "complement",
+    "shapes" : [{"type" : "cosine", "mean_level" : 2.0, "amplitude" : -delta0, "wave_number" : 2*pi/L, "origin" : 0.5}]})))
+ApplyInitialLevelSet(model_part, DISTANCE, level_set_settings["shape"], fixities=level_set_settings["fixities"])
 
 
 
@@ -90,14 +94,8 @@ solver.time_order = 1
 solver.echo_level = 3
 solver.Initialize()
 
-mesh_name = 0.0
-gid_io.InitializeMesh( mesh_name );
-gid_io.WriteMesh((model_part).GetMesh());
-
-gid_io.FinalizeMesh()
-
-
-gid_io.InitializeResults(mesh_name,(model_part).GetMesh())
+# The results are written to VTK files by a background thread, so the solver does not wait for them
+output = AsynchronousVtkOutput(model_part, ["VELOCITY", "PRESSURE", "DISTANCE"], "results_monolithic", max_pending=4, policy="block", domain_size=domain_size)
 
 
 nsteps=1000
@@ -106,11 +104,7 @@ out=0
 out_step=1
 
 
-gid_io.WriteNodalResults(DISTANCE,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(TEMPERATURE,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(YP,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(VELOCITY,model_part.Nodes,0,0)
-gid_io.WriteNodalResults(PRESSURE,model_part.Nodes,0,0)
+output.Write(0.0, variables=["DISTANCE", "TEMPERATURE", "YP", "VELOCITY", "PRESSURE"])
 
 import time as timer
 t1 = timer.time()
@@ -134,12 +128,7 @@ for step in range(1,nsteps):
             node.SetSolutionStepValue(VELOCITY_Y,0,0.0)
     if out==out_step:
         out=0
-        print("printing a step")
-
-        gid_io.WriteNodalResults(VELOCITY,model_part.Nodes,time,0)
-        gid_io.WriteNodalResults(PRESSURE,model_part.Nodes,time,0)
-        gid_io.WriteNodalResults(DISTANCE,model_part.Nodes,time,0)
-        gid_io.Flush()
+        output.Write(time)
 
 
 t2=timer.time()
@@ -147,4 +136,4 @@ total_time=t2-t1
 
 print ("total_time", total_time)
 
-gid_io.FinalizeResults()
+output.Finalize()
@@ -1,18 +1,82 @@
+import json
 import KratosMultiphysics
+import KratosMultiphysics.CompressiblePotentialFlowApplication as KCPFApp
 from KratosMultiphysics.CompressiblePotentialFlowApplication.potential_flow_analysis import PotentialFlowAnalysis
 
-with open("ProjectParametersPrimal.json",'r') as parameter_file:
-	parameters = KratosMultiphysics.Parameters(parameter_file.read())
-input_file =parameters["solver_settings"]["model_import_settings"]["input_filename"].GetString()
 
-model = KratosMultiphysics.Model()
-simulation = PotentialFlowAnalysis(model,parameters)
-simulation.Run()
+class PrimalAdjointPotentialFlow:
+    '''Run the primal and the adjoint analyses on the same mesh, read only once.
+
+    The adjoint model part is generated from the primal one with the ConnectivityPreserveModeler,
+    so both share the nodes: the adjoint solver replaces the elements and conditions by the adjoint
+    ones and finds the primal solution in the nodal data, without writing and reading it from HDF5.
+    The adjoint variables are added to the primal model part before it is read for this reason.
+    After the first run, the primal analysis also uses the model part in memory.
+    '''
+
+    adjoint_variables = [
+        KCPFApp.ADJOINT_VELOCITY_POTENTIAL,
+        KCPFApp.ADJOINT_AUXILIARY_VELOCITY_POTENTIAL,
+        KratosMultiphysics.SHAPE_SENSITIVITY]
+
+    def __init__(self, model, primal_parameters, adjoint_parameters, adjoint_model_part_name="AdjointModelPart"):
+        self.model = model
+        self.primal_model_part_name = primal_parameters["solver_settings"]["model_part_name"].GetString()
+        self.adjoint_model_part_name = adjoint_model_part_name
+        self.primal_parameters = primal_parameters
+        self.adjoint_parameters = self._GetAdjointParameters(adjoint_parameters)
+
+    def Run(self):
+        self.RunPrimal()
+        self.RunAdjoint()
+
+    def RunPrimal(self):
+        primal_simulation = PotentialFlowAnalysis(self.model, self.primal_parameters.Clone())
+        primal_model_part = self.model.GetModelPart(self.primal_model_part_name)
+        for variable in self.adjoint_variables:
+            if not primal_model_part.HasNodalSolutionStepVariable(variable):
+                primal_model_part.AddNodalSolutionStepVariable(variable)
+        primal_simulation.Run()
+
+        # The next runs (e.g. after updating the coordinates in a design iteration) use the mesh in memory
+        self.primal_parameters["solver_settings"]["model_import_settings"]["input_type"].SetString("use_input_model_part")
 
+    def RunAdjoint(self):
+        primal_model_part = self.model.GetModelPart(self.primal_model_part_name)
+        if self.model.HasModelPart(self.adjoint_model_part_name):
+            self.model.DeleteModelPart(self.adjoint_model_part_name)
+        adjoint_model_part = self.model.CreateModelPart(self.adjoint_model_part_name)
+        KratosMultiphysics.ConnectivityPreserveModeler().GenerateModelPart(
+            primal_model_part, adjoint_model_part, "Element2D3N", "LineCondition2D2N")
+
+        adjoint_simulation = PotentialFlowAnalysis(self.model, self.adjoint_parameters.Clone())
+        adjoint_simulation.Run()
+
+    def _GetAdjointParameters(self, adjoint_parameters):
+        # Use the generated model part, and the primal solution in memory instead of the HDF5 input
+        settings = adjoint_parameters.WriteJsonString()
+        settings = settings.replace('"' + self.primal_model_part_name + '"', '"' + self.adjoint_model_part_name + '"')
+        settings = settings.replace('"' + self.primal_model_part_name + '.', '"' + self.adjoint_model_part_name + '.')
+        adjoint_parameters = _RemoveProcesses(KratosMultiphysics.Parameters(settings), "KratosMultiphysics.HDF5Application")
+        adjoint_parameters["solver_settings"]["model_import_settings"]["input_type"].SetString("use_input_model_part")
+        return adjoint_parameters
+
+
+def _RemoveProcesses(parameters, kratos_module):
+    settings = json.loads(parameters.WriteJsonString())
+    for list_name, process_list in settings["processes"].items():
+        settings["processes"][list_name] = [process for process in process_list if process.get("kratos_module") != kratos_module]
+    return KratosMultiphysics.Parameters(json.dumps(settings))
+
+
+with open("ProjectParametersPrimal.json",'r') as parameter_file:
+	primal_parameters = KratosMultiphysics.Parameters(parameter_file.read())
 with open("ProjectParametersAdjoint.json",'r') as parameter_file:
-	parameters = KratosMultiphysics.Parameters(parameter_file.read())
-parameters["solver_settings"]["model_import_settings"]["input_filename"].SetString(input_file)
+	adjoint_parameters = KratosMultiphysics.Parameters(parameter_file.read())
+
+# The primal solution is passed in memory, so the HDF5 output is not needed
+primal_parameters = _RemoveProcesses(primal_parameters, "KratosMultiphysics.HDF5Application")
 
 model = KratosMultiphysics.Model()
-adjoint_simulation = PotentialFlowAnalysis(model,parameters)
-adjoint_simulation.Run()
+simulation = PrimalAdjointPotentialFlow(model, primal_parameters, adjoint_parameters)
+simulation.Run()
@@ -1,5 +1,8 @@
+import os
+import sys
 import numpy as np
-from KratosMultiphysics.RomApplication.empirical_cubature_method import EmpiricalCubatureMethod
+sys.path.append(os.path.join('..','..','..','..'))
+from python_scripts.incremental_empirical_cubature import IncrementalEmpiricalCubature
 from KratosMultiphysics.RomApplication.randomized_singular_value_decomposition import RandomizedSingularValueDecomposition
 from matplotlib import pyplot as plt
 
@@ -33,14 +36,13 @@ def select_elements(svd_truncation_tolerance, residuals_svd_truncation_tolerance
         #u,_,_,_ = RandomizedSingularValueDecomposition(RELATIVE_SVD=True).Calculate( np.load(f'HROM/Sr.npy'), tol) # HEAVY!!!
         u = np.load(f'HROM/basis_{svd_truncation_tolerance}_{residuals_svd_truncation_tolerance}.npy')
 
-        hyper_reduction_element_selector = EmpiricalCubatureMethod()
-        hyper_reduction_element_selector.SetUp(u)  #add again z
-        hyper_reduction_element_selector.Initialize()
-        hyper_reduction_element_selector.Calculate()
-
-
-        w = np.squeeze(hyper_reduction_element_selector.w)
-        z = np.squeeze(hyper_reduction_element_selector.z)
+        # The elements and weights of the previous selection (e.g. with another residuals tolerance) are the initial set,
+        # and only the elements needed for the new basis are added
+        ecm_state = f'HROM/ECM_state_{svd_truncation_tolerance}.npz'
+        hyper_reduction_element_selector = IncrementalEmpiricalCubature.Load(ecm_state)
+        hyper_reduction_element_selector.SetBasis(u)
+        z, w = hyper_reduction_element_selector.Calculate()
+        hyper_reduction_element_selector.Save(ecm_state)
 
         WeightsMatrix = w.reshape(np.size(z),1)
 
@@ -27,7 +27,7 @@ plot_partial_hysteresis=False
 
 # parameters for the simulations
 Launch_Simulation=1
-Number_Of_Clusters=1 #not used in global POD
+Number_Of_Clusters=1 #global POD, Run_ROM does not support local bases
 svd_truncation_tolerance_list=(1e-3 1e-4 1e-5 1e-6)
 clustering="narrowing"  #time #
 overlapping=30
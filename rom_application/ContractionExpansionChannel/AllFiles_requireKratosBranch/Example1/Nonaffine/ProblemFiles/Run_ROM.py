@@ -13,7 +13,7 @@ import numpy as np
 
 
 #importing PyGeM tools
-from pygem import FFD, RBF
+from pygem import FFD
 
 
 
@@ -38,39 +38,9 @@ class ROM_Class(FluidDynamicsAnalysisROM):
         self.time_step_solution_container = []
         self.velocity_y_at_control_point = []
         self.narrowing_width = []
-        self.matrix_of_free_coordinates = None
         self.deformation_multiplier = 0
 
 
-    def MoveInnerNodesWithRBF(self):
-        # first loop, ONLY ENTERED ONCE
-        if self.matrix_of_free_coordinates is None:
-            x_original = []
-            y_original = []
-            for node in self.model.GetModelPart("FluidModelPart").Nodes:
-                if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_X):
-                    x_original.append(node.X0)
-                if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_Y):
-                    y_original.append(node.Y0)
-            x_original = np.array(x_original).reshape(-1,1)
-            y_original = np.array(y_original).reshape(-1,1)
-            self.matrix_of_free_coordinates = np.c_[x_original, y_original, np.ones((y_original.shape[0],1))]
-        self.matrix_of_modified_coordinates = self.rbf(self.matrix_of_free_coordinates)
-
-        # second loop
-        i = 0
-        for node in self.model.GetModelPart("FluidModelPart").Nodes:
-            if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_X):
-                x_disp = self.matrix_of_modified_coordinates[i,0] - node.X0
-                node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_X,0, x_disp )
-            if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_Y):
-                y_disp = self.matrix_of_modified_coordinates[i,1] - node.Y0
-                node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_Y,0, y_disp )
-                i +=1
-            node.Fix(KratosMultiphysics.MESH_DISPLACEMENT_X)
-            node.Fix(KratosMultiphysics.MESH_DISPLACEMENT_Y)
-
-
     def StoreBifurcationData(self):
         node =  self.model.GetModelPart("FluidModelPart").GetNode(self.control_point)
         self.velocity_y_at_control_point.append(node.GetSolutionStepValue(KratosMultiphysics.VELOCITY_Y))
@@ -281,11 +251,6 @@ class ROM_Class(FluidDynamicsAnalysisROM):
 
 
 
-    def UpdateRBF(self):
-        self.rbf = RBF(original_control_points = self.fixed_coordinates, deformed_control_points =
-            self.moved_coordinates, radius=0.75)
-
-
     def LockOuterWalls(self):
         for node in self.model.GetModelPart("FluidModelPart.GENERIC_FixedWalls").Nodes:
             node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_X,0, 0 )
@@ -188,6 +188,10 @@ def prepare_files(working_path,svd_truncation_tolerance):
 
 def ROM(hard_impose_currect_cluster = False, Number_Of_Clusters=1, svd_truncation_tolerance=1e-4):
 
+    if Number_Of_Clusters > 1:
+        # The ROM_Class runs with a single basis, it does not switch bases during the simulation
+        raise Exception(f"Number_Of_Clusters = {Number_Of_Clusters}, but only the global POD (Number_Of_Clusters = 1) is supported by the ROM_Class")
+
     if not os.path.exists(f'./Results/ROM_{svd_truncation_tolerance}.post.bin'):
         if not os.path.exists(f'./ROM/'):
             os.mkdir('./ROM')
@@ -255,7 +259,7 @@ if __name__=="__main__":
     from sys import argv
 
     Launch_Simulation = bool(int(argv[1]))
-    Number_Of_Clusters= 1
+    Number_Of_Clusters= int(argv[2])
     svd_truncation_tolerance= float(argv[3])
     clustering= argv[4]
     overlapping = int(argv[5])
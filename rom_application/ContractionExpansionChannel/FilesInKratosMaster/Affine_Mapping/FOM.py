@@ -11,6 +11,9 @@ import os
 #importing training trajectory
 from simulation_trajectories import TrainingTrajectory
 
+#importing the vectorized affine mesh motion
+from affine_mesh_mover import AffineMeshMover
+
 
 
 class FOM_Class(FluidDynamicsAnalysis):
@@ -21,6 +24,7 @@ class FOM_Class(FluidDynamicsAnalysis):
         self.narrowing_width = []
         self.time_step_solution_container = []
         self.reynolds_number_container = []
+        self.affine_mesh_mover = None
 
 
     def InitialMeshPosition(self):
@@ -34,34 +38,6 @@ class FOM_Class(FluidDynamicsAnalysis):
 
 
 
-    def MovePart(self, part_name, jacobian, centering_vector, extra_centering):
-        x_original = []
-        y_original = []
-        # first loop
-        for node in self.model.GetModelPart(f"FluidModelPart.{part_name}").Nodes:
-            if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_X):
-                x_original.append(node.X0)
-            if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_Y):
-                y_original.append(node.Y0)
-        x_original = np.array(x_original).reshape(1,-1)
-        y_original = np.array(y_original).reshape(1,-1)
-        matrix_of_coordinates = np.r_[x_original, y_original]
-        modified_matrix_of_coordinates = np.linalg.inv(jacobian) @ (matrix_of_coordinates - centering_vector)
-        modified_matrix_of_coordinates += centering_vector + extra_centering #re-locating
-        # second loop
-        i = 0
-        for node in self.model.GetModelPart(f"FluidModelPart.{part_name}").Nodes:
-            if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_X):
-                x_disp = modified_matrix_of_coordinates[0,i] - node.X0
-                node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_X,0, x_disp )
-            if not node.IsFixed(KratosMultiphysics.MESH_DISPLACEMENT_Y):
-                y_disp = modified_matrix_of_coordinates[1,i] - node.Y0
-                node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_Y,0, y_disp )
-                i +=1
-            node.Fix(KratosMultiphysics.MESH_DISPLACEMENT_X)
-            node.Fix(KratosMultiphysics.MESH_DISPLACEMENT_Y)
-
-
     def StoreBifurcationData(self):
         for node in self.model.GetModelPart("FluidModelPart.GENERIC_Meassure").Nodes:
             pass
@@ -71,29 +47,24 @@ class FOM_Class(FluidDynamicsAnalysis):
 
     def MoveAllPartsAccordingToW(self):
         #############################
-        ####    FREE ALL NODES   ####
-        #############################
-        for node in self.model.GetModelPart("FluidModelPart").Nodes:
-            node.Free(KratosMultiphysics.MESH_DISPLACEMENT_X)
-            node.Free(KratosMultiphysics.MESH_DISPLACEMENT_Y)
-
-        #############################
-        #### FIXING OUTSIDE PART ####
+        ###  NODES AND FIXITY, ONLY ENTERED ONCE (outside part fixed, moving parts fixed)
         #############################
-        for node in self.model.GetModelPart("FluidModelPart.GENERIC_not_moving").Nodes:
-            node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_X,0, 0)
-            node.Fix(KratosMultiphysics.MESH_DISPLACEMENT_X)
-            node.SetSolutionStepValue(KratosMultiphysics.MESH_DISPLACEMENT_Y,0, 0)
-            node.Fix(KratosMultiphysics.MESH_DISPLACEMENT_Y)
+        if self.affine_mesh_mover is None:
+            self.affine_mesh_mover = AffineMeshMover(self.model.GetModelPart("FluidModelPart"),
+                ['GENERIC_green', 'GENERIC_yellow_up', 'GENERIC_yellow_down', 'GENERIC_blue', 'GENERIC_grey'],
+                'GENERIC_not_moving')
 
         #############################
-        ###  MOVE EACH SUB-PART   ###
+        ###  MOVE ALL SUB-PARTS   ###
         #############################
-        self.MovePart('GENERIC_green', np.array([[1,0],[0,1/self.w]]), np.array([[0],[1.5]]), np.array([[0],[0]]))
-        self.MovePart('GENERIC_yellow_up', np.array([[1,0],[0, (2/(3-self.w))]]), np.array([[0],[3]]), np.array([[0],[0]]))
-        self.MovePart('GENERIC_yellow_down', np.array([[1,0],[0, 2/(3-self.w)]]), np.array([[0],[0]]), np.array([[0],[0]]))
-        self.MovePart('GENERIC_blue', np.array([[1,0],[(self.w-1)/2, 1]]), np.array([[0],[0]]), np.array([[0],[(self.w-1)/4]]))
-        self.MovePart('GENERIC_grey', np.array([[1,0],[(1-self.w)/2, 1]]), np.array([[0],[0]]), np.array([[0],[- (self.w-1)/4]]))
+        jacobians = [[[1,0],[0,1/self.w]],                 #green
+                     [[1,0],[0, (2/(3-self.w))]],          #yellow_up
+                     [[1,0],[0, 2/(3-self.w)]],            #yellow_down
+                     [[1,0],[(self.w-1)/2, 1]],            #blue
+                     [[1,0],[(1-self.w)/2, 1]]]            #grey
+        centering_vectors = [[0,1.5], [0,3], [0,0], [0,0], [0,0]]
+        extra_centerings = [[0,0], [0,0], [0,0], [0,(self.w-1)/4], [0,- (self.w-1)/4]]
+        self.affine_mesh_mover.Move(jacobians, centering_vectors, extra_centerings)
 
 
 
@@ -0,0 +1,72 @@
+import KratosMultiphysics
+
+import numpy as np
+
+
+
+
+class AffineMeshMover:
+    """
+    Moves a set of sub-model parts, each one with its own affine map
+        x = J^-1 (X - c) + c + e
+    where J is the jacobian, c the centering vector and e the extra centering of the part.
+
+    The nodes of each part, their reference coordinates and the fixity are set up only once.
+    A node shared by several parts is moved by the first part it belongs to (same as moving
+    the parts one after the other and fixing the moved nodes), and the nodes of the
+    fixed part are never moved.
+    """
+
+    def __init__(self, model_part, moving_parts_names, fixed_part_name):
+        self.model_part = model_part
+        self.moving_parts_names = moving_parts_names
+
+        #############################
+        ####  NODES OF EACH PART  ###
+        #############################
+        assigned_ids = set(node.Id for node in model_part.GetSubModelPart(fixed_part_name).Nodes)
+        part_of_node = {}
+        for part_index, part_name in enumerate(moving_parts_names):
+            for node in model_part.GetSubModelPart(part_name).Nodes:
+                if node.Id not in assigned_ids:
+                    assigned_ids.add(node.Id)
+                    part_of_node[node.Id] = part_index
+
+        # the moving nodes are stored in a sub-model part to write the displacements in bulk (ordered by Id)
+        if model_part.HasSubModelPart("AffineMovingNodes"):
+            model_part.RemoveSubModelPart("AffineMovingNodes")
+        self.moving_nodes = model_part.CreateSubModelPart("AffineMovingNodes")
+        moving_ids = sorted(part_of_node.keys())
+        self.moving_nodes.AddNodes(moving_ids)
+        self.part_index = np.array([part_of_node[node_id] for node_id in moving_ids], dtype=int)
+        self.reference_coordinates = np.array(KratosMultiphysics.VariableUtils().GetInitialPositionsVector(self.moving_nodes.Nodes, 2)).reshape(-1, 2)
+        self.mesh_displacement = np.zeros((len(moving_ids), 3))
+
+        #############################
+        ####  FIXITY, ONLY ONCE   ###
+        #############################
+        variable_utils = KratosMultiphysics.VariableUtils()
+        for variable in [KratosMultiphysics.MESH_DISPLACEMENT_X, KratosMultiphysics.MESH_DISPLACEMENT_Y]:
+            variable_utils.ApplyFixity(variable, False, model_part.Nodes)
+            variable_utils.ApplyFixity(variable, True, model_part.GetSubModelPart(fixed_part_name).Nodes)
+            variable_utils.ApplyFixity(variable, True, self.moving_nodes.Nodes)
+        variable_utils.SetVariable(KratosMultiphysics.MESH_DISPLACEMENT, KratosMultiphysics.Array3([0.0, 0.0, 0.0]), model_part.GetSubModelPart(fixed_part_name).Nodes)
+
+
+
+    def Move(self, jacobians, centering_vectors, extra_centerings):
+        """
+        jacobians: (number of parts, 2, 2), centering_vectors and extra_centerings: (number of parts, 2)
+        given in the same order as the parts names
+        """
+        jacobians = np.asarray(jacobians, dtype=float).reshape(-1, 2, 2)
+        centering_vectors = np.asarray(centering_vectors, dtype=float).reshape(-1, 2)
+        extra_centerings = np.asarray(extra_centerings, dtype=float).reshape(-1, 2)
+
+        inverse_jacobians = np.linalg.inv(jacobians)
+        translations = centering_vectors + extra_centerings - np.einsum('pij,pj->pi', inverse_jacobians, centering_vectors)
+
+        # one pass over all the moving nodes
+        self.mesh_displacement[:, :2] = np.einsum('nij,nj->ni', inverse_jacobians[self.part_index], self.reference_coordinates)
+        self.mesh_displacement[:, :2] += translations[self.part_index] - self.reference_coordinates
+        KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(self.moving_nodes.Nodes, KratosMultiphysics.MESH_DISPLACEMENT, KratosMultiphysics.Vector(self.mesh_displacement.ravel()), 0)
@@ -0,0 +1,168 @@
+import os
+import numpy as np
+from scipy.linalg import qr, qr_insert, qr_delete, solve_triangular
+
+
+class IncrementalEmpiricalCubature:
+    '''Empirical cubature method (ECM) which is updated when new residual snapshots (or modes) are added.
+
+    The basis of the projected residuals is kept as its left singular vectors and singular
+    values, and it is updated with the new columns (SVD of [U S, new columns]) instead of
+    computing the SVD of all the snapshots again. The element selection starts from the
+    elements and weights of the previous update: they are kept (if their weights are still
+    positive), and new elements are only added until the tolerance is met for the new basis.
+    The state (basis, singular values, elements, weights and number of columns) is saved to
+    a .npz file, so the next training can continue from it.
+
+    The greedy selection follows the EmpiricalCubatureMethod of the RomApplication (the element
+    with the largest projection of the residual is added, and the elements with negative weights
+    are removed), with the least squares problems solved by QR updates. As in its SetUp, the sum
+    of the weights can be constrained to the number of elements, by adding the projection of the
+    constant vector onto the orthogonal complement of the basis as an extra row. Without it, a
+    basis whose rows sum to zero is integrated exactly by (nearly) zero weights.
+
+    Parameters
+    ----------
+    truncation_tolerance : float
+        Relative tolerance to truncate the residuals basis, as in the RandomizedSingularValueDecomposition
+    ecm_tolerance : float
+        Relative error of the integration of the basis. If it is 0, the selection goes on until
+        there are as many elements as basis vectors.
+    max_iterations : int
+        Maximum number of iterations of the greedy selection. Optional, by default 10 times the number of basis vectors plus 100
+    constrain_sum_of_weights : bool
+        Constrain the sum of the weights to the number of elements, as the EmpiricalCubatureMethod does by default
+    '''
+
+    def __init__(self, truncation_tolerance=0.0, ecm_tolerance=0.0, max_iterations=None, constrain_sum_of_weights=True):
+        self.truncation_tolerance = truncation_tolerance
+        self.ecm_tolerance = ecm_tolerance
+        self.max_iterations = max_iterations
+        self.constrain_sum_of_weights = constrain_sum_of_weights
+        self.u = None
+        self.s = None
+        self.number_of_columns = 0
+        self.z = np.array([], dtype=int)
+        self.w = np.array([])
+
+    @classmethod
+    def Load(cls, file_name, truncation_tolerance=0.0, ecm_tolerance=0.0, max_iterations=None, constrain_sum_of_weights=True):
+        '''Create the ECM from a saved state, or an empty one if the file does not exist.'''
+        ecm = cls(truncation_tolerance, ecm_tolerance, max_iterations, constrain_sum_of_weights)
+        if os.path.isfile(file_name):
+            with np.load(file_name) as state:
+                ecm.u = state["u"]
+                ecm.s = state["s"]
+                ecm.number_of_columns = int(state["number_of_columns"])
+                ecm.z = state["z"]
+                ecm.w = state["w"]
+        return ecm
+
+    def Save(self, file_name):
+        np.savez(file_name, u=self.u, s=self.s, number_of_columns=self.number_of_columns, z=self.z, w=self.w)
+
+    def AddColumns(self, columns, number_of_columns=None):
+        '''Update the residuals basis with new snapshots of the projected residuals (one per column).
+
+        The columns can also be the (scaled) left singular vectors of the new snapshots, then
+        number_of_columns is the number of snapshots they represent.
+        '''
+        columns = np.asarray(columns, dtype=float)
+        if self.u is None:
+            u, s, _ = np.linalg.svd(columns, full_matrices=False)
+        else:
+            if columns.shape[0] != self.u.shape[0]:
+                raise Exception("The new columns have {} rows, but the basis has {}".format(columns.shape[0], self.u.shape[0]))
+            u, s, _ = np.linalg.svd(np.c_[self.u * self.s, columns], full_matrices=False)
+        # Only the numerically zero singular values are discarded here, the truncation_tolerance is applied in Calculate
+        rank = max(1, int(np.sum(s > max(u.shape) * np.finfo(float).eps * s[0])))
+        self.u = u[:, :rank]
+        self.s = s[:rank]
+        self.number_of_columns += columns.shape[1] if number_of_columns is None else number_of_columns
+
+    def SetBasis(self, u, s=None):
+        '''Replace the residuals basis (e.g. computed elsewhere), keeping the selected elements as the initial set.'''
+        self.u = np.asarray(u, dtype=float)
+        self.s = np.ones(self.u.shape[1]) if s is None else np.asarray(s, dtype=float)
+
+    def GetBasis(self):
+        '''Return the basis truncated with the truncation_tolerance.'''
+        if self.truncation_tolerance <= 0.0:
+            return self.u
+        tail = np.sqrt(np.cumsum(self.s[::-1]**2))[::-1]
+        rank = max(1, int(np.sum(tail > self.truncation_tolerance * tail[0])))
+        return self.u[:, :rank]
+
+    def Calculate(self):
+        '''Select the elements and weights for the current basis, starting from the previous ones.'''
+        if self.u is None:
+            raise Exception("The residuals basis is empty. Call AddColumns or SetBasis first")
+        G = self.GetBasis().T
+        if self.constrain_sum_of_weights:
+            G = self._AddSumOfWeightsConstraint(G)
+        m, n = G.shape
+        b = G @ np.ones(n)
+        norm_b = np.linalg.norm(b)
+        G_norm = np.linalg.norm(G, axis=0)
+        G_norm[G_norm == 0.0] = 1.0
+        max_iterations = self.max_iterations if self.max_iterations is not None else 10 * m + 100
+
+        # Warm start: the previous elements (at most as many as basis vectors) are the initial set
+        z = [int(i) for i in np.unique(self.z) if i < n][:m]
+        Q, R = qr(G[:, z]) if z else (np.eye(m), np.empty((m, 0)))
+        z, Q, R, alpha = self._RemoveNegativeWeights(z, Q, R, b)
+        is_candidate = np.ones(n, dtype=bool)
+        is_candidate[z] = False
+        residual = b - G[:, z] @ alpha
+        error = np.linalg.norm(residual) / norm_b
+        print(f'Initial set: m = {len(z)}, error n(res)/n(b) (%) = {error*100}')
+
+        iteration = 0
+        while error > self.ecm_tolerance and len(z) < m and np.any(is_candidate) and iteration < max_iterations:
+            candidates = np.flatnonzero(is_candidate)
+            i = candidates[np.argmax((G[:, candidates].T @ residual) / G_norm[candidates])]
+            Q, R = qr_insert(Q, R, G[:, i], len(z), which='col')
+            z.append(i)
+            is_candidate[i] = False
+            previous_set = set(z)
+            z, Q, R, alpha = self._RemoveNegativeWeights(z, Q, R, b)
+            removed = previous_set.difference(z)
+            if removed:
+                print("WARNING: NEGATIVE weight found")
+                # The removed elements are candidates again, except the last one (it would be selected again)
+                is_candidate[list(removed.difference({i}))] = True
+            residual = b - G[:, z] @ alpha
+            error = np.linalg.norm(residual) / norm_b
+            iteration += 1
+            print(f'k = {iteration}, m = {len(z)}, error n(res)/n(b) (%) = {error*100}')
+
+        order = np.argsort(z)
+        self.z = np.array(z, dtype=int)[order]
+        self.w = np.asarray(alpha)[order]
+        return self.z, self.w
+
+    @staticmethod
+    def _AddSumOfWeightsConstraint(G):
+        '''Append the (normalized) part of the constant vector which is orthogonal to the rows of G (orthonormal basis vectors).'''
+        ones = np.ones(G.shape[1])
+        projection_of_constant_vector = ones - G.T @ (G @ ones)
+        norm = np.linalg.norm(projection_of_constant_vector)
+        if norm <= np.sqrt(G.shape[1]) * 1e-10:
+            # The constant vector is already in the span of the basis, so its sum is integrated
+            return G
+        return np.vstack([G, projection_of_constant_vector / norm])
+
+    @staticmethod
+    def _RemoveNegativeWeights(z, Q, R, b):
+        z = list(z)
+        while True:
+            k = len(z)
+            if k == 0:
+                return z, Q, R, np.array([])
+            alpha = solve_triangular(R[:k, :k], (Q.T @ b)[:k])
+            negative = np.flatnonzero(alpha <= 0.0)
+            if negative.size == 0:
+                return z, Q, R, alpha
+            for j in negative[::-1]:
+                Q, R = qr_delete(Q, R, int(j), 1, which='col')
+                del z[j]
@@ -0,0 +1,129 @@
+"""
+Local ROM bases (one POD basis per cluster) of the ContractionExpansionChannel examples.
+
+The operators are built offline from the output of overlapping_strategies (see FromClusters) and can be
+stored in a .npz file. The ROM_Class of Run_ROM.py does not use them yet: it runs with the global POD basis,
+since the RomApplication solver keeps the same basis during the simulation.
+"""
+import numpy as np
+
+
+
+
+class LocalRomBases():
+    """
+    Online engine for local ROMs (one POD basis per cluster, as obtained with overlapping_strategies).
+
+    Everything that involves full-order vectors is precomputed offline:
+        - the centroids of all clusters projected onto each basis, Phi_i^T u_j (r_i x k),
+          and their squared norms ||u_j||^2
+        - the transition matrices between bases, Phi_j^T Phi_i (r_j x r_i)
+
+    Online, with the reduced state q_i in the current basis i, and orthonormal bases:
+        ||Phi_i q_i - u_j||^2 = ||q_i||^2 - 2 q_i^T (Phi_i^T u_j) + ||u_j||^2
+    so selecting the cluster is an O(r k) operation, and switching to basis j is q_j = (Phi_j^T Phi_i) q_i
+    """
+
+    def __init__(self, bases, centroids):
+        """
+        bases: list with the k bases Phi_i (N x r_i), with orthonormal columns
+        centroids: cluster centroids in the full-order space (N x k)
+        """
+        self.bases = bases
+        self.number_of_clusters = len(bases)
+        centroids = np.asarray(centroids).reshape(-1, self.number_of_clusters)
+        self.centroids_squared_norms = np.sum(centroids**2, axis=0)
+        self.projected_centroids = [basis.T @ centroids for basis in bases]
+        self.transition_matrices = {}
+        for i in range(self.number_of_clusters):
+            for j in range(self.number_of_clusters):
+                if i != j:
+                    self.transition_matrices[(j, i)] = bases[j].T @ bases[i]
+        self.current_cluster = None
+
+
+    @classmethod
+    def FromClusters(cls, S, sub_snapshots, correct_cluster, svd_truncation_tolerance=1e-4):
+        """
+        S: snapshots matrix, sub_snapshots and correct_cluster: output of the overlapping strategies.
+        The centroids are the means of the snapshots belonging to each cluster (without the overlapping),
+        the bases are the truncated left singular vectors of each (overlapped) sub-snapshots matrix
+        """
+        correct_cluster = np.asarray(correct_cluster)
+        number_of_clusters = len(sub_snapshots)
+        centroids = np.c_[tuple(np.mean(S[:, correct_cluster == i], axis=1) for i in range(number_of_clusters))]
+        bases = [truncated_svd_basis(sub_snapshots[i], svd_truncation_tolerance) for i in range(number_of_clusters)]
+        return cls(bases, centroids)
+
+
+    def Save(self, file_name):
+        """stores only the reduced operators (and the bases, needed to reconstruct the solution)"""
+        operators = {'centroids_squared_norms': self.centroids_squared_norms}
+        for i in range(self.number_of_clusters):
+            operators[f'basis_{i}'] = self.bases[i]
+            operators[f'projected_centroids_{i}'] = self.projected_centroids[i]
+        for (j, i), transition_matrix in self.transition_matrices.items():
+            operators[f'transition_{j}_{i}'] = transition_matrix
+        np.savez(file_name, **operators)
+
+
+    @classmethod
+    def Load(cls, file_name):
+        operators = np.load(file_name)
+        local_bases = cls.__new__(cls)
+        local_bases.centroids_squared_norms = operators['centroids_squared_norms']
+        local_bases.number_of_clusters = local_bases.centroids_squared_norms.shape[0]
+        local_bases.bases = [operators[f'basis_{i}'] for i in range(local_bases.number_of_clusters)]
+        local_bases.projected_centroids = [operators[f'projected_centroids_{i}'] for i in range(local_bases.number_of_clusters)]
+        local_bases.transition_matrices = {}
+        for i in range(local_bases.number_of_clusters):
+            for j in range(local_bases.number_of_clusters):
+                if i != j:
+                    local_bases.transition_matrices[(j, i)] = operators[f'transition_{j}_{i}']
+        local_bases.current_cluster = None
+        return local_bases
+
+
+    def InitialCluster(self, u):
+        """the only selection done with a full-order vector, for the initial condition"""
+        u = np.asarray(u).ravel()
+        distances = np.array([np.sum((self.bases[i] @ (self.bases[i].T @ u) - u)**2) for i in range(self.number_of_clusters)])
+        self.current_cluster = int(np.argmin(distances))
+        return self.current_cluster, self.bases[self.current_cluster].T @ u
+
+
+    def Distances(self, q):
+        """squared distances from the solution (reduced coordinates q in the current basis) to all centroids"""
+        q = np.asarray(q).ravel()
+        return q @ q - 2.0 * (q @ self.projected_centroids[self.current_cluster]) + self.centroids_squared_norms
+
+
+    def SelectCluster(self, q):
+        """returns the nearest cluster and the reduced coordinates expressed in its basis"""
+        nearest_cluster = int(np.argmin(self.Distances(q)))
+        if nearest_cluster != self.current_cluster:
+            q = self.ChangeBasis(q, self.current_cluster, nearest_cluster)
+            self.current_cluster = nearest_cluster
+        return self.current_cluster, q
+
+
+    def ChangeBasis(self, q, from_cluster, to_cluster):
+        if from_cluster == to_cluster:
+            return q
+        return self.transition_matrices[(to_cluster, from_cluster)] @ q
+
+
+    def GetBasis(self, cluster=None):
+        if cluster is None:
+            cluster = self.current_cluster
+        return self.bases[cluster]
+
+
+
+
+def truncated_svd_basis(S, svd_truncation_tolerance):
+    """left singular vectors such that the relative Frobenius error of the truncation is below the tolerance"""
+    u, s, _ = np.linalg.svd(S, full_matrices=False)
+    squared_tail = np.cumsum((s**2)[::-1])[::-1]
+    number_of_modes = int(np.sum(squared_tail > (svd_truncation_tolerance**2) * squared_tail[0]))
+    return u[:, :max(number_of_modes, 1)]
@@ -1,23 +1,30 @@
-import os
+import sys, os
 import numpy as np
+sys.path.append(os.path.join('..','..'))
+from python_scripts.sweep_runner import SweepRunner
 
-command_execution = 'sbatch --job-name {} run.sh'  # parallel run
-#command_execution = 'python3 MainKratos.py'        # serial run
+# The cases are submitted to the queue. With submit_command = None, they run locally in parallel (at most
+# max_workers at the same time), in warm workers which import Kratos only once.
+# The cases whose output already exists are skipped, see sweep_manifest.json for the status and the runtimes
+runner = SweepRunner(
+    script = 'MainKratos.py',
+    max_workers = None,     # number of cores
+    reuse_workers = True,
+    preload_modules = ['KratosMultiphysics', 'KratosMultiphysics.ShallowWaterApplication'],
+    submit_command = 'sbatch --job-name {name} run.sh')
 
-count = 0
-
-output_base_name = 'time_series_{}long_{}damp'
 relative_dampings = 10**np.linspace(-0.5, 1, 15)
 relative_wavelengths = np.array([0.5, 0.7, 1.0, 2.0, 3.0, 5.0])
 
-for l, rel_distance in enumerate(relative_wavelengths):
-    for d, rel_damping in enumerate(relative_dampings):
-        count += 1
-        output_name = output_base_name.format(l, d)
-        job_name = f'absorbing_boundary_{count}'
-        command  = command_execution.format(job_name)
-        command += f' --rel_damping {rel_damping}'
-        command += f' --rel_distance {rel_distance}'
-        command += f' --output_name {output_name}'
-        command += f' --remove_output True'
-        os.system(command=command)
+runner.AddCaseMatrix(
+    'absorbing_boundary_{count}',
+    parameters = {
+        'rel_distance' : relative_wavelengths,
+        'rel_damping'  : relative_dampings},
+    fixed_arguments = {'remove_output' : True},
+    derived_arguments = {'output_name' : 'time_series_{rel_distance_index}long_{rel_damping_index}damp'},
+    expected_outputs = [os.path.join('reflection_coefficient', '{output_name}_*')])
+
+# The guard is needed by the worker processes, which may import this module
+if __name__ == "__main__":
+    runner.Run()
@@ -1,49 +1,75 @@
+import os
 import argparse
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
+from scipy import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import matplotlib.pyplot as plt
 import matplotlib.ticker as tck
 import progress.bar as bar
 
 
-parser = argparse.ArgumentParser()
-mode = parser.add_mutually_exclusive_group()
-mode.add_argument("-s", "--compute_single", action="store_const", dest="mode", const="compute_single", default="compute_single")
-mode.add_argument("-c", "--compute_matrix", action="store_const", dest="mode", const="compute_matrix")
-mode.add_argument("-p", "--print_matrix",   action="store_const", dest="mode", const="print_matrix")
-args = parser.parse_args()
-
-
 def read_data(filename):
+    """Read the time series, caching the parsed columns in a binary file next to the text file."""
+    cache_filename = os.path.splitext(filename)[0] + '.npz'
+    if os.path.isfile(cache_filename) and os.path.getmtime(cache_filename) >= os.path.getmtime(filename):
+        with np.load(cache_filename) as cache:
+            return {key: cache[key] for key in cache.files}
     df = pd.read_csv(filename, header=None, delimiter=r'\s+', skiprows=2, names=['t', 'f', 'u', 'v', 'w'])
     df = df.fillna(0)
-    return df
-
-
-def filter_harmonics(time, values):
-    long_harmonics = sm.nonparametric.lowess(values, time, frac=0.05)
-    long_harmonics = long_harmonics[:,1]
+    data = {key: df[key].to_numpy(dtype=float) for key in df.columns}
+    np.savez(cache_filename, **data)
+    return data
+
+
+def filter_harmonics(time, values, frac=0.05):
+    """Remove the long harmonics, estimated with a local linear fit over a fraction of the time span (similar to a LOWESS with the same frac).
+
+    The Savitzky-Golay filter needs uniform sampling. If the time step is not constant (e.g. automatic
+    time step), the trend is computed on a uniform grid with the same number of samples and interpolated
+    back to the sampling times.
+    """
+    time = np.asarray(time, dtype=float)
+    values = np.asarray(values, dtype=float)
+    window = int(frac * len(values)) // 2 * 2 + 1
+    if window < 3:
+        return values - np.mean(values)
+    steps = np.diff(time)
+    if np.ptp(steps) <= 1e-6 * np.mean(steps):
+        long_harmonics = signal.savgol_filter(values, window, polyorder=1, mode='interp')
+    else:
+        uniform_time = np.linspace(time[0], time[-1], len(time))
+        uniform_long_harmonics = signal.savgol_filter(np.interp(uniform_time, time, values), window, polyorder=1, mode='interp')
+        long_harmonics = np.interp(time, uniform_time, uniform_long_harmonics)
     filtered_values = values - long_harmonics
     return filtered_values
 
 
-def remove_non_consecutive_indices_single(indices):
-    acceptable_indices = [False] * len(indices)
-    for i in range(1,len(indices)-1):
-        if indices[i-1] > 0 and indices[i] > 0 and indices[i+1] > 0:
-            acceptable_indices[i] = True
-    return acceptable_indices
-
-
 def remove_non_consecutive_indices(indices, times=1):
-    for i in range(times):
-        indices = remove_non_consecutive_indices_single(indices)
-    return indices
+    """Shrink each range of consecutive True values by times indices at both sides.
+
+    It is equivalent to keep the indices whose previous and next indices are True, times
+    times in a row. The first and last indices are always False.
+    """
+    indices = np.asarray(indices, dtype=bool)
+    result = np.zeros_like(indices)
+    if len(indices) < 2 * times + 1:
+        return result
+    edges = np.diff(np.r_[0, indices.astype(np.int8), 0])
+    starts = np.flatnonzero(edges == 1) + times
+    ends = np.flatnonzero(edges == -1) - times
+    starts = np.maximum(starts, times)
+    ends = np.minimum(ends, len(indices) - times)
+    long_enough = starts < ends
+    coverage = np.zeros(len(indices) + 1, dtype=int)
+    np.add.at(coverage, starts[long_enough], 1)
+    np.add.at(coverage, ends[long_enough], -1)
+    result[:] = np.cumsum(coverage[:-1]) > 0
+    return result
 
 
 def flip_range(indices):
-    return [not index for index in indices]
+    return np.logical_not(indices)
 
 
 def get_incident_and_reflected_ranges(amplitudes, velocities):
@@ -66,15 +92,15 @@ def compute_reflection_coefficient(filename, print_on_screen=False, make_plot=Fa
     incident_range, reflected_range = get_incident_and_reflected_ranges(amplitudes, velocities)
 
     incident_amplitudes = amplitudes * incident_range
-    incident_amplitude = max(incident_amplitudes) - min(incident_amplitudes)
+    incident_amplitude = incident_amplitudes.max() - incident_amplitudes.min()
 
     reflected_amplitudes = amplitudes * reflected_range
-    reflected_amplitude = max(reflected_amplitudes) - min(reflected_amplitudes)
+    reflected_amplitude = reflected_amplitudes.max() - reflected_amplitudes.min()
 
-    try:
-        reflection_coefficient = reflected_amplitude / incident_amplitude
-    except ZeroDivisionError:
+    if incident_amplitude == 0.0:
         reflection_coefficient = 0.99
+    else:
+        reflection_coefficient = reflected_amplitude / incident_amplitude
 
     if print_on_screen:
         print('reflected amplitude', reflected_amplitude)
@@ -96,49 +122,63 @@ def compute_reflection_coefficient(filename, print_on_screen=False, make_plot=Fa
 
     return reflection_coefficient
 
-if args.mode == 'compute_single':
-    compute_reflection_coefficient('reflection_coefficient/time_series_1.dat', True, True)
 
-elif args.mode == 'compute_matrix':
-    base_filename_1 = 'reflection_coefficient/time_series_{}long_{}damp_1.dat'
-    base_filename_2 = 'reflection_coefficient/time_series_{}long_{}damp_1.dat'
+def compute_reflection_coefficients(filenames, max_workers=None):
+    """Compute the coefficients of several files in parallel. Each file is analysed only once."""
+    unique_filenames = list(dict.fromkeys(filenames))
+    coefficients = {}
+    progress_bar = bar.IncrementalBar('Processing', max=len(unique_filenames))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(compute_reflection_coefficient, filename): filename for filename in unique_filenames}
+        for future in as_completed(futures):
+            coefficients[futures[future]] = future.result()
+            progress_bar.next()
+    progress_bar.finish()
+    return [coefficients[filename] for filename in filenames]
 
-    relative_dampings = 10**np.linspace(-0.5, 1, 15)
-    relative_wavelengths = np.array([0.5, 0.7, 1.0, 2.0, 3.0, 5.0])
 
-    coefficients = np.zeros(shape=(len(relative_wavelengths), len(relative_dampings)), dtype=float)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("-s", "--compute_single", action="store_const", dest="mode", const="compute_single", default="compute_single")
+    mode.add_argument("-c", "--compute_matrix", action="store_const", dest="mode", const="compute_matrix")
+    mode.add_argument("-p", "--print_matrix",   action="store_const", dest="mode", const="print_matrix")
+    parser.add_argument("-j", "--max_workers", type=int, default=None, help="number of processes of the compute_matrix mode (by default the number of cores)")
+    args = parser.parse_args()
 
-    num_items = len(relative_dampings) * len(relative_wavelengths)
-    progress_bar = bar.IncrementalBar('Processing', max=num_items)
-    for l, rel_dist in enumerate(relative_wavelengths):
-        for d, rel_damping in enumerate(relative_dampings):
+    if args.mode == 'compute_single':
+        compute_reflection_coefficient('reflection_coefficient/time_series_1.dat', True, True)
 
-            filename_1 = base_filename_1.format(l, d)
-            filename_2 = base_filename_2.format(l, d)
+    elif args.mode == 'compute_matrix':
+        base_filename_1 = 'reflection_coefficient/time_series_{}long_{}damp_1.dat'
+        base_filename_2 = 'reflection_coefficient/time_series_{}long_{}damp_1.dat'
 
-            coeff_1 = compute_reflection_coefficient(filename_1)
-            coeff_2 = compute_reflection_coefficient(filename_2)
+        relative_dampings = 10**np.linspace(-0.5, 1, 15)
+        relative_wavelengths = np.array([0.5, 0.7, 1.0, 2.0, 3.0, 5.0])
 
-            coefficients[l,d] = max(coeff_1, coeff_2)
+        filenames_1 = [base_filename_1.format(l, d) for l in range(len(relative_wavelengths)) for d in range(len(relative_dampings))]
+        filenames_2 = [base_filename_2.format(l, d) for l in range(len(relative_wavelengths)) for d in range(len(relative_dampings))]
+        all_coefficients = compute_reflection_coefficients(filenames_1 + filenames_2, args.max_workers)
 
-            progress_bar.next()
+        coefficients_1 = np.array(all_coefficients[:len(filenames_1)])
+        coefficients_2 = np.array(all_coefficients[len(filenames_1):])
+        coefficients = np.maximum(coefficients_1, coefficients_2).reshape(len(relative_wavelengths), len(relative_dampings))
 
-    np.savetxt('coefficients_matrix.dat', coefficients)
-    progress_bar.finish()
+        np.savetxt('coefficients_matrix.dat', coefficients)
 
-elif args.mode == 'print_matrix':
-    coefficients = np.loadtxt('coefficients_matrix.dat')
-    relative_dampings = 10**np.linspace(-0.5, 1, 15)
-    relative_wavelengths = np.array([0.5, 0.7, 1.0, 2.0, 3.0, 5.0])
-    x, y = np.meshgrid(relative_dampings, relative_wavelengths)
+    elif args.mode == 'print_matrix':
+        coefficients = np.loadtxt('coefficients_matrix.dat')
+        relative_dampings = 10**np.linspace(-0.5, 1, 15)
+        relative_wavelengths = np.array([0.5, 0.7, 1.0, 2.0, 3.0, 5.0])
+        x, y = np.meshgrid(relative_dampings, relative_wavelengths)
 
-    fig, ax = plt.subplots()#subplot_kw={"projection": "3d"})
-    surf = ax.contourf(x, y, coefficients, locator=tck.LogLocator(), cmap=plt.get_cmap('coolwarm'))
-    lines = ax.contour(surf, linewidths=0, colors='ghostwhite')
+        fig, ax = plt.subplots()#subplot_kw={"projection": "3d"})
+        surf = ax.contourf(x, y, coefficients, locator=tck.LogLocator(), cmap=plt.get_cmap('coolwarm'))
+        lines = ax.contour(surf, linewidths=0, colors='ghostwhite')
 
-    cbar = fig.colorbar(surf)
-    cbar.add_lines(lines)
+        cbar = fig.colorbar(surf)
+        cbar.add_lines(lines)
 
-    ax.set_xlabel('relative damping')
-    ax.set_ylabel('relative length')
-    plt.show()
+        ax.set_xlabel('relative damping')
+        ax.set_ylabel('relative length')
+        plt.show()
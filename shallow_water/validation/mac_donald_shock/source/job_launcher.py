@@ -1,32 +1,35 @@
-import os
+import sys, os
+sys.path.append(os.path.join('..','..'))
+from python_scripts.sweep_runner import SweepRunner
 
-command_execution = 'sbatch --job-name {} run.sh'  # parallel run
-#command_execution = 'python3 MainKratos.py'        # serial run
+# The cases are submitted to the queue. With submit_command = None, they run locally in parallel (at most
+# max_workers at the same time), in warm workers which import Kratos only once.
+# The cases whose output already exists are skipped, see sweep_manifest.json for the status and the runtimes
+runner = SweepRunner(
+    script = 'MainKratos.py',
+    max_workers = None,     # number of cores
+    reuse_workers = True,
+    preload_modules = ['KratosMultiphysics', 'KratosMultiphysics.ShallowWaterApplication'],
+    submit_command = 'sbatch --job-name {name} run.sh')
 
-automatic_time_step = True
-courant_number = 0.5
 modes = ['residual_viscosity','gradient_jump','flux_correction']
 labels = ['rv','gj','fc']
 meshes = [2.0, 1.0, 0.5, 0.2, 0.1]
 steps = [0.005] * len(meshes)
 steps[-1] = 0.002
-input_filename_pattern = 'mac_donald_{}'
-output_filename_pattern = 'convergence_{}'
 
-count = 0
-for mode, label in zip(modes, labels):
-    for mesh, time_step in zip(meshes, steps):
-        count += 1
-        input_filename = input_filename_pattern.format(mesh)
-        output_filename = output_filename_pattern.format(count)
-        job_name = f'mac_donald_conv_analysis_{count}'
-        command  = command_execution.format(job_name)
-        command += f' --automatic_time_step {automatic_time_step}'
-        command += f' --courant_number {courant_number}'
-        command += f' --time_step {time_step}'
-        command += f' --shock_capturing_type {mode}'
-        command += f' --input_filename {input_filename}'
-        command += f' --output_filename {output_filename}'
-        command += f' --analysis_label {label}'
-        command += f' --remove_output True'
-        os.system(command=command)
+runner.AddCaseMatrix(
+    'mac_donald_conv_analysis_{count}',
+    parameters = {
+        ('shock_capturing_type', 'analysis_label') : zip(modes, labels),
+        ('input_filename', 'time_step') : zip(['mac_donald_{}'.format(mesh) for mesh in meshes], steps)},
+    fixed_arguments = {
+        'automatic_time_step' : True,
+        'courant_number'      : 0.5,
+        'remove_output'       : True},
+    derived_arguments = {'output_filename' : 'convergence_{count}'},
+    expected_outputs = ['{output_filename}.dat'])
+
+# The guard is needed by the worker processes, which may import this module
+if __name__ == "__main__":
+    runner.Run()
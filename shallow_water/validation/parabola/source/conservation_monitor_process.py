@@ -0,0 +1,168 @@
+import numpy as np
+
+import KratosMultiphysics as KM
+import KratosMultiphysics.ShallowWaterApplication as SW
+from KratosMultiphysics.time_based_ascii_file_writer_utility import TimeBasedAsciiFileWriterUtility
+
+def Factory(settings, model):
+    if not isinstance(settings, KM.Parameters):
+        raise Exception("expected input shall be a Parameters object, encapsulating a json string")
+    return ConservationMonitorProcess(model, settings["Parameters"])
+
+class ConservationMonitorProcess(KM.OutputProcess):
+    '''Keep a tracking of the integral quantities during the computation.
+
+    This process logs to file the mass (volume of water), the momentum and the
+    energy in a model_part during the specified interval in a computation.
+    All the quantities are integrated in a single sweep over the elements,
+    with array operations over the nodal values. The element areas and the
+    connectivities are computed once, since the mesh does not move.
+
+    The mass is computed for each of the relative_dry_heights. If it is -1
+    all the domain is considered. If it is greater or equal than 0, only the
+    elements whose nodal heights are greater than relative_dry_height times
+    the element length are included, as in the ShallowWaterUtilities.
+
+    The values are sampled every sampling_stride steps (or sampling_interval
+    units of time, if it is greater than zero) and they are kept in memory
+    until buffer_size samples are stored or the computation finishes.
+    '''
+
+    @staticmethod
+    def GetDefaultParameters():
+        return KM.Parameters("""{
+            "model_part_name"      : "model_part",
+            "interval"             : [0, "End"],
+            "relative_dry_heights" : [-1.0],
+            "sampling_stride"      : 1,
+            "sampling_interval"    : 0.0,
+            "buffer_size"          : 100,
+            "print_format"         : ".8f",
+            "file_name"            : "",
+            "output_path"          : ""
+        }""")
+
+    def __init__(self, model, settings):
+        '''Constructor of ConservationMonitorProcess.'''
+        KM.OutputProcess.__init__(self)
+        settings.ValidateAndAssignDefaults(self.GetDefaultParameters())
+
+        self.model_part_name = settings["model_part_name"].GetString()
+        self.model_part = model.GetModelPart(self.model_part_name)
+        self.interval = KM.IntervalUtility(settings)
+        self.relative_dry_heights = settings["relative_dry_heights"].GetVector()
+        self.sampling_stride = settings["sampling_stride"].GetInt()
+        self.sampling_interval = settings["sampling_interval"].GetDouble()
+        self.buffer_size = settings["buffer_size"].GetInt()
+        self.print_format = settings["print_format"].GetString()
+        if self.sampling_stride < 1:
+            raise Exception("The sampling_stride has to be at least 1!")
+
+        self.buffer = []
+        self.next_sampling_time = None
+        self.step = 0
+        self.variable_utils = KM.VariableUtils()
+
+        if (self.model_part.GetCommunicator().MyPID() == 0):
+            output_file_settings = KM.Parameters()
+            output_file_settings.AddValue("file_name", settings["file_name"])
+            output_file_settings.AddValue("output_path", settings["output_path"])
+            file_header = self._GetFileHeader()
+            self.output_file = TimeBasedAsciiFileWriterUtility(
+                self.model_part, output_file_settings, file_header).file
+
+    def ExecuteInitialize(self):
+        node_ids = np.array([node.Id for node in self.model_part.Nodes])
+        element_node_ids = np.array([[node.Id for node in elem.GetNodes()] for elem in self.model_part.Elements])
+        self.connectivity = np.searchsorted(node_ids, element_node_ids)
+
+        coordinates = np.array(self.variable_utils.GetInitialPositionsVector(self.model_part.Nodes, 3)).reshape(-1, 3)
+        x = coordinates[self.connectivity, 0]
+        y = coordinates[self.connectivity, 1]
+        self.areas = 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1))
+        # The same element size as the ShallowWaterUtilities, which is not sqrt(area) for the triangles
+        self.element_sizes = np.array([elem.GetGeometry().Length() for elem in self.model_part.Elements])
+
+    @staticmethod
+    def IsOutputStep():
+        """See ExecuteFinalizeSolutionStep."""
+        return False
+
+    @staticmethod
+    def PrintOutput():
+        """See ExecuteFinalizeSolutionStep."""
+        pass
+
+    def ExecuteFinalizeSolutionStep(self):
+        """Store the integral quantities in the buffer.
+
+        The PrintOutput is avoided for two reasons:
+        - This process does not need processing variables at the ExecuteBeforeOutputStep.
+        - Returning True at IsOutputStep will enforce the ExecuteBeforeOutputStep of the benchmark, which is very expensive.
+        """
+        current_time = self.model_part.ProcessInfo.GetValue(KM.TIME)
+        self.step += 1
+
+        if self.interval.IsInInterval(current_time) and self._IsSamplingStep(current_time):
+            self.buffer.append([current_time] + self._ComputeIntegrals())
+            if len(self.buffer) >= self.buffer_size:
+                self._Flush()
+
+    def ExecuteFinalize(self):
+        self._Flush()
+        if self.model_part.GetCommunicator().MyPID() == 0:
+            self.output_file.close()
+
+    def _IsSamplingStep(self, current_time):
+        if self.sampling_interval > 0.0:
+            if self.next_sampling_time is None:
+                self.next_sampling_time = current_time
+            if current_time < self.next_sampling_time - 1e-10 * self.sampling_interval:
+                return False
+            while self.next_sampling_time <= current_time + 1e-10 * self.sampling_interval:
+                self.next_sampling_time += self.sampling_interval
+            return True
+        return (self.step - 1) % self.sampling_stride == 0
+
+    def _ComputeIntegrals(self):
+        nodes = self.model_part.Nodes
+        gravity = self.model_part.ProcessInfo.GetValue(KM.GRAVITY_Z)
+        height = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, SW.HEIGHT, 0))
+        topography = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, SW.TOPOGRAPHY, 0))
+        momentum = np.array(self.variable_utils.GetSolutionStepValuesVector(nodes, KM.MOMENTUM, 0, 3)).reshape(-1, 3)
+
+        # Nodal densities of the integrals, averaged over each element
+        positive_height = np.maximum(height, 0.0)
+        squared_momentum = np.sum(momentum[:, :2]**2, axis=1)
+        kinetic_energy = np.divide(0.5 * squared_momentum, positive_height, out=np.zeros_like(height), where=positive_height > 0.0)
+        potential_energy = gravity * positive_height * (0.5 * positive_height + topography)
+        nodal_values = np.column_stack((height, momentum[:, 0], momentum[:, 1], kinetic_energy + potential_energy))
+        element_integrals = self.areas[:, np.newaxis] * np.mean(nodal_values[self.connectivity], axis=1)
+
+        masses = []
+        min_element_height = np.min(height[self.connectivity], axis=1)
+        for relative_dry_height in self.relative_dry_heights:
+            if relative_dry_height < 0.0:
+                masses.append(np.sum(element_integrals[:, 0]))
+            else:
+                is_wet = min_element_height > relative_dry_height * self.element_sizes
+                masses.append(np.sum(element_integrals[is_wet, 0]))
+        integrals = masses + list(np.sum(element_integrals[:, 1:], axis=0))
+
+        data_comm = self.model_part.GetCommunicator().GetDataCommunicator()
+        return [data_comm.SumAll(float(value)) for value in integrals]
+
+    def _Flush(self):
+        if self.buffer and self.model_part.GetCommunicator().MyPID() == 0:
+            lines = []
+            for values in self.buffer:
+                lines.append(str(values[0]) + ' ' + ' '.join(format(value, self.print_format) for value in values[1:]))
+            self.output_file.write('\n'.join(lines) + '\n')
+            self.output_file.flush()
+        self.buffer = []
+
+    def _GetFileHeader(self):
+        header = '# Integral quantities for model part ' + self.model_part_name + '\n'
+        mass_labels = ['Mass' if relative_dry_height < 0.0 else 'Mass_{}'.format(relative_dry_height) for relative_dry_height in self.relative_dry_heights]
+        header += '#Time ' + ' '.join(mass_labels) + ' Momentum_X Momentum_Y Energy\n'
+        return header
@@ -4,12 +4,14 @@ sys.path.append(os.path.join('..','..'))
 from python_scripts.convergence_analysis import ConvergenceAnalysis
 
 
-convergence = ConvergenceAnalysis(filename='convergence', area=10)
+convergence = ConvergenceAnalysis(filename='convergence_*', area=10, store_filename='convergence_database.npz')
 # convergence.AddFilter(label='label', time=1.0)
 # convergence.Plot("spatial", "HEIGHT_ERROR", "EXACT_HEIGHT", marker='o')
 # convergence.PrintLatexTable("HEIGHT_ERROR", "EXACT_HEIGHT")
 # slope = convergence.Slope("spatial", "HEIGHT_ERROR", "EXACT_HEIGHT")
 # print("slope :  ", slope)
+# convergence.SetFilter(time=1.0)
+# print(convergence.Rates("spatial", "HEIGHT_ERROR", "EXACT_HEIGHT"))
 
 plt.style.use('seaborn-deep')
 fig, ax = plt.subplots()
@@ -7,21 +7,19 @@ def ReadDataFrame(file_name):
     df = pd.read_csv(file_name, sep='\s+', skiprows=1, escapechar='#')
     return df
 
-def PrintTotalMassConservation(ax, identifier="", label=""):
-    file_name = path + '/total_mass' + identifier + '.dat'
+def PrintMassVariation(ax, column, identifier="", label="", **kwargs):
+    file_name = path + '/conservation' + identifier + '.dat'
     df = ReadDataFrame(file_name)
-    initial_mass = df['Mass'][0]
-    df['Mass'] -= initial_mass
-    df['Mass'] /= initial_mass
-    df.plot(x='Time', y='Mass', ax=ax, label='Total mass' + label, color='k')
+    initial_mass = df[column][0]
+    df[column] -= initial_mass
+    df[column] /= initial_mass
+    df.plot(x='Time', y=column, ax=ax, label=label, **kwargs)
+
+def PrintTotalMassConservation(ax, identifier="", label=""):
+    PrintMassVariation(ax, 'Mass', identifier, 'Total mass' + label, color='k')
 
 def PrintWetMassConservation(ax, identifier="", label=""):
-    file_name = path + '/wet_mass' + identifier + '.dat'
-    df = ReadDataFrame(file_name)
-    initial_mass = df['Mass'][0]
-    df['Mass'] -= initial_mass
-    df['Mass'] /= initial_mass
-    df.plot(x='Time', y='Mass', ax=ax, label='Wet mass' + label)
+    PrintMassVariation(ax, 'Mass_0.2', identifier, 'Wet mass' + label)
 
 def PrintMassConservation(ax, identifier="", label=""):
     PrintTotalMassConservation(ax, identifier, label)
@@ -1,31 +1,140 @@
+import os
+import glob
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
 
+class ConvergenceDatabase:
+    '''Columnar store of the results of many convergence runs.
+
+    The files written by ConvergenceOutputProcess are ingested incrementally: only the
+    files which are new or modified since the last ingestion are read. The rows are kept
+    sorted by (label, num_elems, time_step, time), with typed columns, and the store can be
+    saved to a binary file to avoid parsing the text files again in the next session.
+    '''
+
+    index_columns = ['label', 'num_elems', 'time_step', 'time']
+
+    def __init__(self, store_filename=None):
+        '''Construct the database, loading the store if it exists.
+
+        Parameters
+        ----------
+        store_filename : str
+            The npz file where the database is saved. Optional, by default it is kept in memory
+        '''
+        self.store_filename = store_filename
+        self.data = pd.DataFrame()
+        self.sources = {}  # filename -> (modification time, size)
+        if store_filename is not None and os.path.isfile(store_filename):
+            self._Load()
+
+
+    def Ingest(self, filenames):
+        '''Read the new or modified files and return the number of ingested files.
+
+        Parameters
+        ----------
+        filenames : str or list
+            A glob pattern or a list of file names
+        '''
+        if isinstance(filenames, (str, Path)):
+            filenames = sorted(glob.glob(str(filenames)))
+        modified = []
+        for filename in filenames:
+            stat = os.stat(filename)
+            if self.sources.get(filename) != (stat.st_mtime, stat.st_size):
+                modified.append((filename, (stat.st_mtime, stat.st_size)))
+        if not modified:
+            return 0
+
+        frames = [self.data[~self.data['source'].isin([filename for filename, _ in modified])]] if len(self.data) else []
+        for filename, signature in modified:
+            df = pd.read_csv(filename, sep=r'\s+', comment='#')
+            df['source'] = filename
+            frames.append(df)
+            self.sources[filename] = signature
+        self.data = self._Sort(self._SetTypes(pd.concat(frames, ignore_index=True)))
+
+        if self.store_filename is not None:
+            self.Save()
+        return len(modified)
+
+
+    def Save(self, store_filename=None):
+        '''Write the columns and the list of sources to a npz file.'''
+        store_filename = self.store_filename if store_filename is None else store_filename
+        columns = {'column_' + name : self.data[name].to_numpy(dtype=None if pd.api.types.is_numeric_dtype(self.data[name]) else str) for name in self.data.columns}
+        sources = list(self.sources.keys())
+        np.savez(store_filename,
+            column_names = np.array(self.data.columns, dtype=str),
+            source_names = np.array(sources, dtype=str),
+            source_signatures = np.array([self.sources[source] for source in sources], dtype=float).reshape(-1, 2),
+            **columns)
+
+
+    def _Load(self):
+        with np.load(self.store_filename) as store:
+            self.data = self._SetTypes(pd.DataFrame({str(name) : store['column_' + name] for name in store['column_names']}))
+            self.sources = {str(name) : tuple(signature) for name, signature in zip(store['source_names'], store['source_signatures'])}
+
+
+    @staticmethod
+    def _SetTypes(df):
+        for name in df.columns:
+            if not pd.api.types.is_numeric_dtype(df[name]):
+                df[name] = df[name].astype(str)
+            elif name in ('num_nodes', 'num_elems') and not df[name].isna().any():
+                df[name] = df[name].astype(np.int64)
+            else:
+                df[name] = df[name].astype(np.float64)
+        return df
+
+
+    @classmethod
+    def _Sort(cls, df):
+        keys = [key for key in cls.index_columns if key in df.columns]
+        return df.sort_values(keys, kind='stable', ignore_index=True)
+
+
 class ConvergenceAnalysis:
     '''Tool for plotting convergence graphs.
     
-    The source data shall be stored in text file and
+    The source data shall be stored in text files and
     must follow the format of ConvergenceOutputProcess.
+    The files are read through a ConvergenceDatabase, which
+    reads each file only once.
     '''
 
-    def __init__(self, filename, area=1.0):
-        '''Construct the plotter, read the file and initialize the variables.
+    def __init__(self, filename, area=1.0, store_filename=None):
+        '''Construct the plotter, read the files and initialize the variables.
 
         Parameters
         ----------
         file_name : str
-            The file name without extension
+            The file name without extension. It can be a glob pattern to read several files, e.g. 'convergence_*'
         area : float
             The area of the domain. It is used to compute the average element size
+        store_filename : str
+            The file to save the database. If it is specified, only the new or modified files are read. Optional
         '''
-        # Read the file
-        self.data = self._ReadData(filename)
+        self.pattern = str(Path(filename).with_suffix('.dat'))
+        self.area = area
+        self.database = ConvergenceDatabase(store_filename)
+        self.Update()
+
+
+    def Update(self):
+        '''Read the files added or modified since the last update and reset the filter.'''
+        self.database.Ingest(self.pattern)
+        if len(self.database.data) == 0:
+            raise Exception("No data found in '{}'".format(self.pattern))
+        self.data = self.database.data.copy()
 
         # General data
-        self.data['elem_size'] = np.sqrt(area / self.data["num_elems"])
+        self.data['elem_size'] = np.sqrt(self.area / self.data["num_elems"])
 
         # Initialize the filter
         self.filter = self._TrueFilter()
@@ -101,18 +210,41 @@ class ConvergenceAnalysis:
         error, increments = self._GetData(convergence, variable, ref_variable)
 
         # Compute the slope
-        if len(error) > 0:
-            slopes = []
-            for i in range(len(increments)-1):
-                d_incr = increments[i] / increments[i+1]
-                d_err = error[i] / error[i+1]
-                slopes.append(d_err / d_incr)
-            return sum(slopes) / len(slopes)
+        if len(error) > 1:
+            return self._LeastSquaresSlopes(np.log(increments), np.log(error), np.zeros(len(error), dtype=int))[0]
         else:
             print("[WARNING]: There is no data to compute the slope")
             return 0
 
 
+    def Rates(self, convergence, variable, ref_variable=None, by=['label']):
+        '''Get the convergence slopes of all the groups of the filtered data at once.
+
+        Parameters
+        ----------
+        convergence : str
+            'spatial' or 'temporal'
+        variable : str
+            The name of the error variable to compute the convergence slope
+        ref_variable : str
+            If it is specified, the variable will be scaled to it
+        by : list
+            The columns defining the groups
+
+        Returns
+        -------
+        DataFrame
+            The groups, with the slope and the number of points of each one
+        '''
+        error, increments = self._GetData(convergence, variable, ref_variable)
+        groups = self.data[self.filter][by].reset_index(drop=True)
+        codes, keys = pd.MultiIndex.from_frame(groups).factorize()
+        rates = pd.DataFrame(list(keys), columns=by)
+        rates['slope'] = self._LeastSquaresSlopes(np.log(increments.to_numpy()), np.log(error.to_numpy()), codes)
+        rates['num_points'] = np.bincount(codes, minlength=len(keys))
+        return rates
+
+
     def PrintLatexTable(self, variable, ref_variable=None):
         '''Print to screen the contents of a LaTeX tabular.
 
@@ -143,13 +275,6 @@ class ConvergenceAnalysis:
             print("[WARNING]: There is no data to generate the table")
 
 
-    @staticmethod
-    def _ReadData(filename):
-        path = Path(filename).with_suffix('.dat')
-        df = pd.read_csv(path, delim_whitespace=True, comment='#')
-        return df
-
-
     def _GetData(self, convergence, variable, ref_variable):
         increment_names = {
             'spatial'  : 'elem_size',
@@ -174,8 +299,21 @@ class ConvergenceAnalysis:
 
 
     def _AppendFilter(self, new_filter):
-        self.filter = [a and b for a, b in zip(new_filter, self.filter)]
+        self.filter &= np.asarray(new_filter, dtype=bool)
 
 
     def _TrueFilter(self):
-        return [True] * len(self.data)
\ No newline at end of file
+        return np.ones(len(self.data), dtype=bool)
+
+
+    @staticmethod
+    def _LeastSquaresSlopes(x, y, groups):
+        '''Slope of the least squares line of each group, from the sums of each group.'''
+        n = np.bincount(groups).astype(float)
+        sum_x = np.bincount(groups, x)
+        sum_y = np.bincount(groups, y)
+        sum_xx = np.bincount(groups, x * x)
+        sum_xy = np.bincount(groups, x * y)
+        denominator = n * sum_xx - sum_x**2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(denominator > 0, (n * sum_xy - sum_x * sum_y) / denominator, np.nan)
\ No newline at end of file
@@ -0,0 +1,299 @@
+import os
+import sys
+import glob
+import json
+import time
+import shlex
+import runpy
+import itertools
+import importlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+class SweepRunner:
+    '''Run a parameter sweep of a script in a bounded pool of processes.
+
+    Each case is a set of command line arguments for the script. The cases whose
+    outputs already exist are skipped, and a manifest with the status and the
+    runtime of each case is written (and updated as the cases finish).
+
+    By default every case is a new interpreter. With reuse_workers, the cases
+    are run inside a pool of worker processes which import the preload_modules
+    (e.g. Kratos and its applications) only once. The cores are shared among the
+    running cases through OMP_NUM_THREADS. If a worker crashes (e.g. a segmentation
+    fault), the pool is rebuilt: the cases which had started are run again one by
+    one, so only the crashing case fails, and the other ones are submitted again.
+
+    With a submit_command (e.g. 'sbatch --job-name {name} run.sh'), the cases are
+    submitted to a queue instead, and the manifest records the submission.
+    '''
+
+    def __init__(self, script='MainKratos.py', max_workers=None, reuse_workers=False, preload_modules=[], cases_per_worker=None, skip_existing=True, manifest_filename='sweep_manifest.json', logs_path='sweep_logs', threads_per_case=None, submit_command=None):
+        '''Construct the runner.
+
+        Parameters
+        ----------
+        script : str
+            The script to run for each case
+        max_workers : int
+            Maximum number of cases running at the same time. Optional, by default the number of cores
+        reuse_workers : bool
+            Run the cases in persistent worker processes instead of new interpreters
+        preload_modules : list
+            Modules imported once by each worker when reuse_workers is True
+        cases_per_worker : int
+            Number of cases after which a worker is replaced (requires python 3.11). Optional, by default workers are never replaced
+        skip_existing : bool
+            Skip the cases whose expected outputs already exist
+        manifest_filename : str
+            The json file with the summary of the sweep
+        logs_path : str
+            The folder to store the output of each case
+        threads_per_case : int
+            OMP_NUM_THREADS of each case. Optional, by default the cores are split among the max_workers cases
+        submit_command : str
+            Command to submit a case (e.g. to a queue), which receives the case name as 'name'. The command
+            line arguments of the case are appended. Optional, by default the cases are run locally
+        '''
+        self.script = script
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.threads_per_case = threads_per_case if threads_per_case is not None else max(1, os.cpu_count() // self.max_workers)
+        self.submit_command = submit_command
+        self.reuse_workers = reuse_workers
+        self.preload_modules = list(preload_modules)
+        self.cases_per_worker = cases_per_worker
+        self.skip_existing = skip_existing
+        self.manifest_filename = manifest_filename
+        self.logs_path = logs_path
+        self.cases = []
+
+
+    def AddCase(self, name, arguments, expected_outputs=[]):
+        '''Add a case to the sweep.
+
+        Parameters
+        ----------
+        name : str
+            A unique name, used for the log file and the manifest
+        arguments : dict
+            The command line arguments, passed as '--key value'
+        expected_outputs : list
+            Glob patterns of the files written by the case. If all of them match
+            an existing file, the case is skipped
+        '''
+        if any(case['name'] == name for case in self.cases):
+            raise Exception("There is already a case named '{}'".format(name))
+        self.cases.append({'name': name, 'arguments': dict(arguments), 'expected_outputs': list(expected_outputs)})
+
+
+    def AddCaseMatrix(self, name_pattern, parameters, fixed_arguments={}, derived_arguments={}, expected_outputs=[]):
+        '''Add a case for each combination of the parameters (cartesian product).
+
+        The combinations are numbered in order, the last parameter varying the fastest.
+
+        Parameters
+        ----------
+        name_pattern : str
+            Format string for the names. It receives the case number as 'count', the parameters values
+            and the position of each value in its list as '<argument>_index'
+        parameters : dict
+            For each argument, the list of values. A tuple of argument names can be used as key
+            to vary several arguments together, e.g. {('input_filename', 'time_step'): zip(meshes, steps)}
+        fixed_arguments : dict
+            The arguments which are common to all the cases
+        derived_arguments : dict
+            Format strings for arguments which depend on the case, e.g. {'output_filename': 'convergence_{count}'}.
+            They receive the same fields as the name
+        expected_outputs : list
+            Format strings for the outputs, which receive the same fields as the name and the derived arguments
+        '''
+        keys = list(parameters.keys())
+        values = [list(parameters[key]) for key in keys]
+        first_count = len(self.cases) + 1
+        indices = itertools.product(*[range(len(key_values)) for key_values in values])
+        for count, combination in enumerate(indices, start=first_count):
+            arguments = dict(fixed_arguments)
+            fields = {'count': count}
+            for key, key_values, index in zip(keys, values, combination):
+                names, value = (key, key_values[index]) if isinstance(key, tuple) else ((key,), (key_values[index],))
+                arguments.update(zip(names, value))
+                fields.update({name + '_index': index for name in names})
+            fields.update(arguments)
+            arguments.update({key: pattern.format(**fields) for key, pattern in derived_arguments.items()})
+            fields.update(arguments)
+            self.AddCase(name_pattern.format(**fields), arguments, [output.format(**fields) for output in expected_outputs])
+
+
+    def Run(self):
+        '''Run all the cases and return the manifest entries.'''
+        os.makedirs(self.logs_path, exist_ok=True)
+        failed_before = self._ReadFailedCases()
+        manifest = {}
+        pending = []
+        for case in self.cases:
+            if self.skip_existing and case['name'] not in failed_before and self._OutputsExist(case):
+                manifest[case['name']] = dict(case, status='skipped', runtime=0.0, log=None)
+            else:
+                pending.append(case)
+        self._WriteManifest(manifest)
+
+        start = time.time()
+        if self.submit_command is not None:
+            self._SubmitCases(pending, manifest)
+            return manifest
+
+        while pending:
+            started, unfinished = self._RunCases(pending, manifest, self.max_workers)
+            if unfinished and not started:
+                # The workers crash before running any case, e.g. while importing the preload_modules
+                for case in unfinished:
+                    self._RecordCase(manifest, case, 'BrokenProcessPool', 0.0)
+                break
+            # A worker crashed: the cases which had started are run in isolation, the other ones in a new pool
+            for case in [case for case in unfinished if case['name'] in started]:
+                _, crashed = self._RunCases([case], manifest, 1)
+                for crashed_case in crashed:
+                    self._RecordCase(manifest, crashed_case, 'BrokenProcessPool', 0.0)
+            pending = [case for case in unfinished if case['name'] not in started]
+
+        print("Sweep finished in {:.1f} s: {} done, {} failed, {} skipped".format(
+            time.time() - start,
+            *[sum(entry['status'] == status for entry in manifest.values()) for status in ['done', 'failed', 'skipped']]))
+        return manifest
+
+
+    def _RunCases(self, cases, manifest, max_workers):
+        '''Run the cases in a new pool. Returns the names of the cases which had started and the cases which did not finish, if the pool breaks.'''
+        start = time.time()
+        unfinished = []
+        with self._CreateExecutor(max_workers) as executor:
+            futures = {executor.submit(*self._GetTask(case)): case for case in cases}
+            for future in as_completed(futures):
+                case = futures[future]
+                try:
+                    return_code, runtime = future.result()
+                except BrokenProcessPool:
+                    unfinished.append(case)
+                    continue
+                except Exception as e:
+                    return_code, runtime = repr(e), 0.0
+                self._RecordCase(manifest, case, return_code, runtime)
+        # The workers open the log of a case when they start it
+        started = {case['name'] for case in unfinished if os.path.isfile(self._LogFilename(case)) and os.path.getmtime(self._LogFilename(case)) >= start}
+        if unfinished:
+            print("A worker crashed, {} cases are run again".format(len(unfinished)))
+        return started, unfinished
+
+
+    def _RecordCase(self, manifest, case, return_code, runtime):
+        status = 'done' if return_code == 0 else 'failed'
+        manifest[case['name']] = dict(case, status=status, return_code=return_code, runtime=runtime, log=self._LogFilename(case))
+        print("[{}/{}] {} {} in {:.1f} s".format(len(manifest), len(self.cases), case['name'], status, runtime))
+        self._WriteManifest(manifest)
+
+
+    def _SubmitCases(self, cases, manifest):
+        for case in cases:
+            command = shlex.split(self.submit_command.format(name=case['name'])) + _CommandLineArguments(case['arguments'])
+            return_code = subprocess.run(command).returncode
+            manifest[case['name']] = dict(case, status='submitted' if return_code == 0 else 'failed', return_code=return_code, runtime=0.0, log=None)
+            self._WriteManifest(manifest)
+        print("{} cases submitted".format(sum(manifest[case['name']]['status'] == 'submitted' for case in cases)))
+
+
+    def _CreateExecutor(self, max_workers):
+        if not self.reuse_workers:
+            # The threads only wait for the subprocesses
+            return ThreadPoolExecutor(max_workers=max_workers)
+        kwargs = {'max_workers': max_workers, 'initializer': _InitializeWorker, 'initargs': (self.preload_modules, self.threads_per_case)}
+        if self.cases_per_worker is not None:
+            kwargs['max_tasks_per_child'] = self.cases_per_worker
+        return ProcessPoolExecutor(**kwargs)
+
+
+    def _GetTask(self, case):
+        command_line = _CommandLineArguments(case['arguments'])
+        if self.reuse_workers:
+            return _RunInWorker, self.script, command_line, self._LogFilename(case)
+        return _RunInSubprocess, self.script, command_line, self._LogFilename(case), self.threads_per_case
+
+
+    def _LogFilename(self, case):
+        return os.path.join(self.logs_path, case['name'] + '.log')
+
+
+    @staticmethod
+    def _OutputsExist(case):
+        if not case['expected_outputs']:
+            return False
+        return all(glob.glob(pattern) for pattern in case['expected_outputs'])
+
+
+    def _ReadFailedCases(self):
+        # The outputs of a failed case may be incomplete, so it is not skipped
+        if not os.path.isfile(self.manifest_filename):
+            return set()
+        with open(self.manifest_filename, 'r') as manifest_file:
+            return {entry['name'] for entry in json.load(manifest_file) if entry['status'] == 'failed'}
+
+
+    def _WriteManifest(self, manifest):
+        entries = [manifest[case['name']] for case in self.cases if case['name'] in manifest]
+        with open(self.manifest_filename, 'w') as manifest_file:
+            json.dump(entries, manifest_file, indent=4, default=str)
+
+
+def _CommandLineArguments(arguments):
+    command_line = []
+    for key, value in arguments.items():
+        command_line += ['--' + key, str(value)]
+    return command_line
+
+
+def _RunInSubprocess(script, command_line, log_filename, threads_per_case):
+    start = time.time()
+    environment = dict(os.environ, OMP_NUM_THREADS=str(threads_per_case))
+    with open(log_filename, 'w') as log_file:
+        result = subprocess.run([sys.executable, script] + command_line, stdout=log_file, stderr=subprocess.STDOUT, env=environment)
+    return result.returncode, time.time() - start
+
+
+def _InitializeWorker(module_names, threads_per_case):
+    # The number of threads has to be set before OpenMP is initialized by the preloaded modules
+    os.environ['OMP_NUM_THREADS'] = str(threads_per_case)
+    for module_name in module_names:
+        importlib.import_module(module_name)
+
+
+def _RunInWorker(script, command_line, log_filename):
+    '''Run the script in the current (warm) process, redirecting the output at file descriptor level to capture the C++ output too.'''
+    start = time.time()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_stdout = os.dup(1)
+    saved_stderr = os.dup(2)
+    saved_argv = sys.argv
+    return_code = 0
+    with open(log_filename, 'w') as log_file:
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        try:
+            sys.argv = [script] + command_line
+            runpy.run_path(script, run_name='__main__')
+        except SystemExit as e:
+            return_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            import traceback
+            traceback.print_exc()
+            return_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sys.argv = saved_argv
+            os.dup2(saved_stdout, 1)
+            os.dup2(saved_stderr, 2)
+            os.close(saved_stdout)
+            os.close(saved_stderr)
+    return return_code, time.time() - start
@@ -0,0 +1,116 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import KratosMultiphysics.ShallowWaterApplication.utilities.solitary_wave_utilities as solitary_wave
+
+
+def analytical_field(x, t, amplitude, depth=1.0):
+    '''Evaluate the free surface of the Boussinesq solitary wave at all the combinations of x and t.
+
+    The closed form amplitude / cosh^2(k (x - c t)) is evaluated with array operations. It
+    is checked against the scalar BoussinesqSolution.eta at a sample of the points, and an
+    exception is raised if they do not match.
+
+    Returns
+    -------
+    ndarray
+        The elevation, with shape (len(t), len(x))
+    '''
+    w = solitary_wave.BoussinesqSolution(depth, amplitude=amplitude)
+    k = w.wavenumber
+    c = w.phase_speed
+
+    x = np.atleast_1d(np.asarray(x, dtype=float))
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    eta = amplitude / np.cosh(k * (x[np.newaxis, :] - c * t[:, np.newaxis]))**2
+
+    # The sample includes the crest of the wave
+    rows = np.unique(np.r_[np.linspace(0, len(t) - 1, 5).astype(int), np.argmax(np.max(eta, axis=1))])
+    columns = np.unique(np.linspace(0, len(x) - 1, 5).astype(int))
+    for i in rows:
+        for j in columns:
+            if abs(eta[i, j] - float(w.eta(x[j], t[i]))) > 1e-8 * amplitude:
+                raise Exception("The closed form of the solitary wave does not match BoussinesqSolution.eta at x={}, t={}".format(x[j], t[i]))
+    return eta
+
+
+def read_gauge(file_name, skiprows=2, names=['t', 'h', 'u', 'v', 'w']):
+    '''Read a gauge file, caching the parsed columns in a binary file next to it.
+
+    The cache is only used if it is newer than the file and it was read with the same skiprows and names.
+    '''
+    cache_file_name = os.path.splitext(file_name)[0] + '.npz'
+    read_options = json.dumps({'skiprows': skiprows, 'names': list(names)})
+    if os.path.isfile(cache_file_name) and os.path.getmtime(cache_file_name) >= os.path.getmtime(file_name):
+        with np.load(cache_file_name) as cache:
+            if 'read_options' in cache.files and str(cache['read_options']) == read_options:
+                return pd.DataFrame({key: cache[key] for key in names})
+    df = pd.read_csv(file_name, header=None, delimiter=r'\s+', skiprows=skiprows, names=names)
+    np.savez(cache_file_name, read_options=read_options, **{key: df[key].to_numpy() for key in df.columns})
+    return df
+
+
+def compute_errors(file_names, coordinates, amplitude, depth=1.0, reference=0.0):
+    '''Compare many gauges to the analytical solution at once.
+
+    The series are stacked in an array padded with NaN, so the gauges can have different
+    sampling times. The analytical solution is evaluated at the sampling times of each gauge.
+
+    Parameters
+    ----------
+    file_names : list
+        The gauge files
+    coordinates : list
+        The x coordinate of each gauge
+    amplitude : float
+        The amplitude of the solitary wave
+    depth : float
+        The still water depth
+    reference : float
+        The still water level, subtracted from the numerical elevation
+
+    Returns
+    -------
+    DataFrame
+        For each gauge, the L2 (root mean square) and Linf errors relative to the amplitude,
+        the relative error of the peak and the phase error (arrival time of the peak)
+    '''
+    series = [read_gauge(file_name) for file_name in file_names]
+    num_times = max(len(df) for df in series)
+    t = np.full((len(series), num_times), np.nan)
+    h = np.full((len(series), num_times), np.nan)
+    for i, df in enumerate(series):
+        t[i, :len(df)] = df['t']
+        h[i, :len(df)] = df['h'] - reference
+    x = np.asarray(coordinates, dtype=float)
+
+    w = solitary_wave.BoussinesqSolution(depth, amplitude=amplitude)
+    analytical = analytical_field(0.0, (t - x[:, np.newaxis] / w.phase_speed).ravel(), amplitude, depth).reshape(t.shape)
+
+    error = h - analytical
+    l2_error = np.sqrt(np.nanmean(error**2, axis=1)) / amplitude
+    linf_error = np.nanmax(np.abs(error), axis=1) / amplitude
+    peak_error = (np.nanmax(h, axis=1) - amplitude) / amplitude
+    phase_error = _peak_times(t, h) - x / w.phase_speed
+
+    return pd.DataFrame({
+        'file_name': file_names,
+        'x': x,
+        'l2_error': l2_error,
+        'linf_error': linf_error,
+        'peak_error': peak_error,
+        'phase_error': phase_error})
+
+
+def _peak_times(t, h):
+    '''Time of the maximum of each row, refined with a parabola through the neighbouring samples.'''
+    rows = np.arange(h.shape[0])
+    i = np.nanargmax(h, axis=1)
+    i = np.clip(i, 1, np.sum(np.isfinite(h), axis=1) - 2)
+    h0, h1, h2 = h[rows, i-1], h[rows, i], h[rows, i+1]
+    t0, t1, t2 = t[rows, i-1], t[rows, i], t[rows, i+1]
+    curvature = h0 - 2*h1 + h2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift = np.where(curvature < 0.0, 0.5 * (h0 - h2) / curvature, 0.0)
+    return t1 + shift * 0.5 * (t2 - t0)
@@ -2,13 +2,14 @@ import argparse
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import KratosMultiphysics.ShallowWaterApplication.utilities.solitary_wave_utilities as solitary_wave
+import gauge_errors
 
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-g','--gauge_id', help="from 1 to 3 or all", default='all')
 parser.add_argument('-a','--analytical', help="plot the analytical solution", default=True, type=bool)
 parser.add_argument('-p','--path', help="the path to the files", default="gauges", type=str)
+parser.add_argument('-e','--errors', help="print the errors of all the gauges", action='store_true')
 
 
 amplitude = 0.1
@@ -26,15 +27,14 @@ def plot_data(data, ax, **kwargs):
 
 
 def read_data(file_name, reference=0, **kwargs):
-    df = pd.read_csv(file_name, header=None, delimiter=r'\s+', **kwargs)
+    df = gauge_errors.read_gauge(file_name, **kwargs)
     df['h'] = df['h'] - reference
     return df
 
 
 def analytical_data(x, amplitude):
     t = np.linspace(0, end_time, 500)
-    w = solitary_wave.BoussinesqSolution(1.0, amplitude=amplitude)
-    h = [float(w.eta(x, time)) for time in t]
+    h = gauge_errors.analytical_field(x, t, amplitude)[:, 0]
     df = pd.DataFrame({'t': t, 'h': h})
     return df
 
@@ -58,6 +58,9 @@ def plot_gauge(gauge_id, ax, path):
 if __name__ == '__main__':
     plt.style.use('seaborn-muted')
     args = parser.parse_args()
+    if args.errors:
+        file_names = [results_pattern.format(args.path, gauge_id) for gauge_id in coordinates_map]
+        print(gauge_errors.compute_errors(file_names, list(coordinates_map.values()), amplitude).to_string())
     if args.gauge_id == 'all':
         fig, axes = plt.subplots(3, sharex=True)
         for i in range(3):
@@ -1,10 +1,15 @@
 # Import Kratos core and apps
+import sys
+import numpy as np
 import KratosMultiphysics as KM
 
 # Additional imports
 from KratosMultiphysics.ShapeOptimizationApplication import optimizer_factory
 from KratosMultiphysics.ShapeOptimizationApplication.analyzers.analyzer_base import AnalyzerBaseClass
 
+sys.path.append('..')
+from python_scripts.gradient_reporting import NodalGradient, ReportResponses
+
 # Read parameters
 with open("optimization_parameters.json",'r') as parameter_file:
     parameters = KM.Parameters(parameter_file.read())
@@ -12,36 +17,17 @@ with open("optimization_parameters.json",'r') as parameter_file:
 # Definition of external analyzer
 class CustomAnalyzer(AnalyzerBaseClass):
     def AnalyzeDesignAndReportToCommunicator(self, current_design, optimization_iteration, communicator):
+        design_node_ids = np.array([node.Id for node in current_design.Nodes])
+
+        # Constraints: y position of two nodes, whose gradient is zero in the rest of the design surface
+        values = {}
+        gradients = {}
+        for constraint_node_id in [733, 1048]:
+            identifier = "y_position_{}".format(constraint_node_id)
+            values[identifier] = current_design.Nodes[constraint_node_id].Y
+            gradients[identifier] = NodalGradient([constraint_node_id], [[0.0,1.0,0.0]], design_node_ids)
 
-        # Constraint 1
-        constraint_node_id = 733
-        if communicator.isRequestingValueOf("y_position_733"):
-            value = current_design.Nodes[constraint_node_id].Y
-            communicator.reportValue("y_position_733", value)
-
-        if communicator.isRequestingGradientOf("y_position_733"):
-            gradient = {}
-            for node in current_design.Nodes:
-                if node.Id == constraint_node_id:
-                    gradient[node.Id] = [0.0,1.0,0.0]
-                else:
-                    gradient[node.Id] = [0.0,0.0,0.0]
-            communicator.reportGradient("y_position_733", gradient)
-
-        # Constraint 2
-        constraint_node_id = 1048
-        if communicator.isRequestingValueOf("y_position_1048"):
-            value = current_design.Nodes[constraint_node_id].Y
-            communicator.reportValue("y_position_1048", value)
-
-        if communicator.isRequestingGradientOf("y_position_1048"):
-            gradient = {}
-            for node in current_design.Nodes:
-                if node.Id == constraint_node_id:
-                    gradient[node.Id] = [0.0,1.0,0.0]
-                else:
-                    gradient[node.Id] = [0.0,0.0,0.0]
-            communicator.reportGradient("y_position_1048", gradient)
+        ReportResponses(communicator, values, gradients)
 
 
 model = KM.Model()
@@ -1,10 +1,15 @@
 # Import Kratos core and apps
+import sys
+import numpy as np
 import KratosMultiphysics as KM
 
 # Additional imports
 from KratosMultiphysics.ShapeOptimizationApplication import optimizer_factory
 from KratosMultiphysics.ShapeOptimizationApplication.analyzers.analyzer_base import AnalyzerBaseClass
 
+sys.path.append('..')
+from python_scripts.gradient_reporting import NodalGradient, ReportResponses
+
 # Read parameters
 with open("optimization_parameters.json",'r') as parameter_file:
     parameters = KM.Parameters(parameter_file.read())
@@ -14,19 +19,16 @@ model = KM.Model()
 
 class CustomAnalyzer(AnalyzerBaseClass):
     def AnalyzeDesignAndReportToCommunicator(self, current_design, optimization_iteration, communicator):
+        design_node_ids = np.array([node.Id for node in current_design.Nodes])
+        coordinates = np.array(KM.VariableUtils().GetCurrentPositionsVector(current_design.Nodes, 3)).reshape(-1, 3)
 
         # Constraint 1
-        if communicator.isRequestingValueOf("y_squared_sum"):
-            value = 0.0
-            for node in current_design.Nodes:
-                value += node.Y**2
-            communicator.reportValue("y_squared_sum", value)
-
-        if communicator.isRequestingGradientOf("y_squared_sum"):
-            gradient = {}
-            for node in current_design.Nodes:
-                gradient[node.Id] = [0.0,2*node.Y,0.0]
-            communicator.reportGradient("y_squared_sum", gradient)
+        y_squared_sum_gradient = np.zeros_like(coordinates)
+        y_squared_sum_gradient[:, 1] = 2*coordinates[:, 1]
+
+        ReportResponses(communicator,
+            values = {"y_squared_sum" : float(np.sum(coordinates[:, 1]**2))},
+            gradients = {"y_squared_sum" : NodalGradient(design_node_ids, y_squared_sum_gradient)})
 
 # Create optimizer and perform optimization
 optimizer = optimizer_factory.CreateOptimizer(parameters["optimization_settings"], model, CustomAnalyzer())
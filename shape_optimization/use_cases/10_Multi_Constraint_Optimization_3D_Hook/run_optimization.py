@@ -1,4 +1,5 @@
 # Import Kratos core and apps
+import sys
 import KratosMultiphysics as KM
 
 # Additional imports
@@ -7,6 +8,10 @@ from KratosMultiphysics.ShapeOptimizationApplication import optimizer_factory
 from KratosMultiphysics.StructuralMechanicsApplication import structural_response_function_factory as csm_response_factory
 from KratosMultiphysics.ShapeOptimizationApplication.analyzers.analyzer_base import AnalyzerBaseClass
 
+sys.path.append('..')
+from python_scripts.geometry_synchronization import GeometrySynchronization
+from python_scripts.gradient_reporting import NodalGradient
+
 # Read parameters
 with open("optimization_parameters.json", 'r') as parameter_file:
     parameters = KM.Parameters(parameter_file.read())
@@ -23,9 +28,11 @@ class CustomAnalyzer(AnalyzerBaseClass):
             "strain_energy_tip", response_settings, model)
 
         self.model_part = model.GetModelPart("external")
+        self.geometry_synchronization = None
 
     def InitializeBeforeOptimizationLoop(self):
         self.response.Initialize()
+        self.mesh_controller = KSO.MeshControllerUtilities(self.model_part)
 
     def AnalyzeDesignAndReportToCommunicator(self, current_design, optimization_iteration, communicator):
 
@@ -33,14 +40,9 @@ class CustomAnalyzer(AnalyzerBaseClass):
         response = self.response
         identifier = "strain_energy_tip"
 
-        for d_node in current_design.GetRootModelPart().Nodes:
-            node = optimization_model_part.Nodes[d_node.Id]
-            node.X = d_node.X
-            node.Y = d_node.Y
-            node.Z = d_node.Z
-            node.X0 = d_node.X0
-            node.Y0 = d_node.Y0
-            node.Z0 = d_node.Z0
+        if self.geometry_synchronization is None:
+            self.geometry_synchronization = GeometrySynchronization(current_design.GetRootModelPart(), optimization_model_part)
+        self.geometry_synchronization.Synchronize()
 
         response.InitializeSolutionStep()
 
@@ -53,14 +55,12 @@ class CustomAnalyzer(AnalyzerBaseClass):
         if communicator.isRequestingGradientOf(identifier):
             response.CalculateGradient()
             communicator.reportGradient(
-                identifier, response.GetNodalGradient(KM.SHAPE_SENSITIVITY))
+                identifier, NodalGradient.FromNodalVariable(optimization_model_part, KM.SHAPE_SENSITIVITY))
 
         response.FinalizeSolutionStep()
 
-        KSO.MeshControllerUtilities(
-            optimization_model_part).SetMeshToReferenceMesh()
-        KSO.MeshControllerUtilities(
-            optimization_model_part).SetDeformationVariablesToZero()
+        self.mesh_controller.SetMeshToReferenceMesh()
+        self.mesh_controller.SetDeformationVariablesToZero()
 
 
 model = KM.Model()
@@ -0,0 +1,47 @@
+import numpy as np
+
+import KratosMultiphysics as KM
+
+
+class GeometrySynchronization:
+    '''Copy the current and the reference coordinates from a design model part to an analysis model part.
+
+    The nodes are matched by id. The map between the node orderings of both model parts is computed once,
+    and the coordinates are transferred with the bulk position vectors of VariableUtils.
+    All the nodes of the design model part must be in the analysis model part.
+    '''
+
+    def __init__(self, design_model_part, analysis_model_part):
+        self.design_model_part = design_model_part
+        self.analysis_model_part = analysis_model_part
+        self.variable_utils = KM.VariableUtils()
+
+        design_ids = np.array([node.Id for node in design_model_part.Nodes])
+        analysis_ids = np.array([node.Id for node in analysis_model_part.Nodes])
+        self.same_nodes = np.array_equal(design_ids, analysis_ids)
+        if not self.same_nodes:
+            # Both containers are ordered by id
+            self.analysis_indices = np.searchsorted(analysis_ids, design_ids)
+            self.analysis_indices[self.analysis_indices == len(analysis_ids)] = 0
+            missing = design_ids[analysis_ids[self.analysis_indices] != design_ids]
+            if missing.size:
+                raise Exception("{} nodes of the design model part are not in the analysis model part, e.g. {}".format(missing.size, missing[:10].tolist()))
+
+    def Synchronize(self):
+        '''Set the current and the reference coordinates of the analysis nodes to the design ones.'''
+        design_nodes = self.design_model_part.Nodes
+        analysis_nodes = self.analysis_model_part.Nodes
+        current_positions = self.variable_utils.GetCurrentPositionsVector(design_nodes, 3)
+        initial_positions = self.variable_utils.GetInitialPositionsVector(design_nodes, 3)
+
+        if not self.same_nodes:
+            current_positions = self._Scatter(current_positions, self.variable_utils.GetCurrentPositionsVector(analysis_nodes, 3))
+            initial_positions = self._Scatter(initial_positions, self.variable_utils.GetInitialPositionsVector(analysis_nodes, 3))
+
+        self.variable_utils.SetCurrentPositionsVector(analysis_nodes, current_positions)
+        self.variable_utils.SetInitialPositionsVector(analysis_nodes, initial_positions)
+
+    def _Scatter(self, design_positions, analysis_positions):
+        positions = np.array(analysis_positions).reshape(-1, 3)
+        positions[self.analysis_indices] = np.array(design_positions).reshape(-1, 3)
+        return KM.Vector(positions.ravel())
@@ -0,0 +1,71 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+import KratosMultiphysics as KM
+
+
+class NodalGradient(Mapping):
+    '''Gradient of a response given as an array of node ids and an (number of nodes x 3) array of values.
+
+    It can be passed to communicator.reportGradient in place of a dict {node_id : [dx, dy, dz]}.
+    If design_node_ids (ordered as the nodes of the design surface) is given, the gradient is
+    given only for some nodes: the rest of the design surface has a zero gradient.
+    '''
+
+    def __init__(self, node_ids, values, design_node_ids=None):
+        node_ids = np.asarray(node_ids, dtype=int)
+        values = np.asarray(values, dtype=float).reshape(-1, 3)
+        if len(node_ids) != len(values):
+            raise Exception("The gradient has {} node ids and {} values".format(len(node_ids), len(values)))
+        if design_node_ids is None:
+            self.node_ids = node_ids
+            self.nodal_values = values
+        else:
+            self.node_ids = np.asarray(design_node_ids, dtype=int)
+            self.nodal_values = np.zeros((len(self.node_ids), 3))
+            positions = np.searchsorted(self.node_ids, node_ids)
+            positions[positions == len(self.node_ids)] = 0
+            if np.any(self.node_ids[positions] != node_ids):
+                raise Exception("The gradient has nodes which are not in the design surface")
+            self.nodal_values[positions] = values
+        self.order = np.argsort(self.node_ids, kind='stable')
+
+    @classmethod
+    def FromNodalVariable(cls, model_part, variable):
+        '''Read the gradient from the historical values of an array variable, in bulk.'''
+        node_ids = np.array([node.Id for node in model_part.Nodes])
+        values = KM.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes, variable, 0, 3)
+        return cls(node_ids, values)
+
+    def __getitem__(self, node_id):
+        position = np.searchsorted(self.node_ids, node_id, sorter=self.order)
+        if position == len(self.node_ids) or self.node_ids[self.order[position]] != node_id:
+            raise KeyError(node_id)
+        return self.nodal_values[self.order[position]].tolist()
+
+    def __iter__(self):
+        return iter(self.node_ids.tolist())
+
+    def __len__(self):
+        return len(self.node_ids)
+
+    def items(self):
+        return zip(self.node_ids.tolist(), self.nodal_values.tolist())
+
+    def values(self):
+        return self.nodal_values.tolist()
+
+
+def ReportResponses(communicator, values={}, gradients={}):
+    '''Report the values and the gradients of several responses in one call.
+
+    Only the requested ones are reported. The gradients can be a NodalGradient or a callable
+    returning it, so it is only computed if it is requested.
+    '''
+    for identifier, value in values.items():
+        if communicator.isRequestingValueOf(identifier):
+            communicator.reportValue(identifier, value() if callable(value) else value)
+    for identifier, gradient in gradients.items():
+        if communicator.isRequestingGradientOf(identifier):
+            communicator.reportGradient(identifier, gradient() if callable(gradient) else gradient)
@@ -4,6 +4,8 @@ import importlib
 
 import KratosMultiphysics
 
+from point_element_utility import PointElementUtility
+
 def CreateAnalysisStageWithFlushInstance(cls, global_model, parameters):
     class AnalysisStageWithFlush(cls):
 
@@ -16,18 +18,22 @@ def CreateAnalysisStageWithFlushInstance(cls, global_model, parameters):
         def ModifyInitialGeometry(self):
             super().ModifyInitialGeometry()
 
-            # Auxiliary function to create the concentrated mass elements
-            # First argument is the model part name and second one the extra mass to be applied at each node
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_Esquinas", 4145.75)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_porteria-ext-esquina", 1911)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_porteria-ext-centro", 1811.25)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_largo-int-centro", 3663.275)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_largo-int-esquinas", 3755)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_porteria-int-esquinas", 3784.375)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_porteria-int-centro", 3718.75)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_largo-ext-intermedio", 2887.5)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_largo-ext-esquinas", 1940.75)
-            self.__CreateNodalConcentratedMassElements("Structure.GENERIC_largo-ext-centro", 3730.3)
+            # Extra mass to be applied at each node of each model part
+            # All the concentrated mass elements are created by the same utility, so the element ids are only searched once
+            nodal_masses = {
+                "Structure.GENERIC_Esquinas" : 4145.75,
+                "Structure.GENERIC_porteria-ext-esquina" : 1911,
+                "Structure.GENERIC_porteria-ext-centro" : 1811.25,
+                "Structure.GENERIC_largo-int-centro" : 3663.275,
+                "Structure.GENERIC_largo-int-esquinas" : 3755,
+                "Structure.GENERIC_porteria-int-esquinas" : 3784.375,
+                "Structure.GENERIC_porteria-int-centro" : 3718.75,
+                "Structure.GENERIC_largo-ext-intermedio" : 2887.5,
+                "Structure.GENERIC_largo-ext-esquinas" : 1940.75,
+                "Structure.GENERIC_largo-ext-centro" : 3730.3}
+            point_element_utility = PointElementUtility(self.model.GetModelPart("Structure"))
+            for model_part_name, mass_value in nodal_masses.items():
+                point_element_utility.CreateNodalConcentratedMasses(self.model.GetModelPart(model_part_name), mass_value)
 
         def Initialize(self):
             super().Initialize()
@@ -42,28 +48,6 @@ def CreateAnalysisStageWithFlushInstance(cls, global_model, parameters):
                     sys.stdout.flush()
                     self.last_flush = now
 
-        def __CreateNodalConcentratedMassElements(self, model_part_name, mass_value):
-            # Search for the maximum element id
-            main_model_part = self.model.GetModelPart("Structure")
-            max_id = 0
-            for element in main_model_part.Elements:
-                if element.Id > max_id:
-                    max_id = element.Id
-
-            # For each node create a concentrated nodal mass element
-            mass_nodes_model_part = self.model.GetModelPart(model_part_name)
-            property_0 = mass_nodes_model_part.GetProperties(0) # Get the default empty properties
-            for node in mass_nodes_model_part.Nodes:
-                # Create the concentrated nodal mass element
-                max_id += 1 # Update the element id
-                node_list = [node.Id] # The nodal list is just the current node
-                new_element = mass_nodes_model_part.CreateNewElement("NodalConcentratedElement3D1N", max_id, node_list, property_0)
-
-                # Set the extra mass value to current element
-                # IMPORTANT: this needs to be mass (internally it will be multiplied by the gravity, which value is the VOLUME_ACCELERATION within the ProjectParameters.json)
-                new_element.SetValue(KratosMultiphysics.NODAL_MASS, mass_value)
-
-
     return AnalysisStageWithFlush(global_model, parameters)
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import numpy as np
+
+import KratosMultiphysics
+import KratosMultiphysics.StructuralMechanicsApplication as StructuralMechanicsApplication
+
+
+class PointElementUtility:
+    '''Create point elements (e.g. concentrated masses or nodal springs) on many nodes at once.
+
+    The maximum element id of the root model part is searched only once, when the utility is
+    constructed, and the new ids are taken from a counter afterwards. The elements of each call
+    are created in the root model part and added to the target sub model part with a single
+    AddElements. The values (a scalar, or an array with a value per node) are converted once for
+    each distinct value and set on the elements as they are created.
+    '''
+
+    def __init__(self, root_model_part):
+        self.root_model_part = root_model_part.GetRootModelPart()
+        self.last_id = max((element.Id for element in self.root_model_part.Elements), default=0)
+        self.variable_utils = KratosMultiphysics.VariableUtils()
+
+    def CreateElements(self, model_part, node_ids, values={}, element_name="NodalConcentratedElement3D1N", properties=None):
+        '''Create an element for each node and set the given non-historical values on them.
+
+        Parameters
+        ----------
+        model_part : ModelPart
+            The model part which receives the elements
+        node_ids : array_like
+            The id of the node of each element
+        values : dict
+            For each Double or Array variable, a value for all the elements or an array with a value for each one
+        element_name : str
+            The name of the registered point element
+        properties : Properties
+            The properties of the elements, by default the properties 0 of the model part
+
+        Returns
+        -------
+        ndarray
+            The ids of the new elements
+        '''
+        node_ids = np.asarray(node_ids, dtype=int).ravel()
+        element_ids = np.arange(self.last_id + 1, self.last_id + 1 + node_ids.size)
+        if properties is None:
+            properties = model_part.GetProperties(0)
+
+        element_values = [(variable, self._GetElementValues(variable, value, node_ids.size)) for variable, value in values.items()]
+        create_new_element = self.root_model_part.CreateNewElement
+        for i, (element_id, node_id) in enumerate(zip(element_ids.tolist(), node_ids.tolist())):
+            element = create_new_element(element_name, element_id, [node_id], properties)
+            for variable, variable_values in element_values:
+                element.SetValue(variable, variable_values[i])
+        self.last_id += node_ids.size
+        if model_part is not self.root_model_part:
+            model_part.AddElements(element_ids.tolist())
+
+        return element_ids
+
+    def CreateNodalConcentratedMasses(self, model_part, masses):
+        '''Create a concentrated mass element on each node of the model part.
+
+        IMPORTANT: the values need to be masses (internally they will be multiplied by the gravity,
+        which value is the VOLUME_ACCELERATION within the ProjectParameters.json)
+        '''
+        node_ids = [node.Id for node in model_part.Nodes]
+        return self.CreateElements(model_part, node_ids, {KratosMultiphysics.NODAL_MASS : masses})
+
+    def CreateNodalSprings(self, model_part, stiffnesses):
+        '''Create an elastic support element on each node of the model part, with the given [kx, ky, kz].'''
+        node_ids = [node.Id for node in model_part.Nodes]
+        return self.CreateElements(model_part, node_ids, {StructuralMechanicsApplication.NODAL_DISPLACEMENT_STIFFNESS : stiffnesses})
+
+    @staticmethod
+    def _GetElementValues(variable, value, number_of_elements):
+        '''Return the Kratos value of each element, sharing the objects of the equal values.'''
+        variable_type = KratosMultiphysics.KratosGlobals.GetVariableType(variable.Name())
+        if variable_type not in ("Double", "Array"):
+            raise Exception("Variable " + variable.Name() + " is of type " + variable_type + ". Only Double and Array variables can be set.")
+        is_array = variable_type == "Array"
+        shape = (number_of_elements, 3) if is_array else (number_of_elements,)
+        try:
+            value = np.broadcast_to(np.asarray(value, dtype=float), shape)
+        except ValueError:
+            raise Exception("The values of " + variable.Name() + " do not match the " + str(number_of_elements) + " elements")
+
+        if number_of_elements == 0:
+            return []
+        unique_values, groups = np.unique(value.reshape(number_of_elements, -1), axis=0, return_inverse=True)
+        kratos_values = [KratosMultiphysics.Array3(unique_value.tolist()) if is_array else float(unique_value[0]) for unique_value in unique_values]
+        return [kratos_values[group] for group in groups.ravel().tolist()]
@@ -3,6 +3,11 @@ from KratosMultiphysics import *
 from KratosMultiphysics.LinearSolversApplication  import *
 from KratosMultiphysics.StructuralMechanicsApplication  import *
 
+import os
+import sys
+sys.path.append(os.path.join('..','..'))
+from python_scripts.time_dependent_nodal_load_process import TimeDependentNodalLoadProcess
+
 ## Import define_output
 parameter_file = open("ProjectParameters.json",'r')
 ProjectParameters = Parameters( parameter_file.read())
@@ -19,13 +24,6 @@ if (parallel_type == "MPI"):
 
 
 
-def ApplyLoad(initial_value, model_part, time):
-    for node in model_part.Nodes:
-        factor = 1
-        value = initial_value * factor * time
-        node.SetSolutionStepValue(POINT_MOMENT_Z,0,value)
-
-
 ## Structure model part definition
 main_model_part = ModelPart(ProjectParameters["problem_data"]["model_part_name"].GetString())
 main_model_part.ProcessInfo.SetValue(DOMAIN_SIZE, ProjectParameters["problem_data"]["domain_size"].GetInt())
@@ -82,6 +80,16 @@ if (ProjectParameters.Has("list_other_processes") == True):
 if (ProjectParameters.Has("json_output_process") == True):
     list_of_processes += process_factory.KratosProcessFactory(StructureModel).ConstructListOfProcesses(ProjectParameters["json_output_process"])
 
+## The load is applied to all the loaded nodes at once, once per step, and the load-displacement path is logged
+list_of_processes.append(TimeDependentNodalLoadProcess(StructureModel, Parameters("""{
+    "model_part_name" : "PointLoad3D_neumann",
+    "variable_name"   : "POINT_MOMENT",
+    "modulus"         : 25000.0,
+    "direction"       : [0.0, 0.0, 1.0],
+    "load_factor"     : "t",
+    "log_file_name"   : "load_displacement.bin"
+}""")))
+
 if ((parallel_type == "OpenMP") or (mpi.rank == 0)) and (echo_level > 1):
     for process in list_of_processes:
         print(process)
@@ -121,7 +129,7 @@ while(time <= end_time):
     main_model_part.ProcessInfo[TIME_STEPS] += 1
     main_model_part.CloneTimeStep(time)
 
-    if (parallel_type == "OpenMP") or (mpi.rank == 0):
+    if ((parallel_type == "OpenMP") or (mpi.rank == 0)) and (echo_level > 0):
         print("")
         print("STEP = ", main_model_part.ProcessInfo[TIME_STEPS])
         print("TIME = ", time)
@@ -132,8 +140,6 @@ while(time <= end_time):
     if (output_post == True):
         gid_output.ExecuteInitializeSolutionStep()
 
-    ApplyLoad(25000, main_model_part.GetSubModelPart("PointLoad3D_neumann"), time)
-
     solver.Solve()
 
 
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+
+import KratosMultiphysics as KM
+
+def Factory(settings, model):
+    if not isinstance(settings, KM.Parameters):
+        raise Exception("expected input shall be a Parameters object, encapsulating a json string")
+    return TimeDependentNodalLoadProcess(model, settings["Parameters"])
+
+class TimeDependentNodalLoadProcess(KM.Process):
+    '''Apply a nodal load modulus * load_factor(t) * direction to all the nodes of a model part.
+
+    The load factor is evaluated once per step, and the load is set to all the nodes in a
+    single VariableUtils call. The load factor is a function of the time "t", evaluated with
+    the GenericFunctionUtility (e.g. "t" or "sin(t)"), or a callable passed to the constructor.
+
+    If log_file_name is given, the load-displacement path is recorded: the time, the load
+    factor and the components of monitor_variable_name at the nodes of the monitor model
+    part (by default, the loaded nodes). The records are kept in memory and appended to the
+    binary log every buffer_size steps. See ReadLoadDisplacementLog.
+    '''
+
+    @staticmethod
+    def GetDefaultParameters():
+        return KM.Parameters("""{
+            "model_part_name"         : "",
+            "variable_name"           : "POINT_LOAD",
+            "modulus"                 : 1.0,
+            "direction"               : [0.0, 0.0, 0.0],
+            "load_factor"             : "t",
+            "interval"                : [0.0, "End"],
+            "monitor_model_part_name" : "",
+            "monitor_variable_name"   : "DISPLACEMENT",
+            "log_file_name"           : "",
+            "buffer_size"             : 1000
+        }""")
+
+    def __init__(self, model, settings, load_factor=None):
+        '''Constructor of TimeDependentNodalLoadProcess.
+
+        The model can be a Model or, in the legacy drivers, a dict of model parts.
+        If load_factor (a function of the time) is given, it replaces the expression of the settings.
+        '''
+        KM.Process.__init__(self)
+        settings.ValidateAndAssignDefaults(self.GetDefaultParameters())
+
+        self.model_part = _GetModelPart(model, settings["model_part_name"].GetString())
+        self.variable = KM.KratosGlobals.GetVariable(settings["variable_name"].GetString())
+        self.load = settings["modulus"].GetDouble() * np.array(settings["direction"].GetVector())
+        if load_factor is None:
+            function = KM.GenericFunctionUtility(settings["load_factor"].GetString())
+            if function.DependsOnSpace():
+                raise Exception("The load_factor can only depend on the time, but it is '{}'".format(settings["load_factor"].GetString()))
+            load_factor = lambda t: function.CallFunction(0.0, 0.0, 0.0, t, 0.0, 0.0, 0.0)
+        self.load_factor = load_factor
+        self.interval = KM.IntervalUtility(settings)
+
+        monitor_model_part_name = settings["monitor_model_part_name"].GetString()
+        self.monitor_model_part = _GetModelPart(model, monitor_model_part_name) if monitor_model_part_name else self.model_part
+        self.monitor_variable = KM.KratosGlobals.GetVariable(settings["monitor_variable_name"].GetString())
+        self.log_file_name = settings["log_file_name"].GetString()
+        self.buffer_size = settings["buffer_size"].GetInt()
+        if self.buffer_size < 1:
+            raise Exception("The buffer_size has to be at least 1!")
+
+        self.variable_utils = KM.VariableUtils()
+        self.current_load_factor = 0.0
+        self.buffer = []
+
+    def ExecuteInitialize(self):
+        if self.log_file_name:
+            # The first value of the log is the number of columns of the records
+            num_columns = 2 + 3 * self.monitor_model_part.NumberOfNodes()
+            with open(self.log_file_name, 'wb') as log_file:
+                log_file.write(np.array([num_columns], dtype=np.float64).tobytes())
+
+    def ExecuteInitializeSolutionStep(self):
+        time = self.model_part.ProcessInfo[KM.TIME]
+        if self.interval.IsInInterval(time):
+            self.current_load_factor = float(self.load_factor(time))
+        else:
+            self.current_load_factor = 0.0
+        load = KM.Array3((self.current_load_factor * self.load).tolist())
+        self.variable_utils.SetVariable(self.variable, load, self.model_part.Nodes)
+
+    def ExecuteFinalizeSolutionStep(self):
+        if self.log_file_name:
+            time = self.model_part.ProcessInfo[KM.TIME]
+            values = self.variable_utils.GetSolutionStepValuesVector(self.monitor_model_part.Nodes, self.monitor_variable, 0, 3)
+            self.buffer.append(np.concatenate(([time, self.current_load_factor], values)))
+            if len(self.buffer) >= self.buffer_size:
+                self._Flush()
+
+    def ExecuteFinalize(self):
+        self._Flush()
+
+    def _Flush(self):
+        if self.buffer:
+            with open(self.log_file_name, 'ab') as log_file:
+                log_file.write(np.array(self.buffer, dtype=np.float64).tobytes())
+        self.buffer = []
+
+
+def _GetModelPart(model, model_part_name):
+    if isinstance(model, dict):
+        return model[model_part_name]
+    return model.GetModelPart(model_part_name)
+
+
+def ReadLoadDisplacementLog(file_name):
+    '''Read the log of a TimeDependentNodalLoadProcess.
+
+    Returns
+    -------
+    tuple
+        The times and the load factors (arrays with a value per step), and the monitored values
+        as an array of shape (number of steps, number of nodes, 3)
+    '''
+    if not os.path.isfile(file_name):
+        raise Exception("The log file '{}' does not exist".format(file_name))
+    data = np.fromfile(file_name, dtype=np.float64)
+    num_columns = int(data[0])
+    records = data[1:].reshape(-1, num_columns)
+    return records[:, 0], records[:, 1], records[:, 2:].reshape(len(records), -1, 3)